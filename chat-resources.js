@@ -7,17 +7,84 @@ document.addEventListener('DOMContentLoaded', function() {
     const filterBtns = document.querySelectorAll('.filter-btn');
     let activeFilter = null;
     let activeDateFilter = { type: 'none', startDate: null, endDate: null };
+    let searchIndex = null;
+
+    // <body data-search-index> points at search-index-chat-resources.json from
+    // tools/build_search_index.py: sorted terms and the card numbers of each
+    // term (delta-encoded). Until it loads, or if its card count does not match the page, search
+    // reads the cards' text instead.
+    function loadSearchIndex() {
+        var url = document.body.dataset.searchIndex;
+        if (!url) return;
+        var integrity = document.body.dataset.searchIndexIntegrity;
+        fetch(url, integrity ? { integrity: integrity } : {})
+            .then(function(resp) { return resp.ok ? resp.json() : null; })
+            .then(function(json) {
+                searchIndex = (json && json.v === 2 && json.n === cards.length) ? json : null;
+            })
+            .catch(function() { searchIndex = null; });
+    }
+
+    // Same tokens as tools/build_search_index.py: lower-cased runs of letters and digits
+    function searchTokens(text) {
+        return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+    }
+
+    // Whitespace-separated words of `query` the index can answer. Words without
+    // letters or digits ("++", "-") are dropped; null when a word mixes them with
+    // punctuation ("c++", "ci/cd"), which only the text scan can match.
+    function searchWords(query) {
+        var words = [];
+        var parts = query.toLowerCase().split(/\s+/);
+        for (var i = 0; i < parts.length; i++) {
+            var tokens = searchTokens(parts[i]);
+            if (!tokens.length) continue;
+            if (tokens.length > 1 || tokens[0] !== parts[i]) return null;
+            words.push(parts[i]);
+        }
+        return words;
+    }
+
+    // Numbers of the cards with a term containing `word`
+    function cardsContaining(word) {
+        var found = new Set();
+        searchIndex.terms.forEach(function(term, i) {
+            if (term.indexOf(word) === -1) return;
+            var card = 0;
+            searchIndex.postings[i].forEach(function(delta) {
+                card += delta;
+                found.add(card);
+            });
+        });
+        return found;
+    }
+
+    // Numbers of the cards matching every word of `query`, or null when the
+    // index is not loaded or cannot answer the query
+    function searchCards(query) {
+        if (!searchIndex) return null;
+        var words = searchWords(query);
+        if (!words || !words.length) return null;
+        var result = null;
+        words.forEach(function(word) {
+            if (result && !result.size) return;
+            var found = cardsContaining(word);
+            result = result ? new Set(Array.from(result).filter(function(n) { return found.has(n); })) : found;
+        });
+        return result;
+    }
 
     function filterCards() {
         const query = searchInput.value.toLowerCase();
-        cards.forEach(function(card) {
-            var text = card.textContent.toLowerCase();
+        var indexed = query ? searchCards(query) : null;
+        cards.forEach(function(card, number) {
             var cardEl = card.querySelector('.resource-card');
             var cat = cardEl.dataset.category;
             var person = cardEl.dataset.person;
             var cardDate = cardEl.dataset.date;
 
-            var matchesSearch = !query || text.includes(query);
+            var matchesSearch = !query ||
+                (indexed ? indexed.has(number) : card.textContent.toLowerCase().includes(query));
             var matchesFilter = !activeFilter;
 
             if (activeFilter) {
@@ -68,7 +135,6 @@ document.addEventListener('DOMContentLoaded', function() {
         searchInput.setAttribute('aria-expanded', 'false');
         searchInput.dataset.suggestionsInit = 'true';
 
-        var suggestions = buildSuggestionIndex();
         var highlightIndex = -1;
 
         var debouncedSuggest = debounce(function() {
@@ -78,9 +144,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
 
-            var matches = suggestions.filter(function(item) {
-                return item.text.toLowerCase().includes(query);
-            }).slice(0, 8);
+            var matches = findSuggestions(query, 8);
 
             if (matches.length === 0) {
                 closeSuggestions();
@@ -168,6 +232,37 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Suggestions for `query`: matching tags, then the titles of matching cards.
+    // Without the search index, titles and tags are collected from the cards once.
+    var domSuggestions = null;
+
+    function findSuggestions(query, limit) {
+        var cardNumbers = searchCards(query);
+        if (!cardNumbers) {
+            domSuggestions = domSuggestions || buildSuggestionIndex();
+            return domSuggestions.filter(function(item) {
+                return item.text.toLowerCase().includes(query);
+            }).slice(0, limit);
+        }
+
+        var matches = searchIndex.tags.filter(function(tag) {
+            return tag.toLowerCase().includes(query);
+        }).map(function(tag) {
+            return { text: tag, type: 'Tag' };
+        });
+        var seen = new Set(matches.map(function(match) { return match.text.toLowerCase(); }));
+        var numbers = Array.from(cardNumbers).sort(function(a, b) { return a - b; });
+        for (var i = 0; i < numbers.length && matches.length < limit; i++) {
+            var titleEl = cards[numbers[i]].querySelector('h3');
+            var title = titleEl ? titleEl.textContent.trim() : '';
+            if (title && !seen.has(title.toLowerCase())) {
+                seen.add(title.toLowerCase());
+                matches.push({ text: title, type: 'Resource' });
+            }
+        }
+        return matches.slice(0, limit);
+    }
+
     function buildSuggestionIndex() {
         var seen = new Set();
         var suggestions = [];
@@ -216,6 +311,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     searchInput.addEventListener('input', filterCards);
+    loadSearchIndex();
     initSearchSuggestions();
 
     showAllBtn.addEventListener('click', function() {
@@ -362,6 +458,14 @@ document.addEventListener('DOMContentLoaded', function() {
         btn.setAttribute('aria-label', isDark ? 'Switch to light mode' : 'Switch to dark mode');
     }
 
+    // Paint each screenshot's inline low-quality placeholder until it loads
+    document.querySelectorAll('.resource-preview[data-lqip]').forEach(function(img) {
+        var lqip = img.dataset.lqip;
+        if (!lqip.startsWith('data:image/') || (img.complete && img.naturalWidth)) return;
+        img.style.backgroundImage = 'url("' + lqip + '")';
+        img.addEventListener('load', function() { img.style.backgroundImage = ''; }, { once: true });
+    });
+
     const themeToggle = document.querySelector('.theme-toggle');
     if (themeToggle) {
         updateToggleIcon(themeToggle);
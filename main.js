@@ -34,6 +34,9 @@ document.addEventListener('DOMContentLoaded', function() {
     domCache.categoryHeaders = document.querySelectorAll('.category-section h3');
     domCache.cards = document.querySelectorAll('.resource-card');
 
+    // Prebuilt search index (tools/build_search_index.py); search reads the DOM until it loads
+    loadSearchIndex();
+
     // Dark mode initialization
     initThemeToggle();
 
@@ -75,8 +78,9 @@ document.addEventListener('DOMContentLoaded', function() {
     // Add icons to resource cards
     addIconsToCards();
 
-    // Load preview mapping (generated by tools/generate_previews.py) then add previews
-    loadPreviewMap().then(() => {
+    // Previews are embedded on the cards by tools/embed_previews.py; only
+    // pages with script-rendered cards fetch a per-page slice first
+    loadPreviewSlice().then(() => {
         addPreviewImagesToCards();
     });
     
@@ -313,18 +317,39 @@ function generateTagFilters() {
     renderTags(false);
 }
 
-let previewMap = {};
-
-function loadPreviewMap() {
-    return fetch('preview-mapping.json')
+// Cards carry their preview at build time: data-preview is the image path
+// and data-preview-sources the AVIF/WebP srcsets. A page that opts in with
+// <body data-preview-slice="preview-slice-<page>.json"> also gets that
+// page's slice of preview-mapping.json, whose values are either an image
+// path or {src, sources: [{type, srcset}]}.
+let previewSlice = {};
+const PREVIEW_SIZES = '(max-width: 600px) 100vw, 400px';
+
+function loadPreviewSlice() {
+    const sliceUrl = document.body.dataset.previewSlice;
+    if (!sliceUrl) return Promise.resolve();
+    return fetch(sliceUrl)
         .then(resp => {
             if (!resp.ok) return {};
             return resp.json();
         })
         .then(json => {
-            previewMap = json || {};
+            previewSlice = json || {};
         })
-        .catch(() => { previewMap = {}; });
+        .catch(() => { previewSlice = {}; });
+}
+
+function previewEntryForCard(card, url) {
+    if (card.dataset.preview) {
+        let sources = [];
+        try {
+            sources = JSON.parse(card.dataset.previewSources || '[]');
+        } catch (e) {
+            sources = [];
+        }
+        return { src: card.dataset.preview, sources: sources, lqip: card.dataset.previewLqip };
+    }
+    return url ? previewSlice[url] : undefined;
 }
 
 // Filter cards by tag text (case-insensitive)
@@ -414,26 +439,35 @@ function addIconsToCards() {
 }
 
 // Insert a small preview screenshot for each resource card.
-// Uses WordPress mShots service to generate a lightweight thumbnail.
 function addPreviewImagesToCards() {
     const cards = document.querySelectorAll('.resource-card');
 
     cards.forEach(card => {
         // Skip if card marked as no-preview (e.g., index page category cards)
         if (card.hasAttribute('data-no-preview')) return;
-        
-        // avoid duplicating previews
-        if (card.querySelector('.resource-preview')) return;
 
-        const link = card.querySelector('h3 a');
-        if (!link) return;
+        const link = card.querySelector('h3 a') || card.closest('a.card-link');
+        const entry = previewEntryForCard(card, link ? link.href : '');
+
+        // A preview <img> already in the HTML only needs its AVIF/WebP sources
+        const existing = card.querySelector('.resource-preview');
+        if (existing) {
+            applyPlaceholder(existing, existing.dataset.lqip);
+            if (entry && entry.sources && entry.sources.length && !existing.closest('picture')) {
+                const placeholder = document.createComment('');
+                existing.replaceWith(placeholder);
+                placeholder.replaceWith(buildPreviewElement(entry, existing));
+            }
+            return;
+        }
 
-        const url = link.href;
-        if (!url) return;
+        // Use local preview when available; no third-party fallback.
+        if (!entry) return;
 
+        const title = card.querySelector('h3');
         const img = document.createElement('img');
         img.className = 'resource-preview';
-        img.alt = `Preview of ${link.textContent.trim()}`;
+        img.alt = `Preview of ${title ? title.textContent.trim() : 'resource'}`;
         img.loading = 'lazy';
         img.referrerPolicy = 'no-referrer';
         img.decoding = 'async';
@@ -441,27 +475,55 @@ function addPreviewImagesToCards() {
         img.width = 600;
         img.height = 160;
 
-
-        // Use local preview when available; no third-party fallback.
-        if (previewMap[url]) {
-            img.src = previewMap[url];
-            img.onerror = function() { img.remove(); };
-        } else {
-            img.remove();
-        }
+        const preview = buildPreviewElement(entry, img);
+        img.onerror = function() { preview.remove(); };
 
         // Place the preview after any icon but before the title
         const icon = card.querySelector('.resource-card-icon');
         if (icon && icon.nextSibling) {
-            card.insertBefore(img, icon.nextSibling);
+            card.insertBefore(preview, icon.nextSibling);
         } else if (icon) {
-            card.appendChild(img);
+            card.appendChild(preview);
         } else {
-            card.insertBefore(img, card.firstChild);
+            card.insertBefore(preview, card.firstChild);
         }
     });
 }
 
+// Wrap the preview <img> in a <picture> with AVIF/WebP srcsets when the
+// mapping lists variants; plain path entries just set img.src.
+function buildPreviewElement(entry, img) {
+    if (typeof entry === 'string') {
+        img.src = entry;
+        return img;
+    }
+
+    img.src = entry.src;
+    applyPlaceholder(img, entry.lqip);
+    const sources = entry.sources || [];
+    if (!sources.length) return img;
+
+    const picture = document.createElement('picture');
+    picture.className = 'resource-preview-picture';
+    sources.forEach(source => {
+        const el = document.createElement('source');
+        el.type = source.type;
+        el.srcset = source.srcset;
+        el.sizes = PREVIEW_SIZES;
+        picture.appendChild(el);
+    });
+    picture.appendChild(img);
+    return picture;
+}
+
+// Paint the inline low-quality placeholder behind a preview until the real
+// image has loaded (background-size is set in style.css).
+function applyPlaceholder(img, lqip) {
+    if (!lqip || !lqip.startsWith('data:image/') || (img.complete && img.naturalWidth)) return;
+    img.style.backgroundImage = `url("${lqip}")`;
+    img.addEventListener('load', () => { img.style.backgroundImage = ''; }, { once: true });
+}
+
 // Helper: get the element to show/hide for a given card.
 // On news.html cards are wrapped in <a class="card-link">, on resources.html they are standalone.
 function getToggleTarget(card) {
@@ -469,21 +531,94 @@ function getToggleTarget(card) {
     return (parent && parent.classList.contains('card-link')) ? parent : card;
 }
 
+// =========================================================================
+// SEARCH
+// =========================================================================
+
+// <body data-search-index="/search-index-<page>.json?v=..."> points at the
+// page's index from tools/build_search_index.py: sorted terms and the card
+// numbers of each term (delta-encoded). It is fetched with the SRI hash in
+// data-search-index-integrity and ignored when its card count does not
+// match the page, in which case search falls back to reading the cards.
+let searchIndex = null;
+
+function loadSearchIndex() {
+    const url = document.body.dataset.searchIndex;
+    if (!url) return Promise.resolve();
+    const integrity = document.body.dataset.searchIndexIntegrity;
+    return fetch(url, integrity ? { integrity: integrity } : {})
+        .then(resp => resp.ok ? resp.json() : null)
+        .then(json => {
+            const count = document.querySelectorAll('.resource-card').length;
+            searchIndex = (json && json.v === 2 && json.n === count) ? json : null;
+        })
+        .catch(() => { searchIndex = null; });
+}
+
+// Same tokens as tools/build_search_index.py: lower-cased runs of letters and digits
+function searchTokens(text) {
+    return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+}
+
+// Whitespace-separated words of `query` the index can answer. Words without
+// letters or digits ("++", "-") are dropped; null when a word mixes them with
+// punctuation ("c++", "ci/cd"), which only the text scan can match.
+function searchWords(query) {
+    const words = [];
+    for (const word of query.toLowerCase().split(/\s+/)) {
+        const tokens = searchTokens(word);
+        if (!tokens.length) continue;
+        if (tokens.length > 1 || tokens[0] !== word) return null;
+        words.push(word);
+    }
+    return words;
+}
+
+// Numbers of the cards with a term containing `word`
+function cardsContaining(index, word) {
+    const found = new Set();
+    index.terms.forEach((term, i) => {
+        if (!term.includes(word)) return;
+        let card = 0;
+        index.postings[i].forEach(delta => { card += delta; found.add(card); });
+    });
+    return found;
+}
+
+// Numbers of the cards matching every word of `query`, or null when the
+// index is not loaded or cannot answer the query
+function searchCards(query) {
+    if (!searchIndex) return null;
+    const words = searchWords(query);
+    if (!words || !words.length) return null;
+    let result = null;
+    for (const word of words) {
+        const found = cardsContaining(searchIndex, word);
+        result = result ? new Set([...result].filter(card => found.has(card))) : found;
+        if (!result.size) break;
+    }
+    return result;
+}
+
+function cardMatchesText(card, searchTerm) {
+    const title = card.querySelector('h3')?.textContent.toLowerCase() || '';
+    const paragraphs = Array.from(card.querySelectorAll('p')).map(p => p.textContent).join(' ').toLowerCase();
+    const tags = Array.from(card.querySelectorAll('.tag')).map(tag => tag.textContent.toLowerCase()).join(' ');
+
+    return title.includes(searchTerm) ||
+           paragraphs.includes(searchTerm) ||
+           tags.includes(searchTerm);
+}
+
 function filterResources(searchTerm) {
     // Use cached cards or query if not available
     const cards = domCache.cards.length > 0 ? domCache.cards : document.querySelectorAll('.resource-card');
-    
+    const indexed = searchCards(searchTerm);
+
     // Use requestAnimationFrame for smoother rendering
     requestAnimationFrame(() => {
-        cards.forEach(card => {
-            const title = card.querySelector('h3')?.textContent.toLowerCase() || '';
-            const paragraphs = Array.from(card.querySelectorAll('p')).map(p => p.textContent).join(' ').toLowerCase();
-            const tags = Array.from(card.querySelectorAll('.tag')).map(tag => tag.textContent.toLowerCase()).join(' ');
-
-            const matches = title.includes(searchTerm) ||
-                           paragraphs.includes(searchTerm) ||
-                           tags.includes(searchTerm);
-
+        cards.forEach((card, number) => {
+            const matches = indexed ? indexed.has(number) : cardMatchesText(card, searchTerm);
             getToggleTarget(card).style.display = matches ? '' : 'none';
         });
 
@@ -573,8 +708,6 @@ function initSearchSuggestions() {
     input.setAttribute('aria-controls', 'searchSuggestions');
     input.setAttribute('aria-expanded', 'false');
 
-    // Build suggestion index from cards
-    const suggestions = buildSuggestionIndex();
     let highlightIndex = -1;
 
     const debouncedSuggest = debounce(function() {
@@ -584,9 +717,7 @@ function initSearchSuggestions() {
             return;
         }
 
-        const matches = suggestions.filter(s =>
-            s.text.toLowerCase().includes(query)
-        ).slice(0, 8);
+        const matches = findSuggestions(query, 8);
 
         if (matches.length === 0) {
             closeSuggestions();
@@ -658,6 +789,32 @@ function initSearchSuggestions() {
     }
 }
 
+// Suggestions for `query`: matching tags, then the titles of matching cards.
+// Without the search index, titles and tags are collected from the cards once.
+let domSuggestions = null;
+
+function findSuggestions(query, limit) {
+    const cardNumbers = searchCards(query);
+    if (!cardNumbers) {
+        domSuggestions = domSuggestions || buildSuggestionIndex();
+        return domSuggestions.filter(s => s.text.toLowerCase().includes(query)).slice(0, limit);
+    }
+
+    const matches = searchIndex.tags
+        .filter(tag => tag.toLowerCase().includes(query))
+        .map(tag => ({ text: tag, type: 'Tag' }));
+    const seen = new Set(matches.map(match => match.text.toLowerCase()));
+    for (const number of [...cardNumbers].sort((a, b) => a - b)) {
+        if (matches.length >= limit) break;
+        const title = domCache.cards[number]?.querySelector('h3')?.textContent.trim();
+        if (title && !seen.has(title.toLowerCase())) {
+            seen.add(title.toLowerCase());
+            matches.push({ text: title, type: 'Resource' });
+        }
+    }
+    return matches.slice(0, limit);
+}
+
 function buildSuggestionIndex() {
     const seen = new Set();
     const suggestions = [];
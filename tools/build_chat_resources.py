@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Render the cards of chat-resources.html from tools/data/chat-resources.json.
+
+The data file is the source of truth for the page's cards, one record per
+shared link:
+
+    {"url": "https://...", "title": "...", "date": "2025-06-12" or null,
+     "shared_by": "Jane Doe", "category": "aws",
+     "screenshot": "docs_aws_amazon_com_a9915f15d2ef93c6.png" or null}
+
+Everything else on the card is derived: the tag label and colour from the
+category (CATEGORIES), data-person from the name, the source from the host,
+and the preview from chat-screenshots/manifest.json (WebP <img> plus AVIF
+<source>, see tools/encode_screenshots.py; the PNG until it is encoded)
+with a data-lqip placeholder from tools/image_placeholders.py. Records are
+shown undated first, then newest first.
+
+The rest of the page (header, filters, footer) stays hand-written. Between
+the <!-- cards:start --> and <!-- cards:end --> markers in .resource-grid
+the cards are written as one chunk per month:
+
+    <!-- chunk 2025-06 3f1c0a9b2d4e -->
+    <a href=...>...</a>
+    <!-- /chunk 2025-06 -->
+
+The hash covers the month's records and the manifest entries of their
+screenshots. A chunk whose hash matches the page is kept as it is; only
+new or changed months are rendered, so adding a link rewrites one chunk
+and the page diff shows only that month.
+
+Usage:
+    python3 tools/build_chat_resources.py            # update chat-resources.html
+    python3 tools/build_chat_resources.py --force    # re-render every chunk
+    python3 tools/build_chat_resources.py --check    # exit 1 if the page is out of date
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from encode_screenshots import SCREENSHOT_DIR, load_manifest, picture_markup
+from image_placeholders import default_cache as default_placeholder_cache
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(WORKSPACE_ROOT))
+from update_sri import upsert_attr  # noqa: E402
+
+PAGE = WORKSPACE_ROOT / 'chat-resources.html'
+DATA_FILE = Path(__file__).parent / 'data' / 'chat-resources.json'
+
+RENDER_VERSION = 1  # bump when the card markup changes, to re-render every chunk
+
+# category: (tag label, tag colour)
+CATEGORIES = {
+    'other': ('Other', '#607D8B'),
+    'youtube': ('YouTube', '#c4302b'),
+    'news': ('News', '#2c3e50'),
+    'github': ('GitHub', '#24292e'),
+    'wiz': ('Wiz', '#00C2A2'),
+    'training': ('Training', '#e91e63'),
+    'owasp': ('OWASP', '#333333'),
+    'discord': ('Discord', '#5865F2'),
+    'aws': ('AWS', '#FF9900'),
+    'csoh': ('CSOH', '#3498db'),
+    'wikipedia': ('Wikipedia', '#636466'),
+    'vendor': ('Vendor', '#6a1b9a'),
+    'spotify': ('Spotify', '#607D8B'),
+    'jobs': ('Jobs', '#ff9800'),
+    'cisa': ('CISA', '#003366'),
+    'gcp': ('GCP', '#4285F4'),
+    'azure': ('Azure', '#0078D4'),
+}
+
+CARDS_START = '<!-- cards:start -->\n'
+CARDS_END = '<!-- cards:end -->'
+_CHUNK = re.compile(r'<!-- chunk (\S+) ([0-9a-f]+) -->\n(.*?)<!-- /chunk \1 -->\n', re.DOTALL)
+_LINK_COUNT = re.compile(r'(<section class="hero">[\s\S]*?<p>)(\d+)( links shared)')
+
+IMG_MARKUP = ('<img src="chat-screenshots/{name}" alt="Preview" class="resource-preview" '
+              'loading="lazy" onerror="this.style.display=\'none\'">')
+CARD_MARKUP = '''<a href="{href}" class="card-link" target="_blank" rel="noopener noreferrer">
+                    <div class="resource-card" data-category="{category}" data-person="{person}" data-date="{date}">
+{preview}                        <h3>{title}</h3>
+                        <p class="article-date">{date} · Shared by {shared_by}</p>
+                        <p><span class="source">({source})</span></p>
+                        <div class="resource-tags">
+                            <span class="tag" style="background-color: {color}; color: white;">{label}</span>
+                        </div>
+                    </div>
+                </a>
+'''
+
+
+def load_records(path: Path = DATA_FILE) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_records(records: List[Dict], path: Path = DATA_FILE):
+    """Write the data file atomically (temp file + rename)."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def validate(records: List[Dict]) -> List[str]:
+    """Problems that would stop a record from rendering."""
+    problems = []
+    for i, record in enumerate(records):
+        label = record.get('url') or f"record {i}"
+        if not str(record.get('url', '')).startswith(('http://', 'https://')):
+            problems.append(f"{label}: url must be http(s)")
+        if record.get('category') not in CATEGORIES:
+            problems.append(f"{label}: unknown category {record.get('category')!r}")
+        if record.get('date') is not None and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', str(record['date'])):
+            problems.append(f"{label}: date must be YYYY-MM-DD or null")
+    return problems
+
+
+def person_slug(name: str) -> str:
+    return 'person-' + re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def source_host(url: str) -> str:
+    return re.sub(r'^www\.', '', urlparse(url).netloc.lower())
+
+
+def ordered(records: List[Dict]) -> List[Dict]:
+    """Undated records first, then newest first; ties keep their order in the data file."""
+    return sorted(records, key=lambda r: r.get('date') or '9999-99-99', reverse=True)
+
+
+def chunk_records(records: List[Dict]) -> List[Tuple[str, List[Dict]]]:
+    """[(chunk key, records)] grouping ordered records by month."""
+    chunks: List[Tuple[str, List[Dict]]] = []
+    for record in ordered(records):
+        key = (record.get('date') or 'undated')[:7]
+        if chunks and chunks[-1][0] == key:
+            chunks[-1][1].append(record)
+        else:
+            chunks.append((key, [record]))
+    return chunks
+
+
+def chunk_hash(records: List[Dict], manifest: Dict) -> str:
+    screenshots = {r['screenshot']: manifest['files'].get(r['screenshot'])
+                   for r in records if r.get('screenshot')}
+    payload = json.dumps([RENDER_VERSION, records, screenshots], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def served_screenshot(name: str, entry: Optional[Dict]) -> str:
+    """File the card's <img> loads: the encoded WebP when there is one, else the PNG."""
+    outputs = (entry or {}).get('outputs') or {}
+    return outputs.get('webp') or outputs.get('avif') or name
+
+
+def preview_markup(name: str, entry: Optional[Dict], placeholders: Dict[Path, str]) -> str:
+    img_tag = IMG_MARKUP.format(name=html.escape(served_screenshot(name, entry)))
+    placeholder = placeholders.get(SCREENSHOT_DIR / served_screenshot(name, entry))
+    if placeholder:
+        img_tag = upsert_attr(img_tag, 'data-lqip', placeholder)
+    if entry and entry.get('outputs'):
+        img_tag = picture_markup(img_tag, entry)
+    return img_tag
+
+
+def render_card(record: Dict, manifest: Dict, placeholders: Dict[Path, str]) -> str:
+    label, color = CATEGORIES[record['category']]
+    name = record.get('screenshot')
+    preview = ''
+    if name:
+        preview = ' ' * 24 + preview_markup(name, manifest['files'].get(name), placeholders) + '\n'
+    shared_by = record.get('shared_by') or 'unknown'
+    return CARD_MARKUP.format(
+        href=html.escape(record['url']),
+        category=record['category'],
+        person=person_slug(shared_by),
+        date=record.get('date') or 'unknown',
+        preview=preview,
+        title=html.escape(record['title'], quote=False),
+        shared_by=html.escape(shared_by, quote=False),
+        source=html.escape(source_host(record['url']), quote=False),
+        color=color,
+        label=label,
+    )
+
+
+def render_chunk(key: str, digest: str, records: List[Dict], manifest: Dict,
+                 placeholders: Dict[Path, str]) -> str:
+    cards = ''.join(render_card(record, manifest, placeholders) for record in records)
+    return f"<!-- chunk {key} {digest} -->\n{cards}<!-- /chunk {key} -->\n"
+
+
+def plan_chunks(content: str, records: List[Dict], manifest: Dict, force: bool = False):
+    """(card region bounds, chunks on the page, all chunks, chunks to render) for `records`."""
+    start = content.find(CARDS_START)
+    end = content.find(CARDS_END, start)
+    if start == -1 or end == -1:
+        raise ValueError(f"{CARDS_START.strip()} / {CARDS_END} markers not found in {PAGE.name}")
+    start += len(CARDS_START)
+    existing = {m.group(1): (m.group(2), m.group(0)) for m in _CHUNK.finditer(content, start, end)}
+    chunks = [(key, chunk, chunk_hash(chunk, manifest)) for key, chunk in chunk_records(records)]
+    stale = [(key, chunk, digest) for key, chunk, digest in chunks
+             if force or existing.get(key, (None,))[0] != digest]
+    return (start, end), existing, chunks, stale
+
+
+def stale_parts(content: str, records: List[Dict], manifest: Dict) -> List[str]:
+    """What build_page would change: stale chunk keys, removed chunks and the link count."""
+    _, existing, chunks, stale = plan_chunks(content, records, manifest)
+    parts = [key for key, _, _ in stale]
+    parts += [f"{key} (removed)" for key in existing if key not in {key for key, _, _ in chunks}]
+    count = _LINK_COUNT.search(content)
+    if count and int(count.group(2)) != len(records):
+        parts.append(f"link count ({count.group(2)}, should be {len(records)})")
+    return parts
+
+
+def build_page(content: str, records: List[Dict], manifest: Dict,
+               force: bool = False) -> Tuple[str, List[str], int]:
+    """(new page, keys of re-rendered chunks, chunk count) for `records`."""
+    (start, end), existing, chunks, stale = plan_chunks(content, records, manifest, force)
+
+    # Placeholders only for the chunks that are rendered
+    screenshots = [SCREENSHOT_DIR / served_screenshot(r['screenshot'], manifest['files'].get(r['screenshot']))
+                   for _, chunk, _ in stale for r in chunk if r.get('screenshot')]
+    placeholders = {}
+    if screenshots:
+        cache = default_placeholder_cache()
+        placeholders = cache.placeholders(path for path in screenshots if path.exists())
+        cache.save()
+
+    rendered = {key: render_chunk(key, digest, chunk, manifest, placeholders) for key, chunk, digest in stale}
+    cards = ''.join(rendered.get(key) or existing[key][1] for key, _, _ in chunks)
+    new_content = content[:start] + cards + content[end:]
+    new_content = _LINK_COUNT.sub(rf'\g<1>{len(records)}\g<3>', new_content, count=1)
+    return new_content, [key for key, _, _ in stale], len(chunks)
+
+
+def build(force: bool = False) -> int:
+    """Re-render chat-resources.html from the data file; returns the number of chunks rendered."""
+    records = load_records()
+    problems = validate(records)
+    if problems:
+        raise ValueError('; '.join(problems))
+    content = PAGE.read_text(encoding='utf-8')
+    new_content, rendered, total = build_page(content, records, load_manifest(), force)
+    if new_content != content:
+        tmp_path = PAGE.with_name(PAGE.name + '.tmp')
+        tmp_path.write_text(new_content, encoding='utf-8')
+        os.replace(tmp_path, PAGE)
+    print(f"🧱 {PAGE.name}: {len(records)} cards in {total} chunk(s), "
+          + (f"re-rendered {len(rendered)} ({', '.join(rendered)})" if rendered
+             else "updated" if new_content != content else "all up to date"))
+    return len(rendered)
+
+
+def main():
+    if '--check' in sys.argv:
+        records = load_records()
+        problems = validate(records)
+        for problem in problems:
+            print(f"  ❌ {problem}")
+        try:
+            stale = stale_parts(PAGE.read_text(encoding='utf-8'), records, load_manifest())
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        if problems or stale:
+            if stale:
+                print(f"❌ {PAGE.name} out of date: {', '.join(stale)}")
+            print("   Run: python3 tools/build_chat_resources.py")
+            return 1
+        print(f"✅ {PAGE.name} matches {DATA_FILE.name} ({len(records)} cards, "
+              f"{len(chunk_records(records))} chunks)")
+        return 0
+
+    try:
+        build(force='--force' in sys.argv)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Build the client-side search indexes for the pages with a search box.
+
+main.js (resources.html, news.html) and chat-resources.js used to read
+every card's text from the DOM to filter cards and build suggestions. This
+step extracts that text (the card's <h3>, <p>s and .tag labels) at build
+time and writes one small index per page:
+
+    search-index-<page>.json
+    {
+      "v": 2,                      index format version
+      "n": 554,                    number of .resource-card elements, in page order
+      "terms": ["2023", "aws", ...],       sorted unique tokens
+      "postings": [[0, 4, 1], ...],        card numbers per term, delta-encoded
+      "tags": ["AWS", "News", ...]         distinct tag labels, for suggestions
+    }
+
+Terms are the lower-cased runs of letters and digits of the card text. A
+card matches when every word of the query is a substring of one of its
+terms, so "security" still finds "cybersecurity" and "gpt" finds
+"ChatGPT", as with the plain text search the index replaces. The front
+end scans the term list (a couple of thousand entries) for each word.
+Query words that mix letters or digits with punctuation ("c++", "ci/cd")
+cannot be answered from terms and fall back to the text scan.
+
+The page's <body> gets the index URL, with a content-hash cache-bust
+parameter, and its SRI hash:
+
+    <body data-search-index="/search-index-news.json?v=1a2b3c4d"
+          data-search-index-integrity="sha384-...">
+
+The scripts fetch it with that integrity, and fall back to reading the DOM
+when the index is missing or its card count does not match the page.
+
+Usage:
+    python3 tools/build_search_index.py            # write indexes, update pages
+    python3 tools/build_search_index.py --check    # exit 1 if any index is out of date
+"""
+
+import json
+import os
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(WORKSPACE_ROOT))
+from update_sri import calculate_cache_bust, calculate_sri_hash, upsert_attr  # noqa: E402
+
+PAGES = ['resources.html', 'chat-resources.html', 'news.html']
+INDEX_PREFIX = 'search-index-'
+INDEX_VERSION = 2
+
+_TOKEN = re.compile(r'[^\W_]+')
+_BODY_TAG = re.compile(r'<body\b[^>]*>', re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased runs of letters and digits (the front end splits on /[\\p{L}\\p{N}]+/gu)."""
+    return _TOKEN.findall(text.lower())
+
+
+class _CardText(HTMLParser):
+    """Collects the searchable text and tag labels of each .resource-card."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards: List[Dict] = []
+        self._card_depth = 0     # open <div>s inside the current card
+        self._text_tags = []     # (tag, is a .tag label) of open h3 / p / .tag elements in the card
+        self._tag_label = None   # text of the .tag label being read
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get('class') or '').split()
+        if not self._card_depth:
+            if tag == 'div' and 'resource-card' in classes:
+                self.cards.append({'text': [], 'tags': []})
+                self._card_depth = 1
+            return
+        if tag == 'div':
+            self._card_depth += 1
+        is_label = 'tag' in classes
+        if tag in ('h3', 'p') or is_label:
+            self._text_tags.append((tag, is_label))
+            if is_label:
+                self._tag_label = []
+
+    def handle_endtag(self, tag):
+        if not self._card_depth:
+            return
+        if self._text_tags and self._text_tags[-1][0] == tag:
+            _, is_label = self._text_tags.pop()
+            if is_label:
+                label = ' '.join(''.join(self._tag_label).split())
+                if label:
+                    self.cards[-1]['tags'].append(label)
+                self._tag_label = None
+        if tag == 'div':
+            self._card_depth -= 1
+            if not self._card_depth:
+                self._text_tags, self._tag_label = [], None
+
+    def handle_data(self, data):
+        if self._card_depth and self._text_tags:
+            self.cards[-1]['text'].append(data)
+            if self._tag_label is not None:
+                self._tag_label.append(data)
+
+
+def extract_cards(content: str) -> List[Dict]:
+    """[{'text': searchable text, 'tags': [labels]}] for each card, in page order."""
+    parser = _CardText()
+    parser.feed(content)
+    parser.close()
+    return [{'text': ' '.join(card['text']), 'tags': card['tags']} for card in parser.cards]
+
+
+def build_index(cards: List[Dict]) -> Dict:
+    postings: Dict[str, List[int]] = {}
+    for number, card in enumerate(cards):
+        for term in set(tokenize(card['text'])):
+            postings.setdefault(term, []).append(number)
+    terms = sorted(postings, key=lambda term: term.encode('utf-16-be'))  # JavaScript string order
+
+    def delta_encode(numbers: List[int]) -> List[int]:
+        return [number - previous for previous, number in zip([0] + numbers, numbers)]
+
+    tags = {}
+    for card in cards:
+        for tag in card['tags']:
+            tags.setdefault(tag.lower(), tag)
+    return {
+        'v': INDEX_VERSION,
+        'n': len(cards),
+        'terms': terms,
+        'postings': [delta_encode(postings[term]) for term in terms],
+        'tags': sorted(tags.values(), key=str.lower),
+    }
+
+
+def index_name(page: Path) -> str:
+    return f"{INDEX_PREFIX}{page.stem}.json"
+
+
+def serialize(index: Dict) -> str:
+    return json.dumps(index, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def set_body_attributes(content: str, url: str, integrity: str) -> str:
+    match = _BODY_TAG.search(content)
+    if not match:
+        return content
+    tag = upsert_attr(match.group(0), 'data-search-index', url)
+    tag = upsert_attr(tag, 'data-search-index-integrity', integrity)
+    return content[:match.start()] + tag + content[match.end():]
+
+
+def main():
+    check_only = '--check' in sys.argv
+    stale = []
+    for name in PAGES:
+        page = WORKSPACE_ROOT / name
+        if not page.exists():
+            continue
+        content = page.read_text(encoding='utf-8')
+        index = build_index(extract_cards(content))
+        index_path = WORKSPACE_ROOT / index_name(page)
+        data = serialize(index)
+
+        current = index_path.exists() and index_path.read_text(encoding='utf-8') == data
+        if not current:
+            stale.append(index_path.name)
+            if check_only:
+                continue
+            tmp_path = index_path.with_name(index_path.name + '.tmp')
+            tmp_path.write_text(data, encoding='utf-8')
+            os.replace(tmp_path, index_path)
+
+        url = f"/{index_path.name}?v={calculate_cache_bust(index_path)}"
+        new_content = set_body_attributes(content, url, calculate_sri_hash(index_path))
+        if new_content != content:
+            stale.append(page.name)
+            if not check_only:
+                page.write_text(new_content, encoding='utf-8')
+        print(f"  {page.name}: {index['n']} cards, {len(index['terms'])} terms → "
+              f"{index_path.name} ({len(data.encode('utf-8')) // 1024} KB)")
+
+    if check_only:
+        if stale:
+            print(f"❌ Out of date: {', '.join(stale)}")
+            print("   Run: python3 tools/build_search_index.py")
+            return 1
+        print("✅ Search indexes up to date")
+        return 0
+    print(f"\n✅ Updated {len(stale)} file(s)" if stale else "\n✅ Search indexes already up to date")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Capture screenshots for chat-resources.html cards that have none.
+
+Chat screenshots are named after the card's URL:
+
+    <domain>_<md5(url)[:16]>.png
+
+where <domain> is the host without "www.", with dots replaced by
+underscores and truncated to 30 characters, e.g.
+docs_aws_amazon_com_a9915f15d2ef93c6.png. That is the naming every existing
+file in chat-screenshots/ and url-mapping.json follows.
+
+Missing screenshots are captured with the shared browser pool from
+tools/preview_capture.py (one Chromium, --concurrency contexts, per-host
+rate limit) at the same 1280x720 viewport. Captures that fail the
+perceptual-hash gate (challenge pages, blank renders) are discarded. Each
+capture is written to tools/.cache and moved into place as soon as it
+finishes, so an interrupted run keeps everything it captured. A re-run only
+captures what is still missing, and picks up screenshots that are already
+on disk.
+
+For each new screenshot the tool:
+- sets the record's "screenshot" in tools/data/chat-resources.json
+- records the file in chat-screenshots/url-mapping.json
+- encodes it to WebP/AVIF with tools/encode_screenshots.py
+and then re-renders the changed chunks of the page with
+tools/build_chat_resources.py.
+
+URLs that fail MAX_ATTEMPTS times are skipped on later runs (listed in
+tools/.cache/chat-screenshot-failures.json) unless --retry-failed is given.
+
+Usage:
+    python3 tools/capture_chat_screenshots.py [--limit N] [--concurrency N] [--per-host-rate R]
+    python3 tools/capture_chat_screenshots.py --check    # list cards without screenshots
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from build_chat_resources import DATA_FILE, build, load_records, save_records
+from cli_options import pop_option
+from encode_screenshots import MIME_TYPES, encode_all, load_manifest, save_manifest, stale_sources
+from generate_preview import capture_problem, variant_formats
+from preview_capture import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST_RATE, capture_batch
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+SCREENSHOT_DIR = WORKSPACE_ROOT / 'chat-screenshots'
+URL_MAPPING = SCREENSHOT_DIR / 'url-mapping.json'
+FAILURES_FILE = Path(__file__).parent / '.cache' / 'chat-screenshot-failures.json'
+CAPTURE_DIR = Path(__file__).parent / '.cache' / 'chat-screenshot-captures'
+
+DOMAIN_PREFIX_MAX = 30
+MAX_ATTEMPTS = 3
+
+
+def screenshot_filename(url: str) -> str:
+    """chat-screenshots/ file name for a URL: <domain>_<md5(url)[:16]>.png"""
+    host = re.sub(r'^www\.', '', urlparse(url).netloc.lower())
+    domain = host.replace('.', '_')[:DOMAIN_PREFIX_MAX]
+    return f"{domain}_{hashlib.md5(url.encode('utf-8')).hexdigest()[:16]}.png"
+
+
+def load_json(path: Path) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_json(path: Path, data: Dict):
+    """Write JSON atomically (temp file + rename), formatted like url-mapping.json."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def cards_without_screenshots(records: List[Dict]) -> List[str]:
+    """URLs of records with no screenshot, in data file order, without duplicates."""
+    return list(dict.fromkeys(record['url'] for record in records if not record.get('screenshot')))
+
+
+def set_screenshots(records: List[Dict], names: Dict[str, str]) -> int:
+    """Set the screenshot of each record without one from {url: file name}."""
+    updated = 0
+    for record in records:
+        name = names.get(record['url'])
+        if name and not record.get('screenshot'):
+            record['screenshot'] = name
+            updated += 1
+    return updated
+
+
+def capture_missing(urls: List[str], concurrency: int, per_host_rate: float, failures: Dict) -> List[str]:
+    """Capture screenshots for `urls`; returns the URLs that now have one."""
+    captured = []
+    CAPTURE_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = [(url, CAPTURE_DIR / screenshot_filename(url)) for url in urls]
+
+    def on_result(url, tmp_path, ok, message):
+        final_path = SCREENSHOT_DIR / screenshot_filename(url)
+        problem = capture_problem(tmp_path) if ok else None
+        if ok and not problem:
+            os.replace(tmp_path, final_path)  # only complete captures get the real name
+            failures.pop(url, None)
+            captured.append(url)
+            print(f"  [{len(captured)}] ✅ {url}")
+            return
+        tmp_path.unlink(missing_ok=True)
+        record = failures.setdefault(url, {'attempts': 0})
+        record.update(attempts=record['attempts'] + 1, error=problem or message,
+                      last_attempt=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))
+        print(f"  ⚠️  {url} - {problem or message}")
+
+    try:
+        capture_batch(jobs, concurrency, per_host_rate, on_result=on_result)
+    except ImportError:
+        print("  ❌ Playwright not installed (pip install playwright && playwright install chromium)")
+    finally:
+        save_json(FAILURES_FILE, failures)
+    return captured
+
+
+def encode_new_screenshots():
+    """Encode screenshots not yet in the manifest, so the page can use the WebP/AVIF outputs."""
+    try:
+        formats = [fmt for fmt in variant_formats() if fmt in MIME_TYPES]
+    except ImportError:
+        formats = []
+    manifest = load_manifest()
+    width = manifest.get('width')
+    if not formats or not width:
+        print("  ⚠️  Skipping WebP/AVIF encoding; run tools/encode_screenshots.py")
+        return
+    sources = stale_sources(manifest, width, formats)
+    if sources:
+        print(f"\n🗜️  Encoding {len(sources)} screenshot(s)...")
+        encode_all(manifest, sources, width, formats)
+        save_manifest(manifest)
+
+
+def main():
+    limit = pop_option('--limit', None)
+    concurrency = int(pop_option('--concurrency', DEFAULT_CONCURRENCY))
+    per_host_rate = float(pop_option('--per-host-rate', DEFAULT_PER_HOST_RATE))
+    retry_failed = '--retry-failed' in sys.argv
+
+    records = load_records()
+    missing = cards_without_screenshots(records)
+    if '--check' in sys.argv:
+        for url in missing:
+            print(f"  {screenshot_filename(url)}  {url}")
+        print(f"\n{len(missing)} card(s) without screenshots")
+        return 0
+
+    failures = load_json(FAILURES_FILE)
+    on_disk = [url for url in missing if (SCREENSHOT_DIR / screenshot_filename(url)).exists()]
+    to_capture = [url for url in missing if url not in on_disk
+                  and (retry_failed or failures.get(url, {}).get('attempts', 0) < MAX_ATTEMPTS)]
+    skipped = len(missing) - len(on_disk) - len(to_capture)
+    if limit:
+        to_capture = to_capture[:int(limit)]
+
+    print(f"🔎 {len(missing)} card(s) without screenshots: {len(on_disk)} already captured, "
+          f"{len(to_capture)} to capture" + (f", {skipped} skipped after {MAX_ATTEMPTS} failures" if skipped else ""))
+    captured = []
+    if to_capture:
+        print(f"📸 Capturing with {concurrency} browser context(s), max {per_host_rate:g} page load(s)/s per host...\n")
+        captured = capture_missing(to_capture, concurrency, per_host_rate, failures)
+
+    names = {url: screenshot_filename(url) for url in on_disk + captured}
+    if not names:
+        print("\n✅ No new screenshots")
+        return 0
+
+    url_mapping = load_json(URL_MAPPING)
+    url_mapping.update(names)
+    save_json(URL_MAPPING, url_mapping)
+
+    updated = set_screenshots(records, names)
+    save_records(records)
+    print(f"\n✅ Added {updated} screenshot(s) to {DATA_FILE.name}")
+    encode_new_screenshots()
+    build()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,57 +1,115 @@
 #!/usr/bin/env python3
 """
 Check all URLs across all HTML files on the site for safety.
+
+Every HTML file under the site root (subdirectories included) is tokenized
+once with html.parser, in parallel. Each URL is classified by context
+(anchor, resource, text, script, comment) and reported with its line and
+column; URLs are deduplicated across files so each is checked only once.
+
+The card URLs of chat-resources.html are also read from its data file,
+tools/data/chat-resources.json, so links added there are checked before
+the page is rebuilt from it.
+
+With --since <rev>, only HTML files changed since that git revision are
+read and only URLs that were not already in those files (or in the data
+file) at <rev> are checked, which keeps pull request checks to a few
+seconds.
+
+Verdicts are cached in tools/.cache/url-verdicts.json and reused until the
+ruleset changes; pass --no-cache to re-check every URL.
 """
 
+import argparse
+import json
 import re
-import os
+from collections import defaultdict
 from pathlib import Path
-from check_url_safety import URLSafetyChecker
+from html_urls import (URLOccurrence, changed_html_files, extract_from_files, extract_occurrences,
+                       extract_occurrences_from_string, file_at_revision, find_html_files,
+                       new_since, resolve_revision, unique_urls)
+from url_safety_service import get_checker
+from verdict_cache import VerdictCache
 
 def extract_urls_from_html(file_path):
     """Extract all URLs from an HTML file."""
-    urls = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-            # Find all href attributes
-            href_pattern = r'<a[^>]+href=["\'](https?://[^"\']+)["\']'
-            urls.extend(re.findall(href_pattern, content))
-            
-            # Find all src attributes (images, scripts, iframes, etc.)
-            src_pattern = r'<(?:img|script|iframe|source|video|audio)[^>]+src=["\'](https?://[^"\']+)["\']'
-            urls.extend(re.findall(src_pattern, content))
-            
-            # Find any other http/https URLs that might be in content
-            # (but not in comments or script blocks)
-            url_pattern = r'https?://[^\s<>"\']+[^\s<>"\'.,;:!?)]'
-            urls.extend(re.findall(url_pattern, content))
-            
+        return unique_urls(extract_occurrences(file_path))
     except Exception as e:
         print(f"  ⚠️  Error reading {file_path}: {e}")
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_urls = []
-    for url in urls:
-        if url not in seen:
-            seen.add(url)
-            unique_urls.append(url)
-    
-    return unique_urls
+        return []
+
+CHAT_DATA_FILE = Path(__file__).parent / 'data' / 'chat-resources.json'
+_DATA_URL = re.compile(r'"url":\s*("(?:[^"\\]|\\.)*")')
+
+def chat_data_occurrences(workspace_root, since=None):
+    """Card URLs in the chat-resources data file, as anchors (only those new since `since`)."""
+    name = CHAT_DATA_FILE.relative_to(workspace_root).as_posix()
+    occurrences = []
+    with open(CHAT_DATA_FILE, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            match = _DATA_URL.search(line)
+            if match:
+                occurrences.append(URLOccurrence(json.loads(match.group(1)), name, line_number,
+                                                 match.start(1) + 1, 'anchor', 'a'))
+    if since:
+        data = file_at_revision(workspace_root, since, name)
+        if data:
+            previous = {record['url'] for record in json.loads(data)}
+        else:
+            # Before the data file existed the cards were written into the page
+            page = file_at_revision(workspace_root, since, 'chat-resources.html')
+            previous = set(unique_urls(extract_occurrences_from_string(page, 'chat-resources.html')))
+        occurrences = [o for o in occurrences if o.url not in previous]
+    return occurrences
+
+def format_location(occurrence):
+    return f"{occurrence.file}:{occurrence.line}:{occurrence.column} ({occurrence.context})"
 
 def main():
-    # Find all HTML files
+    parser = argparse.ArgumentParser(description="Check every URL on the site for safety")
+    parser.add_argument('--no-cache', action='store_true', help='Re-check every URL instead of reusing cached verdicts')
+    parser.add_argument('--workers', type=int, default=None, help='Processes used to parse HTML files (default: CPU count)')
+    parser.add_argument('--since', metavar='REV', help='Only check URLs added or changed since this git revision')
+    args = parser.parse_args()
+
     workspace_root = Path(__file__).parent.parent
-    html_files = sorted(workspace_root.glob('*.html'))
+    if args.since:
+        try:
+            resolve_revision(workspace_root, args.since)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 2
+        html_files = changed_html_files(workspace_root, args.since)
+    else:
+        # Find all HTML files, including subdirectories
+        html_files = find_html_files(workspace_root)
     
     print("=" * 80)
     print("COMPREHENSIVE SITE-WIDE URL SAFETY CHECK")
+    if args.since:
+        print(f"(URLs added or changed since {args.since})")
     print("=" * 80)
     print()
     
-    checker = URLSafetyChecker()
+    checker = get_checker()
+    cache = VerdictCache(checker.ruleset_version(), enabled=not args.no_cache)
+    
+    # Tokenize every file once (in parallel), then check each unique URL once
+    extracted = extract_from_files(html_files, workspace_root, workers=args.workers)
+    if args.since:
+        for filename, data in extracted.items():
+            data['occurrences'] = new_since(workspace_root, args.since, filename, data['occurrences'])
+    if CHAT_DATA_FILE.exists():
+        data_occurrences = chat_data_occurrences(workspace_root, args.since)
+        if data_occurrences or not args.since:
+            extracted[CHAT_DATA_FILE.relative_to(workspace_root).as_posix()] = {
+                'occurrences': data_occurrences, 'error': None}
+    occurrences_by_url = defaultdict(list)
+    for filename, data in extracted.items():
+        for occurrence in data['occurrences']:
+            occurrences_by_url[occurrence.url].append(occurrence)
+    verdicts = dict(cache.check_batch(checker, list(occurrences_by_url)))
     
     all_results = {
         'safe': [],
@@ -61,10 +119,11 @@ def main():
     
     file_results = {}
     
-    # Check each HTML file
-    for html_file in html_files:
-        print(f"📄 Checking: {html_file.name}")
-        urls = extract_urls_from_html(html_file)
+    for filename, data in extracted.items():
+        print(f"📄 Checking: {filename}")
+        if data['error']:
+            print(f"  ⚠️  Error reading {filename}: {data['error']}")
+        urls = unique_urls(data['occurrences'])
         
         if not urls:
             print(f"   No URLs found\n")
@@ -77,22 +136,22 @@ def main():
         file_unsafe = []
         
         for url in urls:
-            result = checker.check_url(url)
+            result = verdicts[url]
             
             if not result['safe']:
                 # Unsafe - has errors
                 file_unsafe.append((url, result))
-                all_results['unsafe'].append((html_file.name, url, result))
+                all_results['unsafe'].append((filename, url, result))
             elif result['suspicious']:
                 # Safe but suspicious - has warnings
                 file_suspicious.append((url, result))
-                all_results['suspicious'].append((html_file.name, url, result))
+                all_results['suspicious'].append((filename, url, result))
             else:
                 # Safe - no issues
                 file_safe.append((url, result))
-                all_results['safe'].append((html_file.name, url, result))
+                all_results['safe'].append((filename, url, result))
         
-        file_results[html_file.name] = {
+        file_results[filename] = {
             'safe': file_safe,
             'suspicious': file_suspicious,
             'unsafe': file_unsafe,
@@ -113,14 +172,19 @@ def main():
     print()
     
     total_urls = len(all_results['safe']) + len(all_results['suspicious']) + len(all_results['unsafe'])
+    percent_base = total_urls or 1
     
     print(f"Total HTML files scanned: {len(html_files)}")
-    print(f"Total URLs checked: {total_urls}")
+    print(f"Total URLs checked: {total_urls} ({len(occurrences_by_url)} unique)")
+    print()
+    print(f"  ✅ Safe:        {len(all_results['safe'])} ({len(all_results['safe'])/percent_base*100:.1f}%)")
+    print(f"  ⚠️  Suspicious:  {len(all_results['suspicious'])} ({len(all_results['suspicious'])/percent_base*100:.1f}%)")
+    print(f"  ❌ Unsafe:      {len(all_results['unsafe'])} ({len(all_results['unsafe'])/percent_base*100:.1f}%)")
     print()
-    print(f"  ✅ Safe:        {len(all_results['safe'])} ({len(all_results['safe'])/total_urls*100:.1f}%)")
-    print(f"  ⚠️  Suspicious:  {len(all_results['suspicious'])} ({len(all_results['suspicious'])/total_urls*100:.1f}%)")
-    print(f"  ❌ Unsafe:      {len(all_results['unsafe'])} ({len(all_results['unsafe'])/total_urls*100:.1f}%)")
+    print(cache.summary())
+    print(f"Checker: {checker.mode}")
     print()
+    cache.save()
     
     # Detailed results by file
     if any(file_results[f]['suspicious'] or file_results[f]['unsafe'] for f in file_results):
@@ -141,6 +205,9 @@ def main():
                     print("   ❌ UNSAFE URLs:")
                     for url, result in results['unsafe']:
                         print(f"      • {url}")
+                        for occurrence in occurrences_by_url[url]:
+                            if occurrence.file == filename:
+                                print(f"        @ {format_location(occurrence)}")
                         for reason in result['errors']:
                             print(f"        - {reason}")
                     print()
@@ -149,6 +216,9 @@ def main():
                     print("   ⚠️  SUSPICIOUS URLs:")
                     for url, result in results['suspicious']:
                         print(f"      • {url}")
+                        for occurrence in occurrences_by_url[url]:
+                            if occurrence.file == filename:
+                                print(f"        @ {format_location(occurrence)}")
                         for reason in result['warnings']:
                             print(f"        - {reason}")
                     print()
@@ -162,6 +232,9 @@ def main():
         for filename, url, result in all_results['suspicious']:
             print(f"📄 {filename}")
             print(f"   {url}")
+            for occurrence in occurrences_by_url[url]:
+                if occurrence.file == filename:
+                    print(f"   @ {format_location(occurrence)}")
             for reason in result['warnings']:
                 print(f"   - {reason}")
             print()
@@ -175,6 +248,9 @@ def main():
         for filename, url, result in all_results['unsafe']:
             print(f"📄 {filename}")
             print(f"   {url}")
+            for occurrence in occurrences_by_url[url]:
+                if occurrence.file == filename:
+                    print(f"   @ {format_location(occurrence)}")
             for reason in result['errors']:
                 print(f"   - {reason}")
             print()
@@ -1,26 +1,60 @@
 #!/usr/bin/env python3
 """
-Extract and check all URLs from chat-resources.html
+Check all card URLs of chat-resources.html
+
+The URLs are read from the page's data file, tools/data/chat-resources.json.
+
+Verdicts are cached in tools/.cache/url-verdicts.json and reused until the
+ruleset changes; pass --no-cache to re-check every URL. Pass --since <rev>
+to check only cards added or changed since that git revision.
 """
+import argparse
+import json
 import re
 import sys
 sys.path.insert(0, 'tools')
-from check_url_safety import URLSafetyChecker
+from html_urls import file_at_revision, resolve_revision
+from url_safety_service import get_checker
+from verdict_cache import VerdictCache
+
+parser = argparse.ArgumentParser(description="Check the card links in chat-resources.html")
+parser.add_argument('--no-cache', action='store_true', help='Re-check every URL instead of reusing cached verdicts')
+parser.add_argument('--since', metavar='REV', help='Only check URLs added or changed since this git revision')
+args = parser.parse_args()
+
+DATA_FILE = 'tools/data/chat-resources.json'
+
+
+def revision_urls(rev):
+    """Card URLs at `rev`, from the data file or, before it existed, the page itself."""
+    data = file_at_revision('.', rev, DATA_FILE)
+    if data:
+        return {record['url'] for record in json.loads(data)}
+    return set(re.findall(r'<a href="([^"]+)" class="card-link"', file_at_revision('.', rev, 'chat-resources.html')))
 
-# Read chat-resources.html
-with open('chat-resources.html', 'r', encoding='utf-8') as f:
-    content = f.read()
 
-# Extract all URLs from <a href="..." class="card-link">
-pattern = r'<a href="([^"]+)" class="card-link"'
-urls = re.findall(pattern, content)
+# Read the card URLs
+with open(DATA_FILE, 'r', encoding='utf-8') as f:
+    urls = [record['url'] for record in json.load(f)]
 
-print(f"Found {len(urls)} URLs in chat-resources.html\n")
+if args.since:
+    try:
+        resolve_revision('.', args.since)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+    previous = revision_urls(args.since)
+    urls = [url for url in dict.fromkeys(urls) if url not in previous]
+    print(f"Found {len(urls)} new or changed URLs in chat-resources.html since {args.since}\n")
+else:
+    print(f"Found {len(urls)} URLs in chat-resources.html\n")
 print("Running safety checks...\n")
 print("=" * 70)
 
-checker = URLSafetyChecker()
-results = checker.check_batch(urls)
+checker = get_checker()
+cache = VerdictCache(checker.ruleset_version(), enabled=not args.no_cache)
+results = cache.check_batch(checker, urls)
+cache.save()
 
 # Categorize results
 safe = []
@@ -43,6 +77,8 @@ print(f"Total URLs checked: {len(urls)}")
 print(f"  ✅ Safe:        {len(safe)}")
 print(f"  ⚠️  Suspicious:  {len(suspicious)}")
 print(f"  ❌ Unsafe:      {len(unsafe)}")
+print(cache.summary())
+print(f"Checker: {checker.mode}")
 print(f"{'=' * 70}\n")
 
 # Show unsafe URLs
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Link-rot and redirect-chain checker for outbound links on the site.
+
+Resolves every outbound link in resources.html, chat-resources.html and
+news.html (or any pages/URLs given) with an asyncio HTTP/1.1 client that
+keeps connections pooled per host:
+
+- HEAD first, falling back to a ranged GET (bytes=0-0) when HEAD is refused
+- per-host concurrency limit plus an overall request-rate cap
+- redirect chains, final status and latency recorded per URL
+- results persisted in tools/.cache/link-check.json; re-runs only re-check
+  URLs whose last result is older than --max-age
+
+Standard library only. tools/link_check_fixture.py serves a local stand-in
+site with redirects, HEAD-refusing and broken endpoints for trying it out.
+
+Usage:
+    python3 tools/check_links.py
+    python3 tools/check_links.py --max-age 72 --per-host 2 --rate 10
+    python3 tools/check_links.py --urls urls.txt
+    python3 tools/check_links.py resources.html news.html
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import ssl
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from html_urls import extract_occurrences, unique_urls
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+DEFAULT_PAGES = ['resources.html', 'chat-resources.html', 'news.html']
+RESULTS_FILE = Path(__file__).parent / '.cache' / 'link-check.json'
+
+USER_AGENT = 'Mozilla/5.0 (compatible; CSOH-linkcheck/1.0; +https://csoh.org)'
+MAX_REDIRECTS = 10
+REQUEST_TIMEOUT = 15  # seconds
+MAX_DRAIN_BYTES = 64 * 1024  # larger bodies close the connection instead of being read
+MAX_IDLE_PER_HOST = 4
+
+# HEAD responses that usually mean "try GET instead"
+HEAD_FALLBACK_STATUSES = {400, 403, 404, 405, 406, 429, 500, 501, 503}
+
+
+def extract_links(html_path: Path) -> List[str]:
+    """Return outbound http(s) anchor hrefs from an HTML page, in order."""
+    return unique_urls(o for o in extract_occurrences(html_path) if o.context == 'anchor')
+
+
+class HTTPError(Exception):
+    """Transport-level failure (DNS, TLS, timeout, malformed response)."""
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, pooled per (scheme, host, port)."""
+
+    def __init__(self):
+        self._idle: Dict[Tuple[str, str, int], List] = defaultdict(list)
+        self._ssl = ssl.create_default_context()
+
+    async def _connect(self, scheme: str, host: str, port: int):
+        if scheme == 'https':
+            return await asyncio.open_connection(host, port, ssl=self._ssl, server_hostname=host)
+        return await asyncio.open_connection(host, port)
+
+    async def request(self, method: str, url: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str]]:
+        """Send one request and return (status, lowercased headers)."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = parts.hostname
+        if scheme not in ('http', 'https') or not host:
+            raise HTTPError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, host, port)
+        target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+        host_header = host if parts.port is None else f'{host}:{port}'
+        lines = [f'{method} {target} HTTP/1.1', f'Host: {host_header}',
+                 f'User-Agent: {USER_AGENT}', 'Accept: */*', 'Accept-Encoding: identity']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1', errors='replace')
+
+        # Reuse an idle connection if possible; retry once on a fresh one if it went stale
+        for attempt in range(2):
+            reused = bool(self._idle[key]) and attempt == 0
+            reader, writer = self._idle[key].pop() if reused else await self._connect(scheme, host, port)
+            try:
+                writer.write(payload)
+                await writer.drain()
+                status, response_headers, keep_alive = await self._read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused:
+                    continue
+                raise HTTPError(f"Connection failed: {e}") from e
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive and len(self._idle[key]) < MAX_IDLE_PER_HOST:
+                self._idle[key].append((reader, writer))
+            else:
+                writer.close()
+            return status, response_headers
+
+        raise HTTPError("Connection failed")
+
+    async def _read_response(self, reader, method: str):
+        status_line = await reader.readline()
+        match = re.match(rb'HTTP/(\d\.\d) (\d{3})', status_line)
+        if not match:
+            raise HTTPError(f"Malformed status line: {status_line[:80]!r}")
+        version, status = match.group(1), int(match.group(2))
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version == b'1.1' or connection == 'keep-alive')
+
+        # Bodies: none for HEAD/1xx/204/304, otherwise drain small ones or give up the connection
+        if method == 'HEAD' or status < 200 or status in (204, 304):
+            return status, headers, keep_alive
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            return status, headers, keep_alive and await self._drain_chunked(reader)
+        length = headers.get('content-length')
+        if length is not None and length.isdigit():
+            if int(length) > MAX_DRAIN_BYTES:
+                return status, headers, False
+            await reader.readexactly(int(length))
+            return status, headers, keep_alive
+        return status, headers, False
+
+    async def _drain_chunked(self, reader) -> bool:
+        drained = 0
+        while True:
+            size_line = await reader.readline()
+            try:
+                size = int(size_line.split(b';')[0].strip() or b'0', 16)
+            except ValueError:
+                return False
+            if size == 0:
+                # Trailers end with a blank line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return True
+            drained += size
+            if drained > MAX_DRAIN_BYTES:
+                return False
+            await reader.readexactly(size + 2)
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+class RateLimiter:
+    """Spaces requests so no more than `rate` start per second overall."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LinkChecker:
+    """Resolve URLs concurrently with per-host and global politeness limits."""
+
+    def __init__(self, per_host: int = 2, concurrency: int = 20, rate: float = 10.0,
+                 timeout: float = REQUEST_TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self._pool = ConnectionPool()
+        self._global = asyncio.Semaphore(concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._rate = RateLimiter(rate)
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = (urlsplit(url).hostname or '').lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _fetch(self, method: str, url: str) -> Tuple[int, Dict[str, str]]:
+        headers = {'Range': 'bytes=0-0'} if method == 'GET' else {}
+        # Take the host slot first so a busy host doesn't hold global slots
+        async with self._host_slot(url), self._global:
+            await self._rate.wait()
+            return await asyncio.wait_for(self._pool.request(method, url, headers), self.timeout)
+
+    async def _hop(self, url: str) -> Tuple[int, Dict[str, str], str]:
+        """One hop: HEAD, or ranged GET when HEAD fails or is refused."""
+        try:
+            status, headers = await self._fetch('HEAD', url)
+            if status not in HEAD_FALLBACK_STATUSES:
+                return status, headers, 'HEAD'
+        except (HTTPError, OSError, asyncio.TimeoutError):
+            pass
+        status, headers = await self._fetch('GET', url)
+        return status, headers, 'GET'
+
+    async def check(self, url: str) -> Dict:
+        """Follow `url` to its final destination and describe what happened."""
+        started = time.perf_counter()
+        chain = []
+        current = url
+        result = {'url': url, 'status': None, 'final_url': None, 'chain': chain, 'error': None}
+
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                status, headers, method = await self._hop(current)
+                chain.append({'url': current, 'status': status, 'method': method})
+                location = headers.get('location')
+                if 300 <= status < 400 and location:
+                    current = urljoin(current, location)
+                    continue
+                result['status'] = status
+                result['final_url'] = current
+                break
+            else:
+                result['error'] = f"Too many redirects (>{MAX_REDIRECTS})"
+        except asyncio.TimeoutError:
+            result['error'] = f"Timed out after {self.timeout:g}s"
+        except (HTTPError, OSError, ssl.SSLError, ValueError) as e:
+            result['error'] = str(e) or e.__class__.__name__
+
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000)
+        result['checked_at'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        return result
+
+    async def check_all(self, urls: List[str], on_result=None) -> List[Dict]:
+        async def run(url):
+            result = await self.check(url)
+            if on_result:
+                on_result(result)
+            return result
+
+        try:
+            return await asyncio.gather(*(run(url) for url in urls))
+        finally:
+            self._pool.close()
+
+
+def classify(result: Dict) -> str:
+    """'ok', 'redirected', 'broken' or 'error'."""
+    if result.get('error'):
+        return 'error'
+    status = result.get('status') or 0
+    if status >= 400:
+        return 'broken'
+    if len(result.get('chain', [])) > 1:
+        return 'redirected'
+    return 'ok'
+
+
+def load_results(path: Path = RESULTS_FILE) -> Dict[str, Dict]:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_results(results: Dict[str, Dict], path: Path = RESULTS_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def is_fresh(result: Optional[Dict], max_age: timedelta) -> bool:
+    if not result or not result.get('checked_at'):
+        return False
+    try:
+        checked_at = datetime.fromisoformat(result['checked_at'])
+    except ValueError:
+        return False
+    return datetime.now(timezone.utc) - checked_at < max_age
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check outbound links for rot and redirect chains")
+    parser.add_argument('pages', nargs='*', help=f"HTML pages to scan (default: {', '.join(DEFAULT_PAGES)})")
+    parser.add_argument('--urls', type=Path, help='Check URLs listed in this file instead of scanning pages')
+    parser.add_argument('--max-age', type=float, default=168,
+                        help='Re-check URLs whose last result is older than this many hours (default: 168)')
+    parser.add_argument('--force', action='store_true', help='Re-check every URL regardless of age')
+    parser.add_argument('--per-host', type=int, default=2, help='Concurrent requests per host (default: 2)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent requests overall (default: 20)')
+    parser.add_argument('--rate', type=float, default=10, help='Max requests started per second (default: 10)')
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT, help='Per-request timeout in seconds')
+    parser.add_argument('--results', type=Path, default=RESULTS_FILE, help='Results file')
+    args = parser.parse_args()
+
+    if args.urls:
+        with open(args.urls, 'r', encoding='utf-8') as f:
+            urls = list(dict.fromkeys(line.strip() for line in f if line.strip() and not line.startswith('#')))
+    else:
+        urls = []
+        for page in args.pages or DEFAULT_PAGES:
+            path = Path(page) if Path(page).exists() else WORKSPACE_ROOT / page
+            page_urls = extract_links(path)
+            print(f"📄 {path.name}: {len(page_urls)} outbound link(s)")
+            urls.extend(page_urls)
+        urls = list(dict.fromkeys(urls))
+
+    results = load_results(args.results)
+    max_age = timedelta(hours=args.max_age)
+    due = [url for url in urls if args.force or not is_fresh(results.get(url), max_age)]
+
+    print(f"\n🔗 {len(urls)} unique URL(s), {len(due)} due for checking "
+          f"({len(urls) - len(due)} fresh within {args.max_age:g}h)\n")
+
+    started = time.perf_counter()
+    done = 0
+
+    def on_result(result):
+        nonlocal done
+        done += 1
+        results[result['url']] = result
+        kind = classify(result)
+        icon = {'ok': '✅', 'redirected': '↪️ ', 'broken': '❌', 'error': '⚠️ '}[kind]
+        detail = result['error'] or f"{result['status']} ({len(result['chain']) - 1} redirect(s))"
+        print(f"  [{done}/{len(due)}] {icon} {result['url']} → {detail} {result['latency_ms']}ms")
+        if done % 50 == 0:
+            save_results(results, args.results)
+
+    if due:
+        checker = LinkChecker(args.per_host, args.concurrency, args.rate, args.timeout)
+        asyncio.run(checker.check_all(due, on_result))
+        save_results(results, args.results)
+
+    elapsed = time.perf_counter() - started
+    counts = defaultdict(int)
+    for url in urls:
+        if url in results:
+            counts[classify(results[url])] += 1
+
+    print(f"\n{'=' * 70}")
+    print("LINK CHECK SUMMARY")
+    print(f"{'=' * 70}")
+    print(f"Checked {len(due)} URL(s) in {elapsed:.1f}s")
+    print(f"  ✅ OK:          {counts['ok']}")
+    print(f"  ↪️  Redirected:  {counts['redirected']}")
+    print(f"  ❌ Broken:      {counts['broken']}")
+    print(f"  ⚠️  Errors:      {counts['error']}")
+    print(f"{'=' * 70}")
+
+    broken = [results[url] for url in urls if url in results and classify(results[url]) == 'broken']
+    if broken:
+        print(f"\n❌ BROKEN LINKS ({len(broken)}):")
+        for result in broken:
+            print(f"  • {result['url']} → {result['status']}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
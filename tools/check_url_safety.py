@@ -5,20 +5,35 @@ URL Safety Checker for CSOH Chat Resources
 Validates URLs before adding them to chat-resources.html by checking:
 - URL format and structure
 - Suspicious patterns (phishing indicators)
-- Optional: Google Safe Browsing API / VirusTotal API
-- Domain reputation
+- Blocklists (hand-picked and compiled threat-intel feeds)
+- Homoglyph/IDN lookalikes of trusted and popular domains
+- Domain reputation (offline Safe Browsing-style hash-prefix database)
 
 Usage:
     python3 tools/check_url_safety.py <url>
     python3 tools/check_url_safety.py --batch urls.txt
+    python3 tools/check_url_safety.py --stream urls.txt [--workers N] [--chunk-size N] [--output verdicts.jsonl]
     python3 tools/check_url_safety.py --interactive
 """
 
 import sys
 import re
+import os
+import time
+import hashlib
+from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 from urllib.parse import urlparse
 import json
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+from domain_blocklist import CompiledBlocklist, load_default_blocklist
+from homoglyphs import CONFUSABLES_FILE, POPULAR_DOMAINS_FILE, PROTECTED_DOMAINS_FILE, default_index, mixed_script_labels, to_unicode
+from public_suffix import PSL_FILE, DomainRuleSet
+from url_reputation import ReputationDB
+
+# Modules whose code decides verdicts; their source is part of ruleset_version()
+RULESET_MODULES = (__name__, 'domain_blocklist', 'homoglyphs', 'public_suffix', 'url_reputation')
 
 # Suspicious patterns that might indicate malicious URLs
 SUSPICIOUS_PATTERNS = [
@@ -32,7 +47,9 @@ SUSPICIOUS_PATTERNS = [
     r'-{10,}',  # Excessive dashes (obfuscation technique)
 ]
 
-# Known malicious or spam domains (add to this list as needed)
+# Known malicious or spam domains (add to this list as needed).
+# Large threat-intel feeds belong in tools/data/blocklist.db instead
+# (see tools/domain_blocklist.py).
 BLOCKLIST = [
     'malicious-example.com',
     'spam-domain.tk',
@@ -58,9 +75,25 @@ WHITELIST = [
 
 
 class URLSafetyChecker:
-    def __init__(self):
+    def __init__(self, blocklist_db=None, reputation_db=None):
         self.warnings = []
         self.errors = []
+        self.reputation_verdict = None
+        # Matched on exact domain or subdomain, never by substring
+        self.blocklist = DomainRuleSet(BLOCKLIST, stop_at_registrable=False)
+        self.whitelist = DomainRuleSet(WHITELIST)
+        # Skeleton index of WHITELIST + protected/popular domain lists for spoof detection
+        self.lookalikes = default_index(WHITELIST)
+        # Optional memory-mapped threat-intel list (tools/data/blocklist.db)
+        if blocklist_db is None:
+            self.compiled_blocklist = load_default_blocklist()
+        else:
+            self.compiled_blocklist = CompiledBlocklist(blocklist_db)
+        # Optional offline hash-prefix reputation store (tools/data/reputation/)
+        if reputation_db is None:
+            self.reputation = ReputationDB.open_default()
+        else:
+            self.reputation = ReputationDB(reputation_db)
         
     def check_url(self, url: str) -> Dict:
         """
@@ -69,6 +102,7 @@ class URLSafetyChecker:
         """
         self.warnings = []
         self.errors = []
+        self.reputation_verdict = None
         
         # Basic validation
         if not url or not isinstance(url, str):
@@ -92,20 +126,55 @@ class URLSafetyChecker:
         if parsed.scheme == 'http':
             self.warnings.append("Uses HTTP (not HTTPS) - may be insecure")
             
-        # Check domain
-        domain = parsed.netloc.lower()
+        # Check domain (hostname only, so 'user@host:port' can't hide the real host)
+        try:
+            domain = (parsed.hostname or '').rstrip('.')
+        except ValueError as e:
+            self.errors.append(f"Failed to parse URL: {e}")
+            return self._result(False)
         if not domain:
             self.errors.append("No domain found in URL")
             return self._result(False)
             
         # Check against blocklist
-        for blocked in BLOCKLIST:
-            if blocked in domain:
-                self.errors.append(f"Domain '{domain}' is on blocklist")
+        blocked = self.blocklist.match(domain)
+        if not blocked and self.compiled_blocklist is not None:
+            blocked = self.compiled_blocklist.match(domain)
+        if blocked:
+            self.errors.append(f"Domain '{domain}' is on blocklist ({blocked})")
+            return self._result(False)
+        
+        # Check local reputation database (applies to whitelisted hosts too)
+        if self.reputation is not None:
+            reputation = self.reputation.lookup(url)
+            self.reputation_verdict = reputation['verdict']
+            if reputation['verdict'] == 'listed':
+                self.errors.append(
+                    f"Listed in reputation database as {reputation['threat_type']} "
+                    f"({reputation['expression']})"
+                )
                 return self._result(False)
+            if reputation['verdict'] == 'unconfirmed':
+                self.warnings.append(
+                    f"Reputation prefix match without local full-hash confirmation "
+                    f"({reputation['expression']})"
+                )
+        
+        # Check for lookalikes of trusted/popular domains (IDN homographs, rn/m tricks)
+        unicode_domain = to_unicode(domain)
+        lookalike = self.lookalikes.lookalike(unicode_domain)
+        if lookalike is not None and lookalike.non_ascii:
+            self.errors.append(
+                f"Possible homograph of '{lookalike.target}': '{lookalike.host}' ({domain})"
+            )
+            return self._result(False)
+        if lookalike is not None:
+            self.warnings.append(f"Domain '{lookalike.host}' looks like '{lookalike.target}'")
+        for label in mixed_script_labels(unicode_domain):
+            self.warnings.append(f"Mixed-script domain label: '{label}'")
         
         # Check if whitelisted (skip pattern checks)
-        is_whitelisted = any(whitelist in domain for whitelist in WHITELIST)
+        is_whitelisted = self.whitelist.match(domain) is not None
         
         if not is_whitelisted:
             # Check suspicious patterns
@@ -125,12 +194,35 @@ class URLSafetyChecker:
         # No critical errors
         return self._result(True)
     
+    def ruleset_version(self) -> str:
+        """Fingerprint of everything that can change a verdict.
+
+        Covers the patterns, allow/block lists, the source of the checker and of
+        the tools modules it imports, the bundled suffix list, confusables and
+        protected/popular domain tables and the compiled blocklist/reputation
+        database versions. Used to invalidate cached verdicts (see verdict_cache.py).
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([SUSPICIOUS_PATTERNS, sorted(self.blocklist.domains),
+                                  sorted(self.whitelist.domains)]).encode('utf-8'))
+        for module in RULESET_MODULES:
+            digest.update(Path(sys.modules[module].__file__).read_bytes())
+        for data_file in (PSL_FILE, CONFUSABLES_FILE, PROTECTED_DOMAINS_FILE, POPULAR_DOMAINS_FILE):
+            if data_file.exists():
+                digest.update(data_file.read_bytes())
+        if self.compiled_blocklist is not None:
+            digest.update(f"blocklist:{self.compiled_blocklist.version}".encode('utf-8'))
+        if self.reputation is not None:
+            digest.update(f"reputation:{self.reputation.version}".encode('utf-8'))
+        return digest.hexdigest()[:16]
+
     def _result(self, safe: bool) -> Dict:
         return {
             'safe': safe and len(self.errors) == 0,
             'warnings': self.warnings,
             'errors': self.errors,
             'suspicious': len(self.warnings) > 0,
+            'reputation': self.reputation_verdict,
         }
     
     def check_batch(self, urls: List[str]) -> List[Tuple[str, Dict]]:
@@ -142,6 +234,127 @@ class URLSafetyChecker:
         return results
 
 
+# Per-process checker used by stream_check() workers
+_worker_checker = None
+
+
+def _check_chunk(urls: List[str]) -> List[Tuple[str, Dict]]:
+    """Check one chunk of URLs inside a worker process."""
+    global _worker_checker
+    if _worker_checker is None:
+        _worker_checker = URLSafetyChecker()
+    return _worker_checker.check_batch(urls)
+
+
+def iter_urls(lines: Iterable[str]) -> Iterator[str]:
+    """Yield non-empty, non-comment URLs from an iterable of lines."""
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith('#'):
+            yield url
+
+
+def stream_check(urls: Iterable[str], workers: int = None,
+                 chunk_size: int = 500) -> Iterator[Tuple[str, Dict]]:
+    """Check URLs across a process pool, yielding results as chunks complete.
+
+    URLs are consumed lazily and at most two chunks per worker are in
+    flight, so memory stays constant however long the input is. Results
+    are yielded in completion order, not input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    url_iter = iter(urls)
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            chunk = list(islice(url_iter, chunk_size))
+            if chunk:
+                pending.add(pool.submit(_check_chunk, chunk))
+            if pending and (not chunk or len(pending) >= workers * 2):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            if not chunk and not pending:
+                break
+
+
+def stream_mode(args: List[str]) -> int:
+    """Run --stream: JSONL verdicts to stdout (or --output); progress and errors to stderr."""
+    if not args:
+        print("Error: --stream requires a filename (or - for stdin)", file=sys.stderr)
+        return 1
+
+    source = args[0]
+    options = {'--workers': None, '--chunk-size': 500, '--output': None}
+    rest = args[1:]
+    while rest:
+        flag = rest.pop(0)
+        if flag not in options or not rest:
+            print(f"Error: unknown or incomplete option '{flag}'", file=sys.stderr)
+            return 1
+        options[flag] = rest.pop(0)
+
+    try:
+        workers = int(options['--workers']) if options['--workers'] else None
+        chunk_size = int(options['--chunk-size'])
+    except ValueError:
+        print("Error: --workers and --chunk-size must be integers", file=sys.stderr)
+        return 1
+    if chunk_size < 1 or (workers is not None and workers < 1):
+        print("Error: --workers and --chunk-size must be positive", file=sys.stderr)
+        return 1
+
+    try:
+        infile = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        print(f"Error: File '{source}' not found", file=sys.stderr)
+        return 1
+    try:
+        outfile = open(options['--output'], 'w', encoding='utf-8') if options['--output'] else sys.stdout
+    except OSError as e:
+        print(f"Error: cannot write '{options['--output']}': {e.strerror}", file=sys.stderr)
+        if infile is not sys.stdin:
+            infile.close()
+        return 1
+
+    counts = {'safe': 0, 'suspicious': 0, 'unsafe': 0}
+    started = last_report = time.perf_counter()
+    checked = 0
+
+    try:
+        for url, result in stream_check(iter_urls(infile), workers, chunk_size):
+            outfile.write(json.dumps({'url': url, **result}, ensure_ascii=False) + '\n')
+            checked += 1
+            if not result['safe']:
+                counts['unsafe'] += 1
+            elif result['suspicious']:
+                counts['suspicious'] += 1
+            else:
+                counts['safe'] += 1
+
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                last_report = now
+                print(f"  … {checked:,} URLs ({checked / (now - started):,.0f}/s)", file=sys.stderr)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+
+    elapsed = time.perf_counter() - started
+    rate = checked / elapsed if elapsed > 0 else 0
+    print(f"\n{'=' * 60}", file=sys.stderr)
+    print(f"Checked {checked:,} URLs in {elapsed:.1f}s ({rate:,.0f} URLs/s)", file=sys.stderr)
+    print(f"  ✅ Safe: {counts['safe']:,}", file=sys.stderr)
+    print(f"  ⚠️  Suspicious: {counts['suspicious']:,}", file=sys.stderr)
+    print(f"  ❌ Unsafe: {counts['unsafe']:,}", file=sys.stderr)
+    print(f"{'=' * 60}", file=sys.stderr)
+
+    return 1 if counts['unsafe'] else 0
+
+
 def print_result(url: str, result: Dict, verbose: bool = True):
     """Pretty print check result"""
     status = "✅ SAFE" if result['safe'] else "❌ UNSAFE"
@@ -199,9 +412,15 @@ def main():
         print("Usage:")
         print("  Single URL:    python3 tools/check_url_safety.py <url>")
         print("  Batch file:    python3 tools/check_url_safety.py --batch urls.txt")
+        print("  Stream (JSONL): python3 tools/check_url_safety.py --stream urls.txt|- "
+              "[--workers N] [--chunk-size N] [--output out.jsonl]")
         print("  Interactive:   python3 tools/check_url_safety.py --interactive")
         sys.exit(1)
     
+    # Streaming parallel batch mode (doesn't need a checker in this process)
+    if sys.argv[1] == '--stream':
+        sys.exit(stream_mode(sys.argv[2:]))
+    
     checker = URLSafetyChecker()
     
     # Interactive mode
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Minimal option parsing shared by the tools/ command-line scripts.
+
+The scripts take positional arguments plus a few `--name value` options;
+pop_option() removes an option from sys.argv so the positional handling
+that follows sees only what is left.
+"""
+
+import sys
+
+
+def pop_option(name, default):
+    """Remove `name value` from sys.argv and return value (or default)."""
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv):
+            value = sys.argv[i + 1]
+            del sys.argv[i:i + 2]
+            return value
+        del sys.argv[i]
+    return default
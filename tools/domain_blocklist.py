@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Compact on-disk domain blocklist for the CSOH URL safety checker.
+
+Compiles large threat-intel domain lists (plain domain-per-line, hosts
+files or Adblock '||domain^' rules) into a single sorted binary file that
+is memory-mapped at lookup time. Nothing is loaded into Python objects up
+front, so opening a multi-million entry list takes well under a
+millisecond and each lookup is a binary search over the mapped file.
+
+File layout (all integers little-endian):
+    header   magic b'CSOHBL1\\0', entry count (u64), content digest (16 bytes)
+    hashes   count x u64   sorted 64-bit BLAKE2b hashes of each domain
+    offsets  (count + 1) x u32   start of each domain in the string blob
+    strings  domains concatenated in hash order (exact confirmation)
+
+Usage:
+    python3 tools/domain_blocklist.py compile -o tools/data/blocklist.db lists/*.txt
+    python3 tools/domain_blocklist.py lookup tools/data/blocklist.db evil.example.com
+    python3 tools/domain_blocklist.py info tools/data/blocklist.db
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from public_suffix import iter_parent_domains, normalize_host
+
+BLOCKLIST_DB = Path(__file__).parent / 'data' / 'blocklist.db'
+
+MAGIC = b'CSOHBL1\0'
+HEADER = struct.Struct('<8sQ16s')
+HASH = struct.Struct('<Q')
+OFFSET = struct.Struct('<I')
+
+# Hosts-file addresses that precede the blocked domain
+_HOSTS_PREFIXES = {'0.0.0.0', '127.0.0.1', '::', '::1'}
+_DOMAIN_RE = re.compile(r'^[a-z0-9_-]+(\.[a-z0-9_-]+)+$')
+
+
+def domain_hash(domain: str) -> int:
+    """64-bit hash used to order and probe entries."""
+    return int.from_bytes(hashlib.blake2b(domain.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def parse_list_line(line: str) -> Optional[str]:
+    """Extract a domain from one line of a blocklist, or None."""
+    line = line.split('#', 1)[0].strip()
+    if not line or line.startswith('!') or line.startswith('['):
+        return None
+
+    # Adblock syntax: ||example.com^
+    if line.startswith('||'):
+        line = line[2:].split('^', 1)[0]
+
+    # Hosts syntax: 0.0.0.0 example.com
+    parts = line.split()
+    if len(parts) >= 2 and parts[0] in _HOSTS_PREFIXES:
+        line = parts[1]
+    elif len(parts) != 1:
+        return None
+
+    domain = normalize_host(line)
+    if not _DOMAIN_RE.match(domain):
+        return None
+    return domain
+
+
+def iter_list_files(paths: Iterable[Path]) -> Iterator[str]:
+    """Yield every domain found in the given list files."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                domain = parse_list_line(line)
+                if domain:
+                    yield domain
+
+
+def compile_blocklist(domains: Iterable[str], output: Path) -> int:
+    """Write domains to `output` in the compiled format. Returns entry count."""
+    entries = sorted((domain_hash(d), d) for d in set(domains))
+
+    blob = bytearray()
+    offsets = []
+    digest = hashlib.blake2b(digest_size=16)
+    for _, domain in entries:
+        encoded = domain.encode('utf-8')
+        offsets.append(len(blob))
+        blob += encoded
+        digest.update(encoded + b'\n')
+    offsets.append(len(blob))
+
+    if len(blob) >= 2 ** 32:
+        raise ValueError("Blocklist string data exceeds 4 GiB")
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(output.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(entries), digest.digest()))
+        f.write(b''.join(HASH.pack(h) for h, _ in entries))
+        f.write(b''.join(OFFSET.pack(o) for o in offsets))
+        f.write(blob)
+    os.replace(tmp_path, output)
+
+    return len(entries)
+
+
+class CompiledBlocklist:
+    """Read-only, memory-mapped view of a compiled blocklist."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, digest = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a compiled CSOH blocklist")
+
+        self.version = digest.hex()
+        self._hashes_at = HEADER.size
+        self._offsets_at = self._hashes_at + self.count * HASH.size
+        self._strings_at = self._offsets_at + (self.count + 1) * OFFSET.size
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self.count
+
+    def _hash_at(self, index: int) -> int:
+        return HASH.unpack_from(self._mm, self._hashes_at + index * HASH.size)[0]
+
+    def _domain_at(self, index: int) -> bytes:
+        start, end = struct.unpack_from('<II', self._mm, self._offsets_at + index * OFFSET.size)
+        return self._mm[self._strings_at + start:self._strings_at + end]
+
+    def __contains__(self, domain: str) -> bool:
+        domain = normalize_host(domain)
+        if not domain or not self.count:
+            return False
+        wanted = domain_hash(domain)
+
+        # Lower bound binary search over the hash table
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._hash_at(mid) < wanted:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # Confirm against the stored string (handles hash collisions)
+        encoded = domain.encode('utf-8')
+        while lo < self.count and self._hash_at(lo) == wanted:
+            if self._domain_at(lo) == encoded:
+                return True
+            lo += 1
+        return False
+
+    def match(self, host: str) -> Optional[str]:
+        """Return the listed domain covering `host` (itself or any parent), or None.
+
+        Every parent is tried, not just those down to the registrable
+        domain, so a listed public suffix ('duckdns.org') covers its tenants.
+        """
+        for candidate in iter_parent_domains(host, stop_at_registrable=False):
+            if candidate in self:
+                return candidate
+        return None
+
+
+def load_default_blocklist() -> Optional[CompiledBlocklist]:
+    """Open tools/data/blocklist.db if it has been compiled, else None."""
+    if not BLOCKLIST_DB.exists():
+        return None
+    return CompiledBlocklist(BLOCKLIST_DB)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and query CSOH domain blocklists")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    compile_cmd = sub.add_parser('compile', help='Compile list files into a blocklist database')
+    compile_cmd.add_argument('lists', nargs='+', type=Path, help='Domain, hosts or Adblock list files')
+    compile_cmd.add_argument('-o', '--output', type=Path, default=BLOCKLIST_DB)
+
+    lookup_cmd = sub.add_parser('lookup', help='Check domains against a compiled database')
+    lookup_cmd.add_argument('db', type=Path)
+    lookup_cmd.add_argument('domains', nargs='+')
+
+    info_cmd = sub.add_parser('info', help='Show database details')
+    info_cmd.add_argument('db', type=Path)
+
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        started = time.perf_counter()
+        count = compile_blocklist(iter_list_files(args.lists), args.output)
+        elapsed = time.perf_counter() - started
+        size_kb = args.output.stat().st_size // 1024
+        print(f"✅ Compiled {count:,} domains into {args.output} ({size_kb:,} KB) in {elapsed:.1f}s")
+        return 0
+
+    started = time.perf_counter()
+    db = CompiledBlocklist(args.db)
+    opened_ms = (time.perf_counter() - started) * 1000
+
+    if args.command == 'info':
+        print(f"{args.db}: {len(db):,} domains, version {db.version} (opened in {opened_ms:.2f} ms)")
+        return 0
+
+    listed = 0
+    for domain in args.domains:
+        started = time.perf_counter()
+        hit = db.match(domain)
+        elapsed_us = (time.perf_counter() - started) * 1_000_000
+        if hit:
+            listed += 1
+            print(f"❌ {domain}: listed ({hit}) [{elapsed_us:.0f} µs]")
+        else:
+            print(f"✅ {domain}: not listed [{elapsed_us:.0f} µs]")
+    return 1 if listed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Embed preview images into the site's HTML at build time.
+
+main.js used to fetch the whole preview-mapping.json on every page load
+before it could attach previews. This step does the lookup once, at build
+time: for every .resource-card whose link has a mapping entry it writes
+
+    data-preview="img/previews/x.jpg"
+    data-preview-sources='[{"type": "image/avif", "srcset": "..."}, ...]'
+
+onto the card's start tag (sources only when WebP/AVIF variants exist),
+plus data-preview-lqip with the entry's inline placeholder. Static
+<img class="resource-preview"> tags pointing at local files (chat
+screenshots, hand-placed previews) get a data-lqip placeholder from
+tools/image_placeholders.py.
+Links are matched with the same normalization as tools/generate_preview.py
+(scheme, host case and trailing slash are ignored). A card that already has
+a hand-placed <img class="resource-preview"> pointing at a different image
+keeps it and is left alone, as do entries pointing at third-party hosts
+(the CSP img-src only allows local previews).
+
+A page whose cards are rendered by script can opt into a runtime lookup
+with <body data-preview-slice>. It then gets preview-slice-<page>.json
+holding only the entries for the links on that page, and the attribute is
+set to that file name for main.js to fetch.
+
+Usage:
+    python3 tools/embed_previews.py            # update pages in place
+    python3 tools/embed_previews.py --check    # exit 1 if any page is out of date
+"""
+
+import html
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from generate_preview import load_preview_mapping, preview_src, url_key
+from html_urls import extract_occurrences_from_string, find_html_files
+from image_placeholders import default_cache as default_placeholder_cache
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(WORKSPACE_ROOT))
+from update_sri import remove_attr, upsert_attr  # noqa: E402
+
+SLICE_PREFIX = 'preview-slice-'
+PREVIEW_ATTRS = ('data-preview', 'data-preview-sources', 'data-preview-lqip')
+
+
+class _Card:
+    def __init__(self, offset: int, tag: str, url: Optional[str], no_preview: bool):
+        self.offset = offset
+        self.tag = tag
+        self.url = url
+        self.no_preview = no_preview
+        self.static_src = None
+        self.static_img = None  # (offset, start tag) of the static preview <img>
+
+
+class _CardFinder(HTMLParser):
+    """Locates .resource-card start tags, their link URL and any static preview <img>."""
+
+    def __init__(self, content: str):
+        super().__init__(convert_charrefs=True)
+        self._line_offsets = [0]
+        for line in content.splitlines(keepends=True):
+            self._line_offsets.append(self._line_offsets[-1] + len(line))
+        self.cards: List[_Card] = []
+        self.body = None            # (offset, start tag) of <body data-preview-slice>
+        self._wrapper_href = None   # <a class="card-link" href> around the card
+        self._card = None
+        self._card_depth = 0        # open <div>s inside the current card
+        self._in_h3 = False
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: value or '' for name, value in attrs}
+        classes = attributes.get('class', '').split()
+        if tag == 'body' and 'data-preview-slice' in attributes:
+            self.body = (self._offset(), self.get_starttag_text())
+        elif tag == 'a' and 'card-link' in classes:
+            self._wrapper_href = attributes.get('href')
+        elif tag == 'div' and self._card is not None:
+            self._card_depth += 1
+        elif tag == 'div' and 'resource-card' in classes:
+            self._card = _Card(self._offset(), self.get_starttag_text(), self._wrapper_href,
+                               'data-no-preview' in attributes)
+            self._card_depth = 0
+            self.cards.append(self._card)
+        elif self._card is not None:
+            if tag == 'h3':
+                self._in_h3 = True
+            elif tag == 'a' and self._in_h3 and not self._card.url:
+                self._card.url = attributes.get('href')
+            elif tag == 'img' and 'resource-preview' in classes and self._card.static_src is None:
+                self._card.static_src = attributes.get('src', '')
+                self._card.static_img = (self._offset(), self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._card is None:
+            self._wrapper_href = None
+        elif tag == 'h3':
+            self._in_h3 = False
+        elif tag == 'div' and self._card is not None:
+            if self._card_depth == 0:
+                self._card = None
+            else:
+                self._card_depth -= 1
+
+
+class PreviewLookup:
+    """preview-mapping.json entries by exact URL, then by normalized URL."""
+
+    def __init__(self, mapping: Dict):
+        self.mapping = mapping
+        self.by_key = {}
+        for url, entry in mapping.items():
+            self.by_key.setdefault(url_key(url), entry)
+
+    def get(self, url: Optional[str]):
+        if not url or not url.lower().startswith(('http://', 'https://')):
+            return None
+        entry = self.mapping.get(url)
+        return entry if entry is not None else self.by_key.get(url_key(url))
+
+
+def card_attributes(entry) -> Dict[str, str]:
+    """data-preview / data-preview-sources values for a mapping entry."""
+    attributes = {'data-preview': preview_src(entry)}
+    if isinstance(entry, dict) and entry.get('sources'):
+        attributes['data-preview-sources'] = json.dumps(entry['sources'], separators=(',', ':'))
+    if isinstance(entry, dict) and entry.get('lqip'):
+        attributes['data-preview-lqip'] = entry['lqip']
+    return attributes
+
+
+def set_preview_attributes(tag: str, attributes: Dict[str, str]) -> str:
+    for name in PREVIEW_ATTRS:
+        tag = remove_attr(tag, name)
+    for name, value in attributes.items():
+        tag = upsert_attr(tag, name, html.escape(value, quote=True))
+    return tag
+
+
+def browser_href(url: str) -> str:
+    """The URL as a browser serializes link.href: lower-case scheme and host, '/' for an empty path."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', parts.query, parts.fragment))
+
+
+def slice_name(page: Path) -> str:
+    return f"{SLICE_PREFIX}{page.stem}.json"
+
+
+def find_cards(content: str) -> _CardFinder:
+    finder = _CardFinder(content)
+    finder.feed(content)
+    finder.close()
+    return finder
+
+
+def local_image(page: Path, src: Optional[str]) -> Optional[Path]:
+    """The file a same-site <img src> points at, if it exists."""
+    if not src or '://' in src or src.startswith(('data:', '//')):
+        return None
+    path = (WORKSPACE_ROOT / src.lstrip('/')) if src.startswith('/') else (page.parent / src)
+    path = Path(path.as_posix().split('?', 1)[0])
+    return path if path.is_file() else None
+
+
+def embed_page(content: str, page: Path, lookup: PreviewLookup, placeholders: Dict[Path, str]):
+    """Returns (new content, slice dict or None, number of cards annotated).
+
+    `placeholders` maps static preview images to their LQIP data: URI.
+    """
+    finder = find_cards(content)
+
+    replacements = []  # (offset, old tag, new tag)
+    annotated = 0
+    for card in finder.cards:
+        entry = None if card.no_preview else lookup.get(card.url)
+        if entry is not None and card.static_src not in (None, preview_src(entry)):
+            entry = None  # a hand-placed preview image wins
+        if entry is not None and '://' in preview_src(entry):
+            entry = None  # third-party images are blocked by the CSP img-src
+        new_tag = set_preview_attributes(card.tag, card_attributes(entry) if entry is not None else {})
+        annotated += entry is not None
+        if new_tag != card.tag:
+            replacements.append((card.offset, card.tag, new_tag))
+        if card.static_img is not None:
+            offset, img_tag = card.static_img
+            placeholder = placeholders.get(local_image(page, card.static_src))
+            new_img_tag = remove_attr(img_tag, 'data-lqip')
+            if placeholder:
+                new_img_tag = upsert_attr(new_img_tag, 'data-lqip', placeholder)
+            if new_img_tag != img_tag:
+                replacements.append((offset, img_tag, new_img_tag))
+
+    page_slice = None
+    if finder.body is not None:
+        page_slice = {}
+        for occurrence in extract_occurrences_from_string(content, page.name):
+            entry = lookup.get(occurrence.url)
+            if entry is not None:
+                page_slice[browser_href(occurrence.url)] = entry
+        offset, body_tag = finder.body
+        new_tag = upsert_attr(re.sub(r'\sdata-preview-slice(?=[\s/>])', '', body_tag),
+                              'data-preview-slice', slice_name(page))
+        if new_tag != body_tag:
+            replacements.append((offset, body_tag, new_tag))
+
+    for offset, old, new in sorted(replacements, reverse=True):
+        assert content[offset:offset + len(old)] == old
+        content = content[:offset] + new + content[offset + len(old):]
+    return content, page_slice, annotated
+
+
+def main():
+    check_only = '--check' in sys.argv
+    lookup = PreviewLookup(load_preview_mapping())
+
+    # only top-level site pages use main.js / chat-resources.js previews
+    pages = {page: page.read_text(encoding='utf-8')
+             for page in find_html_files(WORKSPACE_ROOT) if page.parent == WORKSPACE_ROOT}
+    static_images = {local_image(page, card.static_src)
+                     for page, content in pages.items() for card in find_cards(content).cards}
+    placeholder_cache = default_placeholder_cache()
+    placeholders = placeholder_cache.placeholders(image for image in static_images if image)
+    placeholder_cache.save()
+
+    stale = []
+    slices = {}
+    total = 0
+    for page, content in pages.items():
+        new_content, page_slice, annotated = embed_page(content, page, lookup, placeholders)
+        total += annotated
+        if page_slice is not None:
+            slices[slice_name(page)] = page_slice
+        if new_content != content:
+            stale.append(page.name)
+            if not check_only:
+                page.write_text(new_content, encoding='utf-8')
+        if annotated or page_slice is not None:
+            print(f"  {page.name}: {annotated} card(s) with embedded previews"
+                  + (f", {len(page_slice)} entries in {slice_name(page)}" if page_slice is not None else ""))
+
+    for slice_path in WORKSPACE_ROOT.glob(f'{SLICE_PREFIX}*.json'):
+        if slice_path.name not in slices:
+            stale.append(slice_path.name)
+            if not check_only:
+                slice_path.unlink()
+    for name, page_slice in slices.items():
+        slice_path = WORKSPACE_ROOT / name
+        serialized = json.dumps(dict(sorted(page_slice.items())), indent=2, ensure_ascii=False) + '\n'
+        if not slice_path.exists() or slice_path.read_text(encoding='utf-8') != serialized:
+            stale.append(name)
+            if not check_only:
+                slice_path.write_text(serialized, encoding='utf-8')
+
+    if check_only:
+        if stale:
+            print(f"❌ Out of date: {', '.join(stale)}")
+            print("   Run: python3 tools/embed_previews.py")
+            return 1
+        print(f"✅ {total} embedded previews up to date")
+        return 0
+    print(f"\n✅ {total} previews embedded; updated {len(stale)} file(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Re-encode chat-screenshots/ PNGs to WebP/AVIF for chat-resources.html.
+
+The chat screenshots are 1280x720 PNGs of several hundred KB each, but
+the cards on chat-resources.html show them at most ~400 px wide. This
+tool encodes every PNG once, in a process pool, to:
+
+    chat-screenshots/<name>.webp   (the <img> src)
+    chat-screenshots/<name>.avif   (a <source>, when Pillow can write AVIF)
+
+at TARGET_WIDTH px wide (2x the card width; never upscaled). It records
+the results in chat-screenshots/manifest.json, keyed by PNG file name with
+the SHA-256 of its bytes. A PNG whose hash and target width match its
+manifest entry, and whose outputs still exist, is skipped, so re-runs only
+encode new or changed screenshots.
+
+tools/build_chat_resources.py renders each card's screenshot from the
+manifest as
+
+    <picture class="resource-preview-picture">
+      <source type="image/avif" srcset="chat-screenshots/<name>.avif">
+      <img src="chat-screenshots/<name>.webp" ...>
+    </picture>
+
+so run it after encoding. The PNGs stay in the repository as the encoding
+source, but the page no longer references them, and the deploy workflow
+does not upload them.
+
+Usage:
+    python3 tools/encode_screenshots.py [--width N] [--workers N]
+    python3 tools/encode_screenshots.py --check    # exit 1 if anything needs encoding
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from cli_options import pop_option
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+SCREENSHOT_DIR = WORKSPACE_ROOT / 'chat-screenshots'
+MANIFEST_FILE = SCREENSHOT_DIR / 'manifest.json'
+
+TARGET_WIDTH = 800
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+def file_digest(path: Path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def encode_screenshot(source: Path, width: int, formats) -> Dict:
+    """Encode one PNG to each of `formats`; returns its manifest entry."""
+    from PIL import Image
+    from generate_preview import AVIF_QUALITY, WEBP_QUALITY, downscale, fit_size
+
+    with Image.open(source) as img:
+        img = img.convert('RGB')
+        size = fit_size(img.width, img.height, width, img.height * width // img.width)
+        resized = downscale(img, size) if size[0] < img.width else img
+
+    entry = {'sha256': file_digest(source), 'width': width,
+             'size': list(resized.size), 'bytes': {'png': source.stat().st_size}}
+    outputs = {}
+    for fmt in formats:
+        path = source.with_suffix(f'.{fmt}')
+        if fmt == 'avif':
+            resized.save(path, 'AVIF', quality=AVIF_QUALITY)
+        else:
+            resized.save(path, 'WEBP', quality=WEBP_QUALITY, method=6)
+        outputs[fmt] = path.name
+        entry['bytes'][fmt] = path.stat().st_size
+    entry['outputs'] = outputs
+    return entry
+
+
+def _encode_job(job):
+    source, width, formats = job
+    try:
+        return source.name, encode_screenshot(source, width, formats), None
+    except Exception as e:
+        return source.name, None, str(e)
+
+
+def load_manifest() -> Dict:
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}}
+
+
+def save_manifest(manifest: Dict):
+    """Write the manifest atomically (temp file + rename)."""
+    manifest['files'] = dict(sorted(manifest['files'].items()))
+    tmp_path = MANIFEST_FILE.with_name(MANIFEST_FILE.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def is_current(entry: Optional[Dict], source: Path, width: int, formats) -> bool:
+    return (entry is not None and entry.get('width') == width
+            and set(entry.get('outputs', {})) == set(formats)
+            and all((SCREENSHOT_DIR / name).exists() for name in entry['outputs'].values())
+            and entry.get('sha256') == file_digest(source))
+
+
+def stale_sources(manifest: Dict, width: int, formats):
+    return [source for source in sorted(SCREENSHOT_DIR.glob('*.png'))
+            if not is_current(manifest['files'].get(source.name), source, width, formats)]
+
+
+def encode_all(manifest: Dict, sources, width: int, formats, workers: Optional[int] = None) -> int:
+    """Encode `sources` in a process pool, updating the manifest. Returns the failure count."""
+    failures = 0
+    jobs = [(source, width, formats) for source in sources]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for done, (name, entry, error) in enumerate(pool.map(_encode_job, jobs, chunksize=4), 1):
+            if entry is None:
+                failures += 1
+                print(f"  ⚠️  {name}: {error}")
+                continue
+            manifest['files'][name] = entry
+            if done % 50 == 0 or done == len(jobs):
+                save_manifest(manifest)  # an interrupted run keeps its progress
+                print(f"  [{done}/{len(jobs)}] encoded")
+    return failures
+
+
+def remove_orphans(manifest: Dict) -> int:
+    """Forget (and delete the outputs of) PNGs that no longer exist."""
+    removed = 0
+    for name in list(manifest['files']):
+        if not (SCREENSHOT_DIR / name).exists():
+            for output in manifest['files'].pop(name).get('outputs', {}).values():
+                (SCREENSHOT_DIR / output).unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def picture_markup(img_tag: str, entry: Dict) -> str:
+    """<img> (plus <picture> with an AVIF <source>) for a screenshot's encoded outputs."""
+    outputs = entry['outputs']
+    src = outputs.get('webp') or outputs.get('avif')
+    img_tag = re.sub(r'\bsrc="[^"]*"', f'src="chat-screenshots/{html.escape(src)}"', img_tag, count=1)
+    if 'avif' not in outputs or src == outputs['avif']:
+        return img_tag
+    return (f'<picture class="resource-preview-picture"><source type="{MIME_TYPES["avif"]}" '
+            f'srcset="chat-screenshots/{html.escape(outputs["avif"])}">{img_tag}</picture>')
+
+
+def format_bytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB" if size >= 1024 * 1024 else f"{size // 1024} KB"
+
+
+def main():
+    # Imported here so build_chat_resources can read the manifest without the preview pipeline
+    from generate_preview import variant_formats
+
+    width = int(pop_option('--width', TARGET_WIDTH))
+    workers = pop_option('--workers', None)
+    workers = int(workers) if workers else None
+    check_only = '--check' in sys.argv
+
+    try:
+        formats = [fmt for fmt in variant_formats() if fmt in MIME_TYPES]
+    except ImportError:
+        formats = []
+    if not formats:
+        print("❌ Pillow with WebP support is required (pip install Pillow)")
+        return 1
+
+    manifest = load_manifest()
+    sources = stale_sources(manifest, width, formats)
+    if check_only:
+        if sources:
+            print(f"❌ {len(sources)} screenshot(s) need encoding")
+            print("   Run: python3 tools/encode_screenshots.py")
+            return 1
+        print(f"✅ {len(manifest['files'])} screenshots encoded")
+        return 0
+
+    failures = 0
+    if sources:
+        print(f"🗜️  Encoding {len(sources)} screenshot(s) to {'/'.join(formats)} at {width}px...\n")
+        failures = encode_all(manifest, sources, width, formats, workers)
+    else:
+        print("✅ All screenshots already encoded")
+    removed = remove_orphans(manifest)
+    manifest['width'] = width
+    save_manifest(manifest)
+    if removed:
+        print(f"🧹 Removed outputs of {removed} deleted screenshot(s)")
+
+    entries = manifest['files'].values()
+    png_bytes = sum(entry['bytes']['png'] for entry in entries)
+    served = 'webp' if 'webp' in formats else formats[0]
+    print(f"\n📊 {len(manifest['files'])} screenshots: PNG {format_bytes(png_bytes)}")
+    for fmt in formats:
+        fmt_bytes = sum(entry['bytes'].get(fmt, 0) for entry in entries)
+        print(f"   {fmt.upper():<5} {format_bytes(fmt_bytes)}"
+              f" (saves {format_bytes(png_bytes - fmt_bytes)}, {1 - fmt_bytes / max(1, png_bytes):.0%})"
+              + (" ← <img> src" if fmt == served else ""))
+    if sources or removed:
+        print("\n   Run: python3 tools/build_chat_resources.py   # renders the new outputs into the page")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,23 +6,44 @@ Automatically captures and optimizes screenshots of resource URLs
 to use as preview images.
 
 Features:
-- Multiple capture methods (Playwright, Screenshot API)
-- Image optimization and resizing
-- Automatic preview-mapping.json updates
+- Strategy chain: cheap metadata sources first (per-domain rules for
+  YouTube/GitHub, then og:image/twitter:image, see tools/preview_sources.py),
+  a browser capture only when those fail, then the Screenshot API
+- Batch capture with one shared browser and a pool of pages
+  (see tools/preview_capture.py), pipelined into a process pool for
+  optimization and a single publisher that batches mapping updates
+- Image optimization and resizing: a 400px JPEG plus WebP (and AVIF when
+  Pillow supports it) at 200/400/800px for srcset
+- Automatic preview-mapping.json updates (atomic temp-file + rename writes)
+- Perceptual-hash quality gate (tools/preview_hashes.py): near-blank and
+  known-bad captures (challenge pages, 404s) are retried with the next
+  strategy, and near-identical previews share one stored image
 - Fallback to placeholder images
 
 Usage:
-    python3 tools/generate_preview.py <url> [output_filename]
+    python3 tools/generate_preview.py <url> [output_filename] [--capture-only]
     python3 tools/generate_preview.py --check resources.html
-    python3 tools/generate_preview.py --batch urls.txt
+    python3 tools/generate_preview.py --dedupe [--dry-run]
+    python3 tools/generate_preview.py --batch urls.txt [--concurrency N] [--per-host-rate R] [--flush-every N]
+    python3 tools/generate_preview.py --batch-auto [--concurrency N] [--per-host-rate R] [--flush-every N]
+
+--capture-only skips the metadata strategies and always renders the page.
 """
 
 import sys
 import os
 import json
+import threading
+import queue
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
-import time
+from cli_options import pop_option
+from image_placeholders import compute_placeholder, default_cache as default_placeholder_cache
+from preview_hashes import default_index
+from preview_capture import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST_RATE, capture_batch
+from preview_sources import fetch_og_image, fetch_with_domain_rule
 
 # Configuration
 PREVIEW_DIR = Path(__file__).parent.parent / 'img' / 'previews'
@@ -31,6 +52,12 @@ TARGET_WIDTH = 400
 TARGET_HEIGHT = 300
 SCREENSHOT_TIMEOUT = 30  # seconds
 MIN_PREVIEW_SIZE_KB = 12
+VARIANT_WIDTHS = (200, 400, 800)  # responsive variants for srcset
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+AVIF_QUALITY = 60
+MAPPING_FLUSH_EVERY = 25  # batch mode: write preview-mapping.json every N completions
+FAST_STRATEGY_WORKERS = 8  # batch mode: concurrent metadata fetches
 
 
 def is_preview_good(preview_path):
@@ -46,7 +73,23 @@ def is_preview_good(preview_path):
     except OSError:
         return False
 
-    return True
+    # Near-blank renders and known-bad pages are not good previews
+    return capture_problem(full_path) is None
+
+def capture_problem(image_path):
+    """Why an image is not a usable preview (near-blank, known-bad page), or None."""
+    try:
+        return default_index().problem(image_path)
+    except ImportError:
+        return None  # Pillow missing: cannot judge, keep the image
+    except Exception as e:
+        return f"unreadable image ({e})"
+
+def url_key(url):
+    """Equivalence key for preview URLs: 'http://a.com' and 'https://a.com/' share a preview."""
+    parsed = urlparse(url)
+    return f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}" + \
+        (f"?{parsed.query}" if parsed.query else '')
 
 def generate_filename_from_url(url):
     """Generate a safe filename from URL."""
@@ -69,33 +112,9 @@ def generate_filename_from_url(url):
 def capture_with_playwright(url, output_path):
     """Capture screenshot using Playwright (best quality)."""
     try:
-        from playwright.sync_api import sync_playwright
-        
         print(f"  📸 Using Playwright to capture {url}")
-        
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                viewport={'width': 1280, 'height': 720},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            )
-            page = context.new_page()
-            
-            # Set timeout
-            page.set_default_timeout(SCREENSHOT_TIMEOUT * 1000)
-            
-            # Navigate and wait for content
-            page.goto(url, wait_until='networkidle')
-            
-            # Wait a bit for any JS to render
-            time.sleep(2)
-            
-            # Take screenshot
-            page.screenshot(path=str(output_path), full_page=False)
-            
-            browser.close()
-        
-        return True, "Screenshot captured with Playwright"
+        [(_, _, result, message)] = capture_batch([(url, output_path)], concurrency=1)
+        return result, message
     
     except ImportError:
         return False, "Playwright not installed (pip install playwright)"
@@ -142,6 +161,24 @@ def capture_with_screencapture(url, output_path):
     except Exception as e:
         return False, f"screencapture error: {str(e)}"
 
+# Strategy chain, tried in order: (name, method) where method(url, output_path)
+# returns (success, message). Metadata strategies need no browser and run first.
+FAST_STRATEGIES = [
+    ('domain-rule', fetch_with_domain_rule),
+    ('og:image', fetch_og_image),
+]
+CAPTURE_STRATEGIES = [
+    ('playwright', capture_with_playwright),
+    ('screenshot-api', capture_with_screenshot_api),
+    # ('screencapture', capture_with_screencapture),  # Skip manual method
+]
+
+def format_strategy_counts(handled_by):
+    """'og:image 40, playwright 12, placeholder 1' in chain order."""
+    order = [name for name, _ in FAST_STRATEGIES + CAPTURE_STRATEGIES] + ['placeholder']
+    counts = Counter(handled_by)
+    return ', '.join(f"{name} {counts[name]}" for name in sorted(counts, key=order.index))
+
 def create_placeholder_image(output_path, message="Preview Not Available"):
     """Create a simple placeholder image."""
     try:
@@ -177,94 +214,264 @@ def create_placeholder_image(output_path, message="Preview Not Available"):
     except Exception as e:
         return False, f"Placeholder error: {str(e)}"
 
-def optimize_image(image_path):
-    """Optimize and resize image to target dimensions."""
+def fit_size(width, height, max_width, max_height):
+    """Largest size with the same aspect ratio that fits in max_width x max_height."""
+    aspect = width / height
+    if aspect > max_width / max_height:
+        # Width is limiting factor
+        return max_width, max(1, int(max_width / aspect))
+    # Height is limiting factor
+    return max(1, int(max_height * aspect)), max_height
+
+def variant_formats():
+    """Modern formats this Pillow build can write, best first."""
+    from PIL import Image, features
+    
+    Image.init()
+    formats = []
+    if 'AVIF' in Image.SAVE:
+        formats.append('avif')
+    if features.check('webp'):
+        formats.append('webp')
+    return formats
+
+def variant_path(image_path, width, fmt):
+    """img/previews/foo.jpg -> img/previews/foo-400w.webp"""
+    image_path = Path(image_path)
+    return image_path.with_name(f"{image_path.stem}-{width}w.{fmt}")
+
+def downscale(img, size):
+    """Resize to `size`, shrinking by an integer factor with reduce() first.
+    
+    reduce() is a cheap box filter; LANCZOS then only works on an image at
+    most ~2x the target instead of the full screenshot.
+    """
+    from PIL import Image
+    
+    factor = min(img.width // (size[0] * 2), img.height // (size[1] * 2))
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+def optimize_image(image_path, verbose=True):
+    """Resize to the 400x300 JPEG plus WebP/AVIF variants at VARIANT_WIDTHS."""
     try:
         from PIL import Image
         
-        print(f"  🔧 Optimizing image...")
+        if verbose:
+            print(f"  🔧 Optimizing image...")
         
-        # Open image
+        # Open image; for JPEG sources, let the decoder downscale by 1/2, 1/4
+        # or 1/8 while decoding as long as the result still covers the
+        # largest variant
         img = Image.open(image_path)
+        largest = max(VARIANT_WIDTHS)
+        img.draft('RGB', fit_size(img.width, img.height, largest, largest * TARGET_HEIGHT // TARGET_WIDTH))
         
         # Convert to RGB if needed
-        if img.mode in ('RGBA', 'P'):
+        if img.mode != 'RGB':
             img = img.convert('RGB')
-        
-        # Calculate resize dimensions (maintain aspect ratio)
-        aspect = img.width / img.height
-        if aspect > TARGET_WIDTH / TARGET_HEIGHT:
-            # Width is limiting factor
-            new_width = TARGET_WIDTH
-            new_height = int(TARGET_WIDTH / aspect)
-        else:
-            # Height is limiting factor
-            new_height = TARGET_HEIGHT
-            new_width = int(TARGET_HEIGHT * aspect)
-        
-        # Resize with high-quality algorithm
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Save optimized
-        img.save(image_path, 'JPEG', quality=85, optimize=True)
+        img.load()
+        
+        formats = variant_formats()
+        variants = []
+        jpeg_img = None
+        for width in sorted(VARIANT_WIDTHS, reverse=True):
+            size = fit_size(img.width, img.height, width, width * TARGET_HEIGHT // TARGET_WIDTH)
+            if size[0] > img.width and width != TARGET_WIDTH:
+                continue  # never upscale into a larger variant
+            resized = downscale(img, size)
+            if width == TARGET_WIDTH:
+                jpeg_img = resized
+            for fmt in formats:
+                path = variant_path(image_path, width, fmt)
+                if fmt == 'avif':
+                    resized.save(path, 'AVIF', quality=AVIF_QUALITY)
+                else:
+                    resized.save(path, 'WEBP', quality=WEBP_QUALITY, method=6)
+                variants.append(path)
+        
+        # Save the JPEG fallback (src for browsers without WebP/AVIF)
+        jpeg_img.save(image_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
         
         file_size = os.path.getsize(image_path)
-        print(f"  ✅ Optimized to {file_size // 1024}KB ({new_width}x{new_height})")
+        variant_kb = sum(os.path.getsize(p) for p in variants) // 1024
+        summary = (f"Optimized to {file_size // 1024}KB ({jpeg_img.width}x{jpeg_img.height})"
+                   f" + {len(variants)} {'/'.join(formats) or 'no'} variant(s), {variant_kb}KB")
+        if verbose:
+            print(f"  ✅ {summary}")
         
-        return True, f"Optimized to {file_size // 1024}KB"
+        return True, summary
     
     except ImportError:
         return False, "Pillow not installed"
     except Exception as e:
         return False, f"Optimization error: {str(e)}"
 
-def update_preview_mapping(url, image_filename):
-    """Update preview-mapping.json with new entry."""
+def optimize_preview(image_path):
+    """optimize_image() plus the preview's placeholder, for running in a process pool.
+    
+    Returns (success, message, (digest, placeholder) or None).
+    """
+    result, message = optimize_image(image_path, verbose=False)
+    placeholder = None
+    if result:
+        try:
+            placeholder = compute_placeholder(image_path)
+        except Exception:
+            pass  # preview_entry() retries inline
+    return result, message, placeholder
+
+def preview_entry(image_filename):
+    """
+    preview-mapping.json value for a preview.
+    
+    A plain "img/previews/x.jpg" path when there are no variants or
+    placeholder; otherwise
+    {"src": <jpeg>, "sources": [{"type": "image/avif", "srcset": "... 200w, ..."}, ...],
+     "lqip": "data:image/webp;base64,..."}
+    """
+    src = f"img/previews/{image_filename}"
+    image_path = PREVIEW_DIR / image_filename
+    sources = []
+    for fmt in ('avif', 'webp'):
+        candidates = []
+        for width in VARIANT_WIDTHS:
+            path = variant_path(image_path, width, fmt)
+            if path.exists():
+                candidates.append(f"img/previews/{path.name} {width}w")
+        if candidates:
+            sources.append({'type': f'image/{fmt}', 'srcset': ', '.join(candidates)})
+    placeholder = default_placeholder_cache().placeholder(image_path) if image_path.exists() else None
+    if not sources and not placeholder:
+        return src
+    entry = {'src': src}
+    if sources:
+        entry['sources'] = sources
+    if placeholder:
+        entry['lqip'] = placeholder
+    return entry
+
+def preview_src(entry):
+    """The fallback image path of a mapping value (string or variants object)."""
+    if isinstance(entry, dict):
+        return entry.get('src')
+    return entry
+
+def load_preview_mapping():
+    """Load preview-mapping.json, or an empty mapping if it does not exist."""
+    if not PREVIEW_MAPPING.exists():
+        return {}
+    with open(PREVIEW_MAPPING, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_preview_mapping(mapping):
+    """Write preview-mapping.json atomically (temp file + rename).
+    
+    The site build reads this file, so a crash mid-write must never leave
+    it truncated.
+    """
+    tmp_path = PREVIEW_MAPPING.with_name(PREVIEW_MAPPING.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, indent=2, ensure_ascii=False)
+        f.write('\n')  # Add trailing newline
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, PREVIEW_MAPPING)
+
+def update_preview_mapping_entries(entries):
+    """Merge {url: image_filename} entries into preview-mapping.json in one write."""
     try:
-        # Load existing mapping
-        if PREVIEW_MAPPING.exists():
-            with open(PREVIEW_MAPPING, 'r', encoding='utf-8') as f:
-                mapping = json.load(f)
-        else:
-            mapping = {}
+        mapping = load_preview_mapping()
         
-        # Add new entry
-        mapping[url] = f"img/previews/{image_filename}"
+        # Add new entries
+        for url, image_filename in entries.items():
+            mapping[url] = preview_entry(image_filename)
         
         # Sort by URL for consistency
         mapping = dict(sorted(mapping.items()))
         
-        # Save
-        with open(PREVIEW_MAPPING, 'w', encoding='utf-8') as f:
-            json.dump(mapping, f, indent=2, ensure_ascii=False)
-            f.write('\n')  # Add trailing newline
-        
-        print(f"  📋 Updated preview-mapping.json")
+        write_preview_mapping(mapping)
+        default_placeholder_cache().save()
         return True
     
     except Exception as e:
         print(f"  ⚠️  Could not update preview-mapping.json: {e}")
         return False
 
-def check_existing_preview(url):
-    """Check if a good preview already exists for this URL."""
-    if not PREVIEW_MAPPING.exists():
-        return None
+def update_preview_mapping(url, image_filename):
+    """Update preview-mapping.json with new entry."""
+    if update_preview_mapping_entries({url: image_filename}):
+        print(f"  📋 Updated preview-mapping.json")
+        return True
+    return False
+
+class MappingPublisher(threading.Thread):
+    """Single writer for preview-mapping.json during batch runs.
+    
+    Finished previews are queued from any thread; the mapping is rewritten
+    once every `flush_every` completions and once more when closed.
+    """
     
+    def __init__(self, flush_every=MAPPING_FLUSH_EVERY):
+        super().__init__(name='mapping-publisher', daemon=True)
+        self.flush_every = max(1, flush_every)
+        self.published = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._pending = {}
+    
+    def publish(self, url, image_filename):
+        self._queue.put((url, image_filename))
+    
+    def _flush(self):
+        if not self._pending:
+            return
+        if update_preview_mapping_entries(self._pending):
+            self.published += len(self._pending)
+            self.writes += 1
+            print(f"  📋 preview-mapping.json: +{len(self._pending)} entr{'y' if len(self._pending) == 1 else 'ies'}")
+        self._pending = {}
+    
+    def run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._flush()
+                return
+            url, image_filename = item
+            self._pending[url] = image_filename
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+    
+    def close(self):
+        """Flush what is left and wait for the publisher to finish."""
+        self._queue.put(None)
+        self.join()
+
+def check_existing_preview(url, mapping=None):
+    """Check if a good preview already exists for this URL."""
     try:
-        with open(PREVIEW_MAPPING, 'r', encoding='utf-8') as f:
-            mapping = json.load(f)
+        if mapping is None:
+            mapping = load_preview_mapping()
+        
+        entries = [mapping.get(url)]
+        if entries[0] is None:
+            # Same page under an equivalent URL (trailing slash, host case)
+            key = url_key(url)
+            entries = [entry for other, entry in mapping.items() if url_key(other) == key]
         
-        preview_path = mapping.get(url)
-        if preview_path and is_preview_good(preview_path):
-            return preview_path
+        for entry in entries:
+            preview_path = preview_src(entry)
+            if preview_path and is_preview_good(preview_path):
+                return preview_path
         
         return None
     
     except Exception:
         return None
 
-def generate_preview(url, output_filename=None, force=False):
+def generate_preview(url, output_filename=None, force=False, capture_only=False):
     """
     Generate preview image for a URL.
     
@@ -272,6 +479,7 @@ def generate_preview(url, output_filename=None, force=False):
         url: URL to capture
         output_filename: Optional custom filename
         force: Force regeneration even if exists
+        capture_only: Skip the metadata strategies and render the page
     
     Returns:
         (success, image_path, message)
@@ -299,42 +507,270 @@ def generate_preview(url, output_filename=None, force=False):
     
     print(f"  📁 Output: img/previews/{output_filename}")
     
-    # Try capture methods in order of preference
-    methods = [
-        capture_with_playwright,
-        capture_with_screenshot_api,
-        # capture_with_screencapture,  # Skip manual method
-    ]
+    # Try strategies in order of preference: metadata first, then capture
+    strategies = CAPTURE_STRATEGIES if capture_only else FAST_STRATEGIES + CAPTURE_STRATEGIES
+    
+    handled_by = capture_with_fallbacks(url, output_path, strategies)
+    if not handled_by:
+        return False, None, "Failed to create preview or placeholder"
+    print(f"  📊 Handled by: {handled_by}")
+    
+    result = finish_preview(url, output_path)
+    default_index().save()
+    return result
+
+def try_strategies(url, output_path, strategies, verbose=True):
+    """Try each (name, method) in turn. Returns the name that succeeded, or None.
     
-    success = False
-    for method in methods:
+    Images that fail the perceptual-hash gate (near-blank, challenge or
+    error pages) count as failures, so the next strategy is tried.
+    """
+    for name, method in strategies:
         result, message = method(url, output_path)
         if result:
-            print(f"  ✅ {message}")
-            success = True
-            break
-        else:
+            problem = capture_problem(output_path)
+            if problem is None:
+                if verbose:
+                    print(f"  ✅ {message}")
+                return name
+            message = f"{name}: {problem}, retrying"
+        if verbose:
             print(f"  ⚠️  {message}")
+    return None
+
+def capture_with_fallbacks(url, output_path, strategies):
+    """Try each strategy in turn, then a placeholder.
     
-    # If all methods failed, create placeholder
-    if not success:
-        print(f"  📝 Creating placeholder image...")
-        result, message = create_placeholder_image(output_path)
-        if not result:
-            return False, None, "Failed to create preview or placeholder"
-        print(f"  ✅ {message}")
+    Returns the name of the strategy that produced the image
+    ('placeholder' if none did), or None on total failure.
+    """
+    handled_by = try_strategies(url, output_path, strategies)
+    if handled_by:
+        return handled_by
     
+    # If all methods failed, create placeholder
+    print(f"  📝 Creating placeholder image...")
+    result, message = create_placeholder_image(output_path)
+    if not result:
+        return None
+    print(f"  ✅ {message}")
+    return 'placeholder'
+
+def finish_preview(url, output_path):
+    """Optimize a captured image and record it in preview-mapping.json."""
     # Optimize image
     optimize_result, optimize_msg = optimize_image(output_path)
     if not optimize_result:
         print(f"  ⚠️  {optimize_msg}")
     
+    # Reuse an existing near-identical preview instead of storing a copy
+    image_filename = dedupe_preview(output_path)
+    if image_filename != output_path.name:
+        print(f"  🔁 Near-identical to {image_filename}, reusing it")
+    
     # Update mapping
-    update_preview_mapping(url, output_filename)
+    update_preview_mapping(url, image_filename)
     
-    relative_path = f"img/previews/{output_filename}"
+    relative_path = f"img/previews/{image_filename}"
     return True, relative_path, "Preview generated successfully"
 
+def preview_files(image_path):
+    """A preview's fallback image followed by all of its possible WebP/AVIF variants."""
+    image_path = Path(image_path)
+    return [image_path] + [variant_path(image_path, width, fmt)
+                           for width in VARIANT_WIDTHS for fmt in ('avif', 'webp')]
+
+def remove_preview_files(image_path):
+    """Delete a preview and its WebP/AVIF variants."""
+    for path in preview_files(image_path):
+        if path.exists():
+            path.unlink()
+
+def dedupe_preview(output_path):
+    """Filename the mapping should use for a fresh preview.
+    
+    If an existing good preview is near-identical (perceptual hash), the new
+    files are deleted and the existing image's name is returned.
+    """
+    try:
+        duplicate = default_index().duplicate_of(output_path)
+    except Exception:
+        duplicate = None
+    if duplicate is None:
+        return output_path.name
+    remove_preview_files(output_path)
+    return duplicate
+
+def dedupe_previews(dry_run=False):
+    """Point all URLs whose previews are near-identical at one stored image.
+    
+    The kept image is the one most URLs already use (then the shortest
+    name); the other files are deleted once neither the mapping nor a page
+    references them.
+    Returns the number of mapping entries changed.
+    """
+    index = default_index()
+    index.update()
+    mapping = load_preview_mapping()
+    users = Counter(Path(preview_src(entry)).name for entry in mapping.values() if preview_src(entry))
+    
+    replacements = {}
+    for group in index.duplicate_groups():
+        keep = max(group, key=lambda name: (users[name], -len(name)))
+        print(f"  🔁 {keep} <- {', '.join(name for name in group if name != keep)}")
+        replacements.update({name: keep for name in group if name != keep})
+    
+    changed = {url: replacements[Path(preview_src(entry)).name] for url, entry in mapping.items()
+               if preview_src(entry) and Path(preview_src(entry)).name in replacements}
+    if dry_run or not replacements:
+        return len(changed)
+    
+    if changed:
+        update_preview_mapping_entries(changed)
+    referenced = {Path(preview_src(entry)).name for entry in load_preview_mapping().values() if preview_src(entry)}
+    site_html = ''.join(path.read_text(encoding='utf-8') for path in PREVIEW_DIR.parent.parent.glob('*.html'))
+    for name in replacements:
+        if name not in referenced and f"img/previews/{name}" not in site_html:
+            remove_preview_files(PREVIEW_DIR / name)
+    index.update()
+    index.save()
+    return len(changed)
+
+def generate_previews_batch(urls, concurrency=DEFAULT_CONCURRENCY, per_host_rate=DEFAULT_PER_HOST_RATE,
+                            force=False, flush_every=MAPPING_FLUSH_EVERY, optimize_workers=None,
+                            capture_only=False, dedupe=True, output_filenames=None, placeholders=True):
+    """
+    Generate previews for many URLs as a pipeline.
+    
+    metadata - domain rules and og:image are fetched concurrently on a
+               thread pool; only URLs they cannot handle reach the browser
+    capture  - pages are captured concurrently with one shared browser
+               (see tools/preview_capture.py); pages the browser could not
+               capture fall back to the screenshot API and a placeholder on
+               a small thread pool
+    optimize - each finished capture is resized/compressed, and its
+               placeholder computed, in a process pool while capture continues
+    publish  - a single publisher thread batches mapping updates and writes
+               preview-mapping.json atomically every `flush_every` previews
+    
+    With dedupe=False every capture keeps its own file, even when it is
+    near-identical to another preview. `output_filenames` ({url: filename})
+    overrides the generated file names; together they refresh existing
+    previews in place. With placeholders=False a page no strategy could
+    capture gets no image and no mapping update.
+    
+    Returns the number of previews generated.
+    """
+    PREVIEW_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        mapping = load_preview_mapping() if not force else {}
+    except ValueError:
+        mapping = {}
+    jobs = []
+    aliases = {}  # url -> equivalent URLs in this batch that share its capture
+    first_by_key = {}
+    for url in urls:
+        if not force and check_existing_preview(url, mapping):
+            print(f"  ✅ Preview already exists: {url}")
+            continue
+        key = url_key(url)
+        if key in first_by_key:
+            aliases[first_by_key[key]].append(url)
+            continue
+        first_by_key[key] = url
+        aliases[url] = []
+        filename = (output_filenames or {}).get(url) or generate_filename_from_url(url)
+        jobs.append((url, PREVIEW_DIR / filename))
+    
+    if not jobs:
+        return 0
+    
+    captured = []
+    finished = []
+    handled_by = {}  # url -> strategy name
+    publisher = MappingPublisher(flush_every)
+    publisher.start()
+    
+    with ProcessPoolExecutor(max_workers=optimize_workers) as optimizers:
+        
+        def optimized(url, output_path, future):
+            try:
+                result, message, placeholder = future.result()
+            except Exception as e:
+                result, message, placeholder = False, f"Optimization error: {e}", None
+            if placeholder:
+                default_placeholder_cache().put(*placeholder)
+            icon = "🔧" if result else "⚠️ "
+            print(f"  {icon} {output_path.name}: {message}")
+            image_filename = dedupe_preview(output_path) if dedupe else output_path.name
+            if image_filename != output_path.name:
+                print(f"  🔁 {output_path.name}: near-identical to {image_filename}, reusing it")
+            for same_page in [url] + aliases[url]:
+                finished.append(same_page)
+                publisher.publish(same_page, image_filename)
+        
+        def optimize(url, output_path):
+            future = optimizers.submit(optimize_preview, output_path)
+            future.add_done_callback(lambda f: optimized(url, output_path, f))
+        
+        def fallback(url, output_path):
+            if placeholders:
+                name = capture_with_fallbacks(url, output_path, CAPTURE_STRATEGIES[1:])
+            else:
+                name = try_strategies(url, output_path, CAPTURE_STRATEGIES[1:])
+            if name:
+                handled_by[url] = name
+                optimize(url, output_path)
+        
+        if not capture_only:
+            print(f"🔎 Trying metadata strategies for {len(jobs)} URL(s)...\n")
+            with ThreadPoolExecutor(max_workers=FAST_STRATEGY_WORKERS) as fetchers:
+                names = fetchers.map(lambda job: try_strategies(*job, FAST_STRATEGIES, verbose=False), jobs)
+                for (url, output_path), name in zip(jobs, names):
+                    if name:
+                        print(f"  ⚡ {url} - {name}")
+                        handled_by[url] = name
+                        optimize(url, output_path)
+            jobs = [job for job in jobs if job[0] not in handled_by]
+            print(f"\n⚡ {len(handled_by)} URL(s) handled without a browser\n")
+        
+        if jobs:
+            print(f"📸 Capturing {len(jobs)} page(s) with {concurrency} browser context(s), "
+                  f"max {per_host_rate:g} page load(s)/s per host...\n")
+        
+        with ThreadPoolExecutor(max_workers=2) as fallbacks:
+            
+            def on_capture(url, output_path, result, message):
+                captured.append(url)
+                problem = capture_problem(output_path) if result else None
+                if problem:
+                    result, message = False, f"playwright: {problem}, retrying"
+                icon = "✅" if result else "⚠️ "
+                print(f"  [{len(captured)}/{len(jobs)}] {icon} {url} - {message}")
+                if result:
+                    handled_by[url] = 'playwright'
+                    optimize(url, output_path)
+                else:
+                    fallbacks.submit(fallback, url, output_path)
+            
+            try:
+                if jobs:
+                    capture_batch(jobs, concurrency, per_host_rate, on_result=on_capture)
+            except Exception as e:
+                reason = "Playwright not installed (pip install playwright)" if isinstance(e, ImportError) else f"Playwright error: {e}"
+                print(f"  ⚠️  {reason}")
+                for url, output_path in jobs:
+                    if url not in captured:
+                        on_capture(url, output_path, False, reason)
+    
+    publisher.close()
+    default_index().save()
+    print(f"\n📋 preview-mapping.json: {publisher.published} entr{'y' if publisher.published == 1 else 'ies'} "
+          f"in {publisher.writes} atomic write(s)")
+    if handled_by:
+        print(f"📊 Handled by: {format_strategy_counts(handled_by.values())}")
+    return len(finished)
+
 def extract_urls_from_resources_html():
     """Extract all URLs from resources.html without good previews."""
     resources_file = Path(__file__).parent.parent / 'resources.html'
@@ -352,9 +788,13 @@ def extract_urls_from_resources_html():
     urls = re.findall(pattern, content)
     
     # Filter to only those without previews
+    try:
+        mapping = load_preview_mapping()
+    except ValueError:
+        mapping = {}
     urls_needing_previews = []
     for url in urls:
-        if not check_existing_preview(url):
+        if not check_existing_preview(url, mapping):
             urls_needing_previews.append(url)
     
     return urls_needing_previews
@@ -363,11 +803,20 @@ def main():
     """Main entry point."""
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  python3 tools/generate_preview.py <url> [output_filename]")
+        print("  python3 tools/generate_preview.py <url> [output_filename] [--capture-only]")
         print("  python3 tools/generate_preview.py --check resources.html")
-        print("  python3 tools/generate_preview.py --batch urls.txt")
+        print("  python3 tools/generate_preview.py --dedupe [--dry-run]")
+        print("  python3 tools/generate_preview.py --batch urls.txt [--concurrency N] [--per-host-rate R] [--flush-every N]")
+        print("  python3 tools/generate_preview.py --batch-auto [--concurrency N] [--per-host-rate R] [--flush-every N]")
         return 1
     
+    concurrency = int(pop_option('--concurrency', DEFAULT_CONCURRENCY))
+    per_host_rate = float(pop_option('--per-host-rate', DEFAULT_PER_HOST_RATE))
+    flush_every = int(pop_option('--flush-every', MAPPING_FLUSH_EVERY))
+    capture_only = '--capture-only' in sys.argv
+    if capture_only:
+        sys.argv.remove('--capture-only')
+    
     if sys.argv[1] == '--check':
         print("🔍 Checking for resources without previews...")
         urls = extract_urls_from_resources_html()
@@ -383,6 +832,15 @@ def main():
         print(f"\n💡 Generate previews with:")
         print(f"   python3 tools/generate_preview.py --batch-auto")
         
+        default_index().save()
+        return 0
+    
+    elif sys.argv[1] == '--dedupe':
+        dry_run = '--dry-run' in sys.argv
+        print("🔍 Looking for near-identical previews...")
+        changed = dedupe_previews(dry_run)
+        verb = "Would repoint" if dry_run else "Repointed"
+        print(f"\n✅ {verb} {changed} mapping entr{'y' if changed == 1 else 'ies'}")
         return 0
     
     elif sys.argv[1] == '--batch-auto':
@@ -395,23 +853,32 @@ def main():
         
         print(f"\n📋 Processing {len(urls)} URLs...\n")
         
-        success_count = 0
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}] Processing {url}")
-            result, path, message = generate_preview(url)
-            if result:
-                success_count += 1
-            time.sleep(1)  # Rate limiting
+        success_count = generate_previews_batch(urls, concurrency, per_host_rate, flush_every=flush_every,
+                                                capture_only=capture_only)
         
         print(f"\n✅ Generated {success_count}/{len(urls)} previews")
         return 0
     
+    elif sys.argv[1] == '--batch':
+        if len(sys.argv) < 3:
+            print("Usage: python3 tools/generate_preview.py --batch urls.txt")
+            return 1
+        with open(sys.argv[2], 'r', encoding='utf-8') as f:
+            urls = list(dict.fromkeys(line.strip() for line in f if line.strip() and not line.startswith('#')))
+        
+        print(f"🔄 Generating previews for {len(urls)} URLs from {sys.argv[2]}...\n")
+        success_count = generate_previews_batch(urls, concurrency, per_host_rate, force=True, flush_every=flush_every,
+                                                capture_only=capture_only)
+        
+        print(f"\n✅ Generated {success_count}/{len(urls)} previews")
+        return 0 if success_count == len(urls) else 1
+    
     else:
         # Single URL
         url = sys.argv[1]
         output_filename = sys.argv[2] if len(sys.argv) > 2 else None
         
-        result, path, message = generate_preview(url, output_filename, force=True)
+        result, path, message = generate_preview(url, output_filename, force=True, capture_only=capture_only)
         
         if result:
             print(f"\n✅ Success! Preview saved to: {path}")
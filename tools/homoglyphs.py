@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Homoglyph / IDN spoof detection.
+
+Decodes punycode (xn--) labels and reduces each domain to a confusables
+skeleton (UTS #39 style: NFKC, case folding, the confusables table in
+tools/data/confusables.txt, then combining marks stripped). Skeletons of
+protected domains (WHITELIST, the hand-picked tools/data/protected-domains.txt
+and the generated tools/data/popular-domains.txt) are kept in a dict, so
+checking a host is a hash lookup per parent domain and per label window
+left of its registrable domain, O(length) per URL, instead of comparing it
+against every protected domain.
+
+'xn--gthub-n2e.com' decodes to 'gіthub.com' (Cyrillic і), whose skeleton is
+'github.corn' -- the same as github.com's -- so it is reported as a
+lookalike of github.com. So is 'gіthub.com.evil.tk', where the homograph
+sits left of an attacker-owned registrable domain.
+
+--refresh regenerates the two bundled tables from their upstream sources:
+confusables.txt is the full Unicode UTS #39 table (CONFUSABLES_URL) and
+popular-domains.txt the registrable domains of the top --top entries of
+the Tranco ranking (TRANCO_URL).
+
+Usage:
+    python3 tools/homoglyphs.py <domain-or-url> [...]
+    python3 tools/homoglyphs.py --refresh [--top 100000]
+"""
+
+import csv
+import io
+import os
+import sys
+import unicodedata
+import urllib.request
+import zipfile
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from public_suffix import registrable_domain
+
+DATA_DIR = Path(__file__).parent / 'data'
+CONFUSABLES_FILE = DATA_DIR / 'confusables.txt'
+POPULAR_DOMAINS_FILE = DATA_DIR / 'popular-domains.txt'
+PROTECTED_DOMAINS_FILE = DATA_DIR / 'protected-domains.txt'
+
+CONFUSABLES_URL = 'https://www.unicode.org/Public/security/latest/confusables.txt'
+TRANCO_URL = 'https://tranco-list.eu/top-1m.csv.zip'
+DEFAULT_TOP = 100000
+DOWNLOAD_TIMEOUT = 120  # seconds
+
+
+def load_confusables(path: Path = CONFUSABLES_FILE) -> Dict[str, str]:
+    """Parse a UTS #39 confusables.txt file into {source char: prototype}."""
+    table = {}
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            fields = [field.strip() for field in line.split(';')]
+            if len(fields) < 2:
+                continue
+            source = ''.join(chr(int(cp, 16)) for cp in fields[0].split())
+            target = ''.join(chr(int(cp, 16)) for cp in fields[1].split())
+            if len(source) == 1:
+                table[source] = target
+    return table
+
+
+def load_domain_list(path: Path = POPULAR_DOMAINS_FILE) -> List[str]:
+    """One domain per line; blank lines and # comments ignored."""
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [entry for entry in (line.split('#', 1)[0].strip().lower() for line in f) if entry]
+
+
+@lru_cache(maxsize=1)
+def get_confusables() -> Dict[str, str]:
+    return load_confusables()
+
+
+def to_unicode(host: str) -> str:
+    """Decode punycode labels; labels that fail to decode are left as-is."""
+    labels = []
+    for label in host.lower().rstrip('.').split('.'):
+        if label.startswith('xn--'):
+            try:
+                label = label[4:].encode('ascii').decode('punycode')
+            except (UnicodeError, ValueError):
+                pass
+        labels.append(label)
+    return '.'.join(labels)
+
+
+def skeleton(text: str, table: Optional[Dict[str, str]] = None) -> str:
+    """Confusables skeleton: two strings that look alike share a skeleton."""
+    table = get_confusables() if table is None else table
+    text = unicodedata.normalize('NFKC', text).casefold()
+    mapped = ''.join(table.get(ch, ch) for ch in text)
+    decomposed = unicodedata.normalize('NFD', mapped)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _script(ch: str) -> str:
+    try:
+        return unicodedata.name(ch).split(' ', 1)[0]
+    except ValueError:
+        return 'UNKNOWN'
+
+
+def mixed_script_labels(host: str) -> List[str]:
+    """Labels that mix letters from more than one script (e.g. Latin + Cyrillic)."""
+    mixed = []
+    for label in host.split('.'):
+        scripts = {_script(ch) for ch in label if ch.isalpha()}
+        if len(scripts) > 1:
+            mixed.append(label)
+    return mixed
+
+
+class Lookalike(NamedTuple):
+    host: str          # the parent domain that matched, in Unicode
+    target: str        # the protected domain it imitates
+    non_ascii: bool    # True for IDN homographs, False for ASCII tricks (rn/m, 0/o)
+
+
+class SkeletonIndex:
+    """Hash index of protected-domain skeletons."""
+
+    def __init__(self, domains: Iterable[str], table: Optional[Dict[str, str]] = None):
+        self.table = get_confusables() if table is None else table
+        self.domains = set()
+        self._index: Dict[str, str] = {}
+        for domain in domains:
+            domain = to_unicode(domain)
+            self.domains.add(domain)
+            self._index.setdefault(skeleton(domain, self.table), domain)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _match(self, candidate: str) -> Optional[Lookalike]:
+        target = self._index.get(skeleton(candidate, self.table))
+        if target is not None and target != candidate:
+            return Lookalike(candidate, target, not candidate.isascii())
+        return None
+
+    def lookalike(self, host: str) -> Optional[Lookalike]:
+        """The protected domain `host` (or part of it) imitates, if any."""
+        host = to_unicode(host)
+        labels = host.split('.')
+        # Shortest parent first: subdomains of a protected domain belong to its owner
+        for i in range(len(labels) - 2, -1, -1):
+            candidate = '.'.join(labels[i:])
+            if candidate in self.domains:
+                return None
+            match = self._match(candidate)
+            if match:
+                return match
+
+        # Label windows left of the registrable domain: 'gіthub.com' in 'gіthub.com.evil.tk'
+        registrable = registrable_domain(host)
+        end = len(labels) - registrable.count('.') - 1 if registrable else 0
+        for j in range(end, 1, -1):
+            for i in range(j - 2, -1, -1):
+                match = self._match('.'.join(labels[i:j]))
+                if match:
+                    return match
+        return None
+
+
+def default_index(extra_domains: Iterable[str] = ()) -> SkeletonIndex:
+    """Index over `extra_domains`, then the protected and popular domain lists."""
+    return SkeletonIndex(list(extra_domains) + load_domain_list(PROTECTED_DOMAINS_FILE)
+                         + load_domain_list(POPULAR_DOMAINS_FILE))
+
+
+def _download(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={'User-Agent': 'CSOH-homoglyphs/1.0 (+https://csoh.org)'})
+    with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+        return response.read()
+
+
+def _write_atomic(path: Path, text: str):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def refresh_data(top: int = DEFAULT_TOP):
+    """Regenerate confusables.txt and popular-domains.txt from upstream."""
+    print(f"⬇️  {CONFUSABLES_URL}")
+    confusables = _download(CONFUSABLES_URL).decode('utf-8-sig')
+    tmp_path = CONFUSABLES_FILE.with_name(CONFUSABLES_FILE.name + '.new')
+    tmp_path.write_text(confusables, encoding='utf-8')
+    count = len(load_confusables(tmp_path))
+    if count < 1000:
+        tmp_path.unlink()
+        raise ValueError(f"confusables.txt has only {count} entries; not replacing the bundled table")
+    os.replace(tmp_path, CONFUSABLES_FILE)
+    print(f"   {CONFUSABLES_FILE.name}: {count:,} confusables")
+
+    print(f"⬇️  {TRANCO_URL}")
+    with zipfile.ZipFile(io.BytesIO(_download(TRANCO_URL))) as archive:
+        with archive.open(archive.namelist()[0]) as f:
+            rows = csv.reader(io.TextIOWrapper(f, encoding='utf-8'))
+            domains = {}
+            for rank, (_, domain) in enumerate(rows, 1):
+                if rank > top:
+                    break
+                domain = registrable_domain(domain)
+                if domain:
+                    domains.setdefault(domain, None)
+    header = (f"# Popular domains protected by homoglyph/IDN spoof detection (tools/homoglyphs.py):\n"
+              f"# the registrable domains of the Tranco top {top:,} ({TRANCO_URL}), in rank order.\n"
+              f"# Generated {datetime.now(timezone.utc):%Y-%m-%d} by: python3 tools/homoglyphs.py --refresh --top {top}\n"
+              f"# Do not edit; add hand-picked domains to {PROTECTED_DOMAINS_FILE.name}.\n")
+    _write_atomic(POPULAR_DOMAINS_FILE, header + ''.join(f"{domain}\n" for domain in domains))
+    print(f"   {POPULAR_DOMAINS_FILE.name}: {len(domains):,} domains")
+
+
+def main():
+    if '--refresh' in sys.argv:
+        top = DEFAULT_TOP
+        if '--top' in sys.argv:
+            top = int(sys.argv[sys.argv.index('--top') + 1])
+        try:
+            refresh_data(top)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            print(f"❌ Refresh failed: {e}")
+            return 1
+        print("✅ Refreshed the confusables and popular-domains tables")
+        return 0
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 tools/homoglyphs.py <domain-or-url> [...]")
+        print("       python3 tools/homoglyphs.py --refresh [--top N]")
+        return 1
+
+    from check_url_safety import WHITELIST
+    index = default_index(WHITELIST)
+    found = False
+    for arg in sys.argv[1:]:
+        host = urlsplit(arg).hostname if '://' in arg else arg
+        unicode_host = to_unicode(host or '')
+        match = index.lookalike(unicode_host)
+        shown = f"{arg} ({unicode_host})" if unicode_host != arg else arg
+        if match:
+            found = True
+            kind = "IDN homograph" if match.non_ascii else "ASCII lookalike"
+            print(f"⚠️  {shown}: {kind} of {match.target}")
+        else:
+            print(f"✅ {shown}: no lookalike found (skeleton {skeleton(unicode_host)})")
+        for label in mixed_script_labels(unicode_host):
+            print(f"   mixed scripts in label '{label}'")
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Single-pass URL extraction from HTML pages.
+
+Tokenizes each page once with html.parser and reports every absolute
+http(s) URL with its source location and the context it appeared in:
+
+    anchor    <a href>, <area href>
+    resource  src/srcset/poster/data attributes, <link href>, <meta content>
+    text      URLs in visible text
+    script    URLs inside <script>/<style> (JSON-LD, inline JS)
+    comment   URLs inside HTML comments
+
+With a git revision, only URLs that are new since that revision are
+reported (see new_since()); this backs the --since mode of the site-wide
+checks.
+
+Usage:
+    python3 tools/html_urls.py page.html [page.html ...]
+"""
+
+import re
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple
+
+TEXT_URL_PATTERN = re.compile(r'https?://[^\s<>"\']+[^\s<>"\'.,;:!?)]')
+
+# Attributes that carry URLs, per context
+RESOURCE_ATTRS = {'src', 'poster', 'data', 'srcset', 'imagesrcset'}
+SKIP_DIRS = {'.git', '.github', 'node_modules', '.venv', 'venv', '__pycache__', '.cache'}
+
+
+class URLOccurrence(NamedTuple):
+    url: str
+    file: str
+    line: int
+    column: int
+    context: str
+    tag: str
+
+
+class _URLExtractor(HTMLParser):
+    def __init__(self, file_name: str):
+        super().__init__(convert_charrefs=True)
+        self.file_name = file_name
+        self.occurrences: List[URLOccurrence] = []
+        self._raw_text_tag = None
+
+    def _add(self, url: str, context: str, tag: str, line: int, column: int):
+        url = url.strip()
+        if url.lower().startswith(('http://', 'https://')):
+            self.occurrences.append(URLOccurrence(url, self.file_name, line, column, context, tag))
+
+    def handle_starttag(self, tag, attrs):
+        line, offset = self.getpos()
+        column = offset + 1
+
+        if tag in ('script', 'style'):
+            self._raw_text_tag = tag
+
+        attributes = dict(attrs)
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == 'href':
+                context = 'anchor' if tag in ('a', 'area') else 'resource'
+                self._add(value, context, tag, line, column)
+            elif name in RESOURCE_ATTRS:
+                if name.endswith('srcset'):
+                    for candidate in value.split(','):
+                        self._add(candidate.strip().split(' ')[0], 'resource', tag, line, column)
+                else:
+                    self._add(value, 'resource', tag, line, column)
+            elif name == 'content' and tag == 'meta' and attributes.get('http-equiv', '').lower() != 'refresh':
+                self._add(value, 'resource', tag, line, column)
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag):
+        if tag == self._raw_text_tag:
+            self._raw_text_tag = None
+
+    def _scan_text(self, data: str, context: str, tag: str):
+        line, offset = self.getpos()
+        for match in TEXT_URL_PATTERN.finditer(data):
+            before = data[:match.start()]
+            newlines = before.count('\n')
+            if newlines:
+                column = match.start() - before.rfind('\n')
+            else:
+                column = offset + match.start() + 1
+            self._add(match.group(0), context, tag, line + newlines, column)
+
+    def handle_data(self, data):
+        if self._raw_text_tag:
+            self._scan_text(data, 'script', self._raw_text_tag)
+        else:
+            self._scan_text(data, 'text', '')
+
+    def handle_comment(self, data):
+        self._scan_text(data, 'comment', '')
+
+
+def extract_occurrences_from_string(content: str, display_name: str) -> List[URLOccurrence]:
+    """Tokenize HTML source and return every URL occurrence in document order."""
+    parser = _URLExtractor(display_name)
+    parser.feed(content)
+    parser.close()
+    return parser.occurrences
+
+
+def extract_occurrences(file_path: Path, display_name: str = None) -> List[URLOccurrence]:
+    """Tokenize one HTML file and return every URL occurrence in document order."""
+    file_path = Path(file_path)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return extract_occurrences_from_string(content, display_name or file_path.name)
+
+
+def _extract_for_pool(args):
+    path, name = args
+    try:
+        return name, extract_occurrences(path, name), None
+    except (OSError, UnicodeDecodeError) as e:
+        return name, [], str(e)
+
+
+def find_html_files(root: Path) -> List[Path]:
+    """All *.html files under `root`, skipping VCS, tooling and cache dirs."""
+    root = Path(root)
+    return sorted(
+        path for path in root.rglob('*.html')
+        if not any(part in SKIP_DIRS for part in path.relative_to(root).parts[:-1])
+    )
+
+
+def extract_from_files(files: Iterable[Path], root: Path, workers: int = None) -> Dict[str, Dict]:
+    """Extract occurrences from many files in parallel.
+
+    Returns {relative file name: {'occurrences': [...], 'error': str|None}}
+    in the order the files were given.
+    """
+    jobs = [(path, str(Path(path).relative_to(root))) for path in files]
+    if len(jobs) <= 1 or workers == 1:
+        results = list(map(_extract_for_pool, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_extract_for_pool, jobs))
+    return {name: {'occurrences': occurrences, 'error': error}
+            for name, occurrences, error in results}
+
+
+def _git(root: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(['git', *args], cwd=root, capture_output=True, text=True, encoding='utf-8')
+
+
+def resolve_revision(root: Path, rev: str) -> str:
+    """Full commit hash for `rev`; raises ValueError if git does not know it."""
+    result = _git(root, 'rev-parse', '--verify', '--quiet', f'{rev}^{{commit}}')
+    if result.returncode != 0:
+        raise ValueError(f"Unknown git revision: {rev}")
+    return result.stdout.strip()
+
+
+def changed_html_files(root: Path, rev: str) -> List[Path]:
+    """HTML files added or modified since `rev`, including uncommitted and untracked ones."""
+    root = Path(root)
+    changed = _git(root, 'diff', '--name-only', '--diff-filter=ACMR', rev, '--', '*.html')
+    untracked = _git(root, 'ls-files', '--others', '--exclude-standard', '--', '*.html')
+    names = changed.stdout.splitlines() + untracked.stdout.splitlines()
+    eligible = set(find_html_files(root))
+    return sorted({root / name for name in names} & eligible)
+
+
+def file_at_revision(root: Path, rev: str, name: str) -> str:
+    """Contents of `name` (relative to the repo root) at `rev`, or '' if it did not exist."""
+    result = _git(root, 'show', f'{rev}:{Path(name).as_posix()}')
+    return result.stdout if result.returncode == 0 else ''
+
+
+def new_since(root: Path, rev: str, name: str, occurrences: List[URLOccurrence]) -> List[URLOccurrence]:
+    """Drop occurrences whose URL was already present in `name` at `rev`."""
+    previous = {o.url for o in extract_occurrences_from_string(file_at_revision(root, rev, name), name)}
+    return [o for o in occurrences if o.url not in previous]
+
+
+def unique_urls(occurrences: Iterable[URLOccurrence]) -> List[str]:
+    """URLs in first-seen order, without duplicates."""
+    return list(dict.fromkeys(o.url for o in occurrences))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 tools/html_urls.py page.html [page.html ...]")
+        return 1
+    for name in sys.argv[1:]:
+        for o in extract_occurrences(Path(name), name):
+            print(f"{o.file}:{o.line}:{o.column}\t{o.context:<8}\t{o.url}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Low-quality image placeholders (LQIP) for previews and chat screenshots.
+
+Each image is reduced to a PLACEHOLDER_WIDTH px wide WebP of a few hundred
+bytes and stored as a data: URI. Pages embed it next to the real image
+(data-preview-lqip on a card, data-lqip on a static <img>), and main.js /
+chat-resources.js paint it as the image's background, so every card shows
+a blurred version of its preview at once while the full image lazy-loads.
+The CSP img-src already allows data: URIs.
+
+Placeholders are cached in tools/.cache/placeholders.json keyed by the
+SHA-256 of the image bytes, so a placeholder is computed once per distinct
+image. Cache misses are computed in a process pool.
+
+Usage:
+    python3 tools/image_placeholders.py [image ...]   # default: all previews and chat screenshots
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+CACHE_FILE = Path(__file__).parent / '.cache' / 'placeholders.json'
+IMAGE_DIRS = (WORKSPACE_ROOT / 'img' / 'previews', WORKSPACE_ROOT / 'chat-screenshots')
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png'}  # fallback images; -NNNw.webp/.avif variants are skipped
+
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+
+
+def image_digest(path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compute_placeholder(path) -> Tuple[str, str]:
+    """(content digest, data: URI of a PLACEHOLDER_WIDTH px WebP) for one image."""
+    from PIL import Image
+
+    digest = image_digest(path)
+    with Image.open(path) as img:
+        img.draft('RGB', (PLACEHOLDER_WIDTH * 8, PLACEHOLDER_WIDTH * 8))
+        height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+        small = img.convert('RGB').resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BOX)
+    buffer = io.BytesIO()
+    small.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+    return digest, 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+class PlaceholderCache:
+    """Placeholders by image content digest, persisted between runs."""
+
+    def __init__(self, cache_file: Path = CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self.entries: Dict[str, str] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def put(self, digest: str, placeholder: str):
+        with self._lock:
+            if self.entries.get(digest) != placeholder:
+                self.entries[digest] = placeholder
+                self._dirty = True
+
+    def placeholder(self, path) -> Optional[str]:
+        """Placeholder for one image, computed inline on a cache miss (None without Pillow)."""
+        cached = self.entries.get(image_digest(path))
+        if cached:
+            return cached
+        try:
+            digest, placeholder = compute_placeholder(path)
+        except ImportError:
+            return None
+        self.put(digest, placeholder)
+        return placeholder
+
+    def placeholders(self, paths: Iterable, workers: Optional[int] = None) -> Dict[Path, str]:
+        """Placeholders for many images; misses are computed in a process pool."""
+        digests = {Path(path): image_digest(path) for path in paths}
+        missing = sorted({path for path, digest in digests.items() if digest not in self.entries})
+        if missing:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                missing = []
+        if missing:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for path, result in zip(missing, pool.map(_compute_or_none, missing, chunksize=16)):
+                    if result:
+                        self.put(*result)
+                    else:
+                        print(f"  ⚠️  Could not read {path.name}")
+        return {path: self.entries[digest] for path, digest in digests.items() if digest in self.entries}
+
+    def save(self):
+        """Write the cache atomically if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_file.with_name(self.cache_file.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(sorted(self.entries.items())), f, indent=0)
+            os.replace(tmp_path, self.cache_file)
+            self._dirty = False
+
+
+def _compute_or_none(path) -> Optional[Tuple[str, str]]:
+    try:
+        return compute_placeholder(path)
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=1)
+def default_cache() -> PlaceholderCache:
+    return PlaceholderCache()
+
+
+def main():
+    paths = [Path(arg) for arg in sys.argv[1:]] or sorted(
+        path for directory in IMAGE_DIRS if directory.exists()
+        for path in directory.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    cache = default_cache()
+    before = len(cache.entries)
+    placeholders = cache.placeholders(paths)
+    cache.save()
+    if not placeholders and paths:
+        print("❌ Pillow not installed (pip install Pillow)")
+        return 1
+    sizes = [len(uri) for uri in placeholders.values()]
+    print(f"✅ {len(placeholders)} placeholder(s), {len(cache.entries) - before} new, "
+          f"average {sum(sizes) // max(1, len(sizes))} bytes as a data: URI")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
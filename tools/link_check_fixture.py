@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for exercising tools/check_links.py without the internet.
+
+Serves a handful of endpoints that mimic what real outbound links do:
+
+    /ok                 200
+    /redirect/<n>       n chained 301s ending at /ok
+    /relative-redirect  302 with a relative Location header
+    /no-head            405 for HEAD, 206 for a ranged GET
+    /big                200 with a 1 MB body (forces connection close)
+    /missing            404
+    /error              500 for HEAD and GET
+    /slow/<seconds>     200 after a delay
+    /loop               redirects to itself
+
+Usage:
+    python3 tools/link_check_fixture.py [port]
+    python3 tools/link_check_fixture.py 8765 &
+    python3 tools/check_links.py --urls <(python3 tools/link_check_fixture.py --list 8765) --force
+"""
+
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+SAMPLE_PATHS = ['/ok', '/redirect/3', '/relative-redirect', '/no-head', '/big',
+                '/missing', '/error', '/slow/1', '/loop']
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _route(self):
+        path = self.path.split('?', 1)[0]
+
+        if path == '/ok':
+            return self._send(200, b'ok', {'Content-Type': 'text/plain'})
+        if path.startswith('/redirect/'):
+            remaining = int(path.rsplit('/', 1)[1] or 0)
+            target = '/ok' if remaining <= 1 else f'/redirect/{remaining - 1}'
+            return self._send(301, headers={'Location': f'http://{self.headers["Host"]}{target}'})
+        if path == '/relative-redirect':
+            return self._send(302, headers={'Location': '/ok'})
+        if path == '/no-head':
+            if self.command == 'HEAD':
+                return self._send(405, headers={'Allow': 'GET'})
+            if self.headers.get('Range'):
+                return self._send(206, b'o', {'Content-Range': 'bytes 0-0/2'})
+            return self._send(200, b'ok')
+        if path == '/big':
+            return self._send(200, b'x' * (1024 * 1024))
+        if path == '/error':
+            return self._send(500, b'error')
+        if path.startswith('/slow/'):
+            time.sleep(float(path.rsplit('/', 1)[1] or 0))
+            return self._send(200, b'ok')
+        if path == '/loop':
+            return self._send(302, headers={'Location': '/loop'})
+        return self._send(404, b'not found')
+
+    do_HEAD = _route
+    do_GET = _route
+
+
+def main():
+    args = sys.argv[1:]
+    list_only = '--list' in args
+    args = [a for a in args if a != '--list']
+    port = int(args[0]) if args else DEFAULT_PORT
+
+    if list_only:
+        for path in SAMPLE_PATHS:
+            print(f'http://127.0.0.1:{port}{path}')
+        return 0
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    print(f"Serving link-check fixture on http://127.0.0.1:{port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
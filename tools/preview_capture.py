@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Batch screenshot capture for preview images.
+
+One headless Chromium is launched per batch and shared by a pool of N
+browser contexts, so a 200-URL backfill pays browser start-up once instead
+of 200 times:
+
+- adaptive settle: after DOMContentLoaded, wait until no requests are in
+  flight and the layout (height, image count, loaded images) has stopped
+  changing, capped at SETTLE_MAX_MS, instead of networkidle + fixed sleeps
+- video/audio, fonts and known tracker/ad hosts are blocked
+- per-host rate limit instead of a global sleep between URLs
+
+Used by tools/generate_preview.py; requires Playwright
+(pip install playwright && playwright install chromium).
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from check_links import RateLimiter
+from public_suffix import DomainRuleSet
+
+VIEWPORT = {'width': 1280, 'height': 720}
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+CAPTURE_TIMEOUT = 30  # seconds per page
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PER_HOST_RATE = 0.5  # page loads per second per host
+
+SETTLE_QUIET_MS = 500   # no requests in flight and a stable layout for this long
+SETTLE_MAX_MS = 5000    # give up waiting and capture anyway
+SETTLE_POLL_MS = 100
+
+BLOCKED_RESOURCE_TYPES = {'media', 'font', 'websocket', 'eventsource'}
+TRACKER_DOMAINS = DomainRuleSet([
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'adservice.google.com',
+    'connect.facebook.net',
+    'hotjar.com',
+    'segment.io',
+    'segment.com',
+    'mixpanel.com',
+    'amplitude.com',
+    'fullstory.com',
+    'clarity.ms',
+    'hs-analytics.net',
+    'hs-scripts.com',
+    'hubspot.com',
+    'intercom.io',
+    'drift.com',
+    'optimizely.com',
+    'newrelic.com',
+    'nr-data.net',
+    'quantserve.com',
+    'scorecardresearch.com',
+    'taboola.com',
+    'outbrain.com',
+    'ads-twitter.com',
+    'ads.linkedin.com',
+    'snap.licdn.com',
+    'bat.bing.com',
+])
+
+# Layout signature sampled while settling; unchanged samples mean the page is done
+_LAYOUT_SIGNATURE_JS = """() => {
+    const body = document.body;
+    const images = Array.from(document.images);
+    return [
+        document.readyState,
+        body ? body.scrollHeight : 0,
+        images.length,
+        images.filter(img => img.complete).length,
+    ].join('|');
+}"""
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+
+class BrowserPool:
+    """One Chromium shared by `concurrency` reusable browser contexts.
+
+    Use as an async context manager:
+
+        async with BrowserPool(concurrency=4) as pool:
+            ok, message = await pool.capture(url, output_path)
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY,
+                 per_host_rate: float = DEFAULT_PER_HOST_RATE,
+                 block_heavy: bool = True, timeout: float = CAPTURE_TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.per_host_rate = per_host_rate
+        self.block_heavy = block_heavy
+        self.timeout = timeout
+        self.blocked_requests = 0
+        self._playwright = None
+        self._browser = None
+        self._contexts: Optional[asyncio.Queue] = None
+        self._host_limits: Dict[str, RateLimiter] = {}
+
+    async def __aenter__(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._contexts = asyncio.Queue()
+        for _ in range(self.concurrency):
+            context = await self._browser.new_context(viewport=VIEWPORT, user_agent=USER_AGENT)
+            context.set_default_timeout(self.timeout * 1000)
+            if self.block_heavy:
+                await context.route('**/*', self._route)
+            self._contexts.put_nowait(context)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or TRACKER_DOMAINS.match(_host(request.url)):
+            self.blocked_requests += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _host_limit(self, url: str) -> RateLimiter:
+        host = _host(url)
+        if host not in self._host_limits:
+            self._host_limits[host] = RateLimiter(self.per_host_rate)
+        return self._host_limits[host]
+
+    async def _settle(self, page, in_flight: Dict[str, int]) -> int:
+        """Wait for a quiet network and stable layout; returns ms waited."""
+        started = time.monotonic()
+        deadline = started + SETTLE_MAX_MS / 1000
+        quiet_since = None
+        last_signature = None
+        while time.monotonic() < deadline:
+            try:
+                signature = await page.evaluate(_LAYOUT_SIGNATURE_JS)
+            except Exception:
+                signature = None  # navigation in progress (client-side redirect)
+            now = time.monotonic()
+            if in_flight['count'] == 0 and signature is not None and signature == last_signature:
+                quiet_since = quiet_since or now
+                if now - quiet_since >= SETTLE_QUIET_MS / 1000:
+                    break
+            else:
+                quiet_since = None
+            last_signature = signature
+            await asyncio.sleep(SETTLE_POLL_MS / 1000)
+        return int((time.monotonic() - started) * 1000)
+
+    async def capture(self, url: str, output_path: Path) -> Tuple[bool, str]:
+        """Screenshot `url` into `output_path`; returns (success, message)."""
+        context = await self._contexts.get()
+        page = None
+        try:
+            await self._host_limit(url).wait()
+            page = await context.new_page()
+            in_flight = {'count': 0}
+
+            def started(request):
+                in_flight['count'] += 1
+
+            def finished(request):
+                in_flight['count'] = max(0, in_flight['count'] - 1)
+
+            page.on('request', started)
+            page.on('requestfinished', finished)
+            page.on('requestfailed', finished)
+
+            await page.goto(url, wait_until='domcontentloaded')
+            settle_ms = await self._settle(page, in_flight)
+            await page.screenshot(path=str(output_path), full_page=False)
+            return True, f"Screenshot captured with Playwright (settled in {settle_ms} ms)"
+        except Exception as e:
+            return False, f"Playwright error: {e}"
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            self._contexts.put_nowait(context)
+
+    async def capture_all(self, jobs: Iterable[Tuple[str, Path]],
+                          on_result: Optional[Callable[[str, Path, bool, str], None]] = None
+                          ) -> List[Tuple[str, Path, bool, str]]:
+        """Capture every (url, output_path) job, at most `concurrency` at once.
+
+        Jobs are interleaved by host so the per-host limit rarely leaves a
+        context idle waiting for a host it just visited.
+        """
+        results = []
+
+        async def run(url, output_path):
+            ok, message = await self.capture(url, output_path)
+            result = (url, output_path, ok, message)
+            results.append(result)
+            if on_result:
+                on_result(*result)
+
+        await asyncio.gather(*(run(url, path) for url, path in interleave_by_host(jobs)))
+        return results
+
+
+def interleave_by_host(jobs: Iterable[Tuple[str, Path]]) -> List[Tuple[str, Path]]:
+    """Round-robin jobs across hosts: a1 b1 c1 a2 b2 a3 ..."""
+    by_host: Dict[str, List[Tuple[str, Path]]] = {}
+    for job in jobs:
+        by_host.setdefault(_host(job[0]), []).append(job)
+    queues = list(by_host.values())
+    ordered = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        ordered.extend(q[i] for q in queues if i < len(q))
+    return ordered
+
+
+def capture_batch(jobs: List[Tuple[str, Path]], concurrency: int = DEFAULT_CONCURRENCY,
+                  per_host_rate: float = DEFAULT_PER_HOST_RATE,
+                  on_result: Optional[Callable[[str, Path, bool, str], None]] = None
+                  ) -> List[Tuple[str, Path, bool, str]]:
+    """Synchronous wrapper: capture all jobs with one shared browser."""
+
+    async def run():
+        async with BrowserPool(concurrency=concurrency, per_host_rate=per_host_rate) as pool:
+            return await pool.capture_all(jobs, on_result)
+
+    return asyncio.run(run())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Preview freshness scheduler.
+
+check_existing_preview() treats a preview as good forever, and refreshing
+every preview at once would take hours of browser time. This scheduler
+refreshes a few of the stalest previews per run instead and records its
+progress in tools/data/preview-freshness.json, so repeated CI runs
+eventually cover every preview.
+
+For each URL in preview-mapping.json the state file records:
+
+    image          preview file name in img/previews
+    captured_at    when the preview was captured (git commit time of the
+                   image for previews that predate the scheduler)
+    verified_at    when the page was last found unchanged, or a refresh failed
+    etag, last_modified
+                   the page's HTTP validators at the last capture/check
+    image_hash     perceptual hash of the stored preview (tools/preview_hashes.py)
+
+Each run:
+
+1. Takes previews older than --min-age-days, stalest first, counting age
+   from the later of captured_at and verified_at.
+2. Sends a conditional HEAD request (If-None-Match / If-Modified-Since) for
+   up to PROBE_FACTOR x --max-count of them. A page whose validators changed
+   scores CHANGED_WEIGHT x its age. A page without validators scores
+   UNKNOWN_WEIGHT x. A page that answers 304 scores UNCHANGED_WEIGHT x and
+   is marked verified, so it stops coming back to the front of the queue.
+3. Re-captures the highest-scoring previews, in chunks, until the
+   --max-count or --max-minutes budget runs out. The state is saved after
+   every chunk.
+
+A refreshed preview gets a new, content-hashed file name
+(<name>-r<sha256[:8]>.jpg, variants alike) and the mapping follows it. The
+server caches previews as immutable for a year, so reusing the old name
+would keep returning visitors on the old image.
+
+A refresh that fails (no capture, or one rejected by the quality gate) restores
+the old preview and marks the URL verified, so it does not block the queue.
+Set "pinned": true on a URL's entry to exclude hand-made previews.
+
+Usage:
+    python3 tools/preview_freshness.py [--max-count N] [--max-minutes M] [--min-age-days D] [--dry-run]
+    python3 tools/preview_freshness.py --status
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from cli_options import pop_option
+from generate_preview import (
+    PREVIEW_DIR, capture_problem, generate_previews_batch, load_preview_mapping,
+    preview_files, preview_src, update_preview_mapping_entries,
+)
+from preview_capture import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST_RATE
+from preview_hashes import HASH_BITS, default_index
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+STATE_FILE = Path(__file__).parent / 'data' / 'preview-freshness.json'
+BACKUP_DIR = Path(__file__).parent / '.cache' / 'freshness-backup'
+
+DEFAULT_MAX_COUNT = 40
+DEFAULT_MAX_MINUTES = 20
+DEFAULT_MIN_AGE_DAYS = 90
+CHUNK_SIZE = 10          # previews captured per browser session
+PROBE_FACTOR = 3         # validator probes per refresh slot
+PROBE_WORKERS = 16
+PROBE_TIMEOUT = 10       # seconds
+CHANGED_WEIGHT = 3.0
+UNKNOWN_WEIGHT = 1.0
+UNCHANGED_WEIGHT = 0.25
+USER_AGENT = 'Mozilla/5.0 (compatible; CSOH-preview-freshness/1.0; +https://csoh.org)'
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def to_iso(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def from_iso(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+def load_state(path: Optional[Path] = None) -> Dict:
+    path = path or STATE_FILE
+    if not path.exists():
+        return {'urls': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state: Dict, path: Optional[Path] = None):
+    """Write the state atomically (temp file + rename)."""
+    path = path or STATE_FILE
+    state['urls'] = dict(sorted(state['urls'].items()))
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def image_capture_time(image_path: Path) -> datetime:
+    """When an image was last committed to git; its mtime if untracked."""
+    result = subprocess.run(['git', 'log', '-1', '--format=%ct', '--', str(image_path)],
+                            cwd=WORKSPACE_ROOT, capture_output=True, text=True)
+    timestamp = result.stdout.strip()
+    if result.returncode == 0 and timestamp:
+        return datetime.fromtimestamp(int(timestamp), timezone.utc)
+    return datetime.fromtimestamp(int(image_path.stat().st_mtime), timezone.utc)
+
+
+def sync_state(state: Dict, mapping: Dict) -> int:
+    """Add URLs new to the mapping and drop removed ones. Returns the number added."""
+    urls = state.setdefault('urls', {})
+    local = {}
+    for url, entry in mapping.items():
+        src = preview_src(entry)
+        if src and '://' not in src and (WORKSPACE_ROOT / src).exists():
+            local[url] = Path(src).name
+
+    for url in set(urls) - set(local):
+        del urls[url]
+    added = 0
+    for url, image in local.items():
+        record = urls.get(url)
+        if record is None:
+            urls[url] = {'image': image,
+                         'captured_at': to_iso(image_capture_time(PREVIEW_DIR / image))}
+            added += 1
+        elif record.get('image') != image:
+            record.update(image=image, captured_at=to_iso(image_capture_time(PREVIEW_DIR / image)))
+    return added
+
+
+def age_days(record: Dict, now: datetime) -> float:
+    moments = [m for m in (from_iso(record.get('captured_at')), from_iso(record.get('verified_at'))) if m]
+    if not moments:
+        return float('inf')
+    return (now - max(moments)).total_seconds() / 86400
+
+
+def probe(url: str, record: Dict) -> Tuple[str, Optional[str], Optional[str]]:
+    """Conditional HEAD request: ('changed'|'unchanged'|'unknown', etag, last_modified)."""
+    headers = {'User-Agent': USER_AGENT}
+    if record.get('etag'):
+        headers['If-None-Match'] = record['etag']
+    if record.get('last_modified'):
+        headers['If-Modified-Since'] = record['last_modified']
+    request = urllib.request.Request(url, headers=headers, method='HEAD')
+    try:
+        with urllib.request.urlopen(request, timeout=PROBE_TIMEOUT) as response:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return 'unchanged', record.get('etag'), record.get('last_modified')
+        return 'unknown', record.get('etag'), record.get('last_modified')
+    except Exception:
+        return 'unknown', record.get('etag'), record.get('last_modified')
+
+    if not etag and not last_modified:
+        return 'unknown', None, None
+    if not record.get('etag') and not record.get('last_modified'):
+        return 'unknown', etag, last_modified  # first observation: nothing to compare yet
+    same = ((etag and etag == record.get('etag'))
+            or (not etag and last_modified and last_modified == record.get('last_modified')))
+    return ('unchanged' if same else 'changed'), etag, last_modified
+
+
+def schedule(state: Dict, max_count: int, min_age_days: float, now: datetime) -> List[Tuple[float, str, str]]:
+    """Probe the stalest previews and return [(score, status, url)] best first."""
+    urls = state['urls']
+    stale = sorted((url for url, record in urls.items()
+                    if not record.get('pinned') and age_days(record, now) >= min_age_days),
+                   key=lambda url: age_days(urls[url], now), reverse=True)
+    candidates = stale[:max_count * PROBE_FACTOR]
+    if not candidates:
+        return []
+
+    print(f"🔎 Probing {len(candidates)} of {len(stale)} stale previews for changes...")
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        results = list(pool.map(lambda url: probe(url, urls[url]), candidates))
+
+    weights = {'changed': CHANGED_WEIGHT, 'unknown': UNKNOWN_WEIGHT, 'unchanged': UNCHANGED_WEIGHT}
+    ranked = []
+    for url, (status, etag, last_modified) in zip(candidates, results):
+        record = urls[url]
+        ranked.append((age_days(record, now) * weights[status], status, url))
+        record['_validators'] = (etag, last_modified)
+    ranked.sort(reverse=True)
+    return ranked
+
+
+def _backup(image: str):
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    for path in preview_files(PREVIEW_DIR / image):
+        if path.exists():
+            shutil.copy2(path, BACKUP_DIR / path.name)
+
+
+def _restore(image: str):
+    for path in preview_files(PREVIEW_DIR / image):
+        backup = BACKUP_DIR / path.name
+        if backup.exists():
+            shutil.move(str(backup), path)
+        elif path.exists():
+            path.unlink()  # a variant the old preview did not have
+
+
+def versioned_name(image: str) -> str:
+    """Content-hashed file name for a refreshed preview: <name>-r<sha256[:8]><ext>."""
+    path = PREVIEW_DIR / image
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:8]
+    stem = re.sub(r'-r[0-9a-f]{8}$', '', path.stem)
+    return f"{stem}-r{digest}{path.suffix}"
+
+
+def _rename(image: str, new_image: str):
+    """Move a preview and its variants to a new file name."""
+    for old, new in zip(preview_files(PREVIEW_DIR / image), preview_files(PREVIEW_DIR / new_image)):
+        if old.exists():
+            os.replace(old, new)
+
+
+def refresh(state: Dict, ranked: List[Tuple[float, str, str]], max_count: int, max_minutes: float,
+            concurrency: int, per_host_rate: float) -> Tuple[int, int]:
+    """Re-capture previews in ranked order within the budgets. Returns (refreshed, failed)."""
+    urls = state['urls']
+    started = time.monotonic()
+    now = to_iso(now_utc())
+
+    # One capture per image file; URLs sharing a file are updated together
+    queue = []
+    seen_images = set()
+    for score, status, url in ranked:
+        image = urls[url]['image']
+        if status == 'unchanged':
+            etag, last_modified = urls[url].pop('_validators')
+            urls[url].update(verified_at=now, etag=etag, last_modified=last_modified)
+            continue
+        if image not in seen_images:
+            seen_images.add(image)
+            queue.append(url)
+    queue = queue[:max_count]
+
+    refreshed = failed = 0
+    for start in range(0, len(queue), CHUNK_SIZE):
+        if time.monotonic() - started > max_minutes * 60:
+            print(f"\n⏱️  Time budget of {max_minutes:g} min used; {len(queue) - start} refresh(es) left for the next run")
+            break
+        chunk = queue[start:start + CHUNK_SIZE]
+        filenames = {url: urls[url]['image'] for url in chunk}
+        for image in filenames.values():
+            _backup(image)
+
+        chunk_started = time.time_ns()
+        generate_previews_batch(chunk, concurrency, per_host_rate, force=True, dedupe=False,
+                                output_filenames=filenames, placeholders=False)
+
+        index = default_index()
+        captured_at = to_iso(now_utc())
+        refreshed_images = set()
+        for url, image in filenames.items():
+            image_path = PREVIEW_DIR / image
+            if not image_path.exists() or image_path.stat().st_mtime_ns < chunk_started:
+                problem = "no strategy could capture the page"
+            else:
+                problem = capture_problem(image_path)
+            sharing = [other for other, record in urls.items() if record['image'] == image]
+            etag, last_modified = urls[url].get('_validators', (None, None))
+            urls[url].update(etag=etag, last_modified=last_modified)
+            if problem:
+                failed += 1
+                _restore(image)
+                print(f"  ↩️  {url}: {problem}; kept the previous preview")
+                for other in sharing:
+                    urls[other].update(verified_at=captured_at, last_error=problem)
+                continue
+            refreshed += 1
+            new_image = versioned_name(image)
+            _rename(image, new_image)
+            refreshed_images.add(new_image)
+            image_hash = f"{index.hash(PREVIEW_DIR / new_image).dhash:0{HASH_BITS // 4}x}"
+            for other in sharing:
+                urls[other].update(image=new_image, captured_at=captured_at, image_hash=image_hash)
+                urls[other].pop('verified_at', None)
+                urls[other].pop('last_error', None)
+            for path in preview_files(PREVIEW_DIR / image):
+                (BACKUP_DIR / path.name).unlink(missing_ok=True)
+
+        # Recompute mapping entries (variant sources) for every URL using a refreshed file
+        if refreshed_images:
+            update_preview_mapping_entries({other: record['image'] for other, record in urls.items()
+                                            if record['image'] in refreshed_images})
+        _save(state, index)
+
+    return refreshed, failed
+
+
+def _save(state: Dict, index=None):
+    for record in state['urls'].values():
+        record.pop('_validators', None)
+    save_state(state)
+    if index is not None:
+        index.save()
+
+
+def print_status(state: Dict, min_age_days: float, now: datetime):
+    urls = state['urls']
+    ages = sorted((age_days(record, now), url) for url, record in urls.items() if not record.get('pinned'))
+    stale = [item for item in ages if item[0] >= min_age_days]
+    print(f"📊 {len(urls)} previews tracked, {len(stale)} older than {min_age_days:g} days")
+    for age, url in reversed(stale[-10:]):
+        print(f"  {age:6.0f}d  {url}")
+
+
+def main():
+    max_count = int(pop_option('--max-count', DEFAULT_MAX_COUNT))
+    max_minutes = float(pop_option('--max-minutes', DEFAULT_MAX_MINUTES))
+    min_age_days = float(pop_option('--min-age-days', DEFAULT_MIN_AGE_DAYS))
+    concurrency = int(pop_option('--concurrency', DEFAULT_CONCURRENCY))
+    per_host_rate = float(pop_option('--per-host-rate', DEFAULT_PER_HOST_RATE))
+    dry_run = '--dry-run' in sys.argv
+
+    state = load_state()
+    added = sync_state(state, load_preview_mapping())
+    if added:
+        print(f"📇 Tracking {added} new preview(s)")
+    now = now_utc()
+
+    if '--status' in sys.argv:
+        print_status(state, min_age_days, now)
+        _save(state)
+        return 0
+
+    ranked = schedule(state, max_count, min_age_days, now)
+    if not ranked:
+        print(f"✅ No previews older than {min_age_days:g} days")
+        _save(state)
+        return 0
+
+    counts = {status: sum(1 for _, s, _ in ranked if s == status) for status in ('changed', 'unknown', 'unchanged')}
+    print(f"   {counts['changed']} changed, {counts['unknown']} without validators, {counts['unchanged']} unchanged\n")
+    if dry_run:
+        for score, status, url in ranked[:max_count]:
+            print(f"  {score:7.1f}  {status:<9}  {url}")
+        return 0
+
+    refreshed, failed = refresh(state, ranked, max_count, max_minutes, concurrency, per_host_rate)
+    _save(state)
+    print(f"\n✅ Refreshed {refreshed} preview(s), {failed} kept after a failed refresh")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index of preview images.
+
+Every fallback image in img/previews is reduced to a 256-bit difference
+hash (dHash, 16x16 gradient signs) plus a "blank" score (the fraction of
+pixels within BLANK_TOLERANCE grey levels of the dominant one). Hashes are
+cached in tools/.cache/preview-hashes.json keyed by file size and mtime, so
+only new or changed previews are decoded on each run.
+
+The index answers two questions:
+
+- is this capture bad? Near-blank renders, and captures within
+  KNOWN_BAD_DISTANCE bits of an exemplar in tools/data/bad-preview-hashes.txt
+  (Cloudflare challenges, "Access Denied", 404 pages, the thum.io
+  "Generating Preview" image), are rejected so they are retried.
+- is this preview a duplicate? Good previews within DUPLICATE_DISTANCE bits
+  of each other are the same image; URLs can share one stored file.
+
+Near-duplicate lookups use multi-index hashing: the hash is split into
+DUPLICATE_DISTANCE + 1 bands, and any two hashes within that distance agree
+exactly on at least one band, so a lookup is a few dict probes instead of a
+scan over every preview.
+
+Usage:
+    python3 tools/preview_hashes.py update
+    python3 tools/preview_hashes.py check [image ...]
+    python3 tools/preview_hashes.py mark-bad <image> <label>
+"""
+
+import json
+import os
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+PREVIEW_DIR = Path(__file__).parent.parent / 'img' / 'previews'
+INDEX_FILE = Path(__file__).parent / '.cache' / 'preview-hashes.json'
+BAD_HASHES_FILE = Path(__file__).parent / 'data' / 'bad-preview-hashes.txt'
+
+HASH_SIZE = 16            # dHash grid: 16x16 = 256 bits
+HASH_BITS = HASH_SIZE * HASH_SIZE
+DUPLICATE_DISTANCE = 10   # bits; distinct pages of one site (GitHub repos) differ by 30+
+KNOWN_BAD_DISTANCE = 14   # bits; Cloudflare challenge variants are within 13 of each other
+NEAR_BLANK_FRACTION = 0.98
+BLANK_TOLERANCE = 12      # grey levels around the dominant one that count as "blank"
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png'}  # fallback images; -NNNw.webp/.avif variants are skipped
+
+
+class ImageHash(NamedTuple):
+    dhash: int
+    blank: float
+
+
+def compute_hash(path) -> ImageHash:
+    """dHash and blank score of one image."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.draft('L', (HASH_SIZE * 16, HASH_SIZE * 16))
+        gray = img.convert('L')
+
+    pixels = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS).tobytes()
+    dhash = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            dhash = dhash << 1 | (pixels[offset + col] > pixels[offset + col + 1])
+
+    histogram = gray.resize((64, 48), Image.Resampling.BOX).histogram()
+    dominant = max(range(256), key=histogram.__getitem__)
+    near_dominant = sum(histogram[max(0, dominant - BLANK_TOLERANCE):dominant + BLANK_TOLERANCE + 1])
+    return ImageHash(dhash, near_dominant / (64 * 48))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class HashIndex:
+    """Multi-index hash table for Hamming-distance lookups up to `max_distance`."""
+
+    def __init__(self, max_distance: int, bits: int = HASH_BITS):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        bounds = [bits * i // bands for i in range(bands + 1)]
+        self._bands = [(start, end - start) for start, end in zip(bounds, bounds[1:])]
+        self._tables: List[Dict[int, set]] = [{} for _ in self._bands]
+        self.hashes: Dict[str, int] = {}
+
+    def _band_keys(self, value: int):
+        return [(value >> start) & ((1 << width) - 1) for start, width in self._bands]
+
+    def add(self, key: str, value: int):
+        self.remove(key)
+        self.hashes[key] = value
+        for table, band in zip(self._tables, self._band_keys(value)):
+            table.setdefault(band, set()).add(key)
+
+    def remove(self, key: str):
+        value = self.hashes.pop(key, None)
+        if value is None:
+            return
+        for table, band in zip(self._tables, self._band_keys(value)):
+            table[band].discard(key)
+
+    def near(self, value: int) -> List[Tuple[int, str]]:
+        """(distance, key) for every stored hash within max_distance, closest first."""
+        candidates = set()
+        for table, band in zip(self._tables, self._band_keys(value)):
+            candidates |= table.get(band, set())
+        matches = ((hamming(value, self.hashes[key]), key) for key in candidates)
+        return sorted(match for match in matches if match[0] <= self.max_distance)
+
+
+def load_bad_hashes(path: Path = BAD_HASHES_FILE) -> List[Tuple[int, str]]:
+    """(hash, label) pairs; one '<hex hash> <label>' per line, # comments ignored."""
+    if not path.exists():
+        return []
+    exemplars = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                value, _, label = line.partition(' ')
+                exemplars.append((int(value, 16), label.strip() or 'known bad capture'))
+    return exemplars
+
+
+class PreviewHashIndex:
+    """Incrementally maintained hashes of the images in img/previews."""
+
+    def __init__(self, preview_dir: Path = PREVIEW_DIR, index_file: Path = INDEX_FILE,
+                 bad_hashes: Optional[List[Tuple[int, str]]] = None):
+        self.preview_dir = Path(preview_dir)
+        self.index_file = Path(index_file)
+        self.bad_hashes = load_bad_hashes() if bad_hashes is None else bad_hashes
+        self.entries: Dict[str, Dict] = {}
+        self._duplicates = HashIndex(DUPLICATE_DISTANCE)
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            return
+        for name, entry in entries.items():
+            self._set(name, entry)
+
+    def _set(self, name: str, entry: Dict):
+        self.entries[name] = entry
+        image_hash = ImageHash(int(entry['dhash'], 16), entry['blank'])
+        if self.problem_for_hash(image_hash):
+            self._duplicates.remove(name)
+        else:
+            self._duplicates.add(name, image_hash.dhash)
+
+    def save(self):
+        """Write the index atomically if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_file.with_name(self.index_file.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'hash_size': HASH_SIZE, 'entries': dict(sorted(self.entries.items()))}, f, indent=1)
+            os.replace(tmp_path, self.index_file)
+            self._dirty = False
+
+    def hash(self, path) -> ImageHash:
+        """Hash of `path`, from the index when its size and mtime are unchanged."""
+        path = Path(path)
+        stat = path.stat()
+        indexed = path.parent.resolve() == self.preview_dir.resolve() and path.suffix.lower() in IMAGE_SUFFIXES
+        with self._lock:
+            entry = self.entries.get(path.name) if indexed else None
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                return ImageHash(int(entry['dhash'], 16), entry['blank'])
+        image_hash = compute_hash(path)
+        if indexed:
+            with self._lock:
+                self._set(path.name, {'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                                      'dhash': f"{image_hash.dhash:0{HASH_BITS // 4}x}",
+                                      'blank': round(image_hash.blank, 4)})
+                self._dirty = True
+        return image_hash
+
+    def update(self) -> Tuple[int, int]:
+        """Hash new/changed previews and forget deleted ones. Returns (hashed, removed)."""
+        names = {path.name for path in self.preview_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES}
+        with self._lock:
+            before = dict(self.entries)
+            for name in set(self.entries) - names:
+                del self.entries[name]
+                self._duplicates.remove(name)
+                self._dirty = True
+        hashed = 0
+        for name in sorted(names):
+            self.hash(self.preview_dir / name)
+            if self.entries.get(name) is not before.get(name):
+                hashed += 1
+        return hashed, len(set(before) - names)
+
+    def problem_for_hash(self, image_hash: ImageHash) -> Optional[str]:
+        if image_hash.blank >= NEAR_BLANK_FRACTION:
+            return f"near-blank ({image_hash.blank:.0%} one colour)"
+        for value, label in self.bad_hashes:
+            distance = hamming(image_hash.dhash, value)
+            if distance <= KNOWN_BAD_DISTANCE:
+                return f"looks like {label} ({distance} bits)"
+        return None
+
+    def problem(self, path) -> Optional[str]:
+        """Why `path` is not a usable preview, or None if it looks fine."""
+        return self.problem_for_hash(self.hash(path))
+
+    def duplicate_of(self, path) -> Optional[str]:
+        """Name of another good preview that is near-identical to `path`, if any."""
+        path = Path(path)
+        image_hash = self.hash(path)
+        if self.problem_for_hash(image_hash):
+            return None
+        with self._lock:
+            for _, name in self._duplicates.near(image_hash.dhash):
+                if name != path.name and (self.preview_dir / name).exists():
+                    return name
+        return None
+
+    def duplicate_groups(self) -> List[List[str]]:
+        """Groups of near-identical good previews (each sorted by name)."""
+        with self._lock:
+            seen = set()
+            groups = []
+            for name, value in sorted(self._duplicates.hashes.items()):
+                if name in seen:
+                    continue
+                group = sorted({name} | {other for _, other in self._duplicates.near(value)})
+                seen.update(group)
+                if len(group) > 1:
+                    groups.append(group)
+            return groups
+
+
+@lru_cache(maxsize=1)
+def default_index() -> PreviewHashIndex:
+    return PreviewHashIndex()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('update', 'check', 'mark-bad'):
+        print("Usage:")
+        print("  python3 tools/preview_hashes.py update")
+        print("  python3 tools/preview_hashes.py check [image ...]")
+        print("  python3 tools/preview_hashes.py mark-bad <image> <label>")
+        return 1
+
+    index = default_index()
+    command = sys.argv[1]
+
+    if command == 'mark-bad':
+        if len(sys.argv) < 4:
+            print("Usage: python3 tools/preview_hashes.py mark-bad <image> <label>")
+            return 1
+        image_hash = compute_hash(sys.argv[2])
+        label = ' '.join(sys.argv[3:])
+        with open(BAD_HASHES_FILE, 'a', encoding='utf-8') as f:
+            f.write(f"{image_hash.dhash:0{HASH_BITS // 4}x} {label}\n")
+        print(f"✅ Added {label} to {BAD_HASHES_FILE.name}")
+        return 0
+
+    hashed, removed = index.update()
+    index.save()
+    print(f"📇 {len(index.entries)} previews indexed ({hashed} hashed, {removed} removed)")
+    if command == 'update':
+        return 0
+
+    paths = [Path(arg) for arg in sys.argv[2:]] or [PREVIEW_DIR / name for name in sorted(index.entries)]
+    bad = 0
+    for path in paths:
+        problem = index.problem(path)
+        if problem:
+            bad += 1
+            print(f"  ❌ {path.name}: {problem}")
+        elif sys.argv[2:]:
+            duplicate = index.duplicate_of(path)
+            print(f"  ✅ {path.name}" + (f" (duplicate of {duplicate})" if duplicate else ""))
+    if not sys.argv[2:]:
+        for group in index.duplicate_groups():
+            print(f"  🔁 near-identical: {', '.join(group)}")
+    index.save()
+    print(f"\n{bad} bad preview(s)")
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
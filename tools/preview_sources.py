@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Metadata-based preview sources that need no browser.
+
+Most resources already publish a preview image, so fetching it is one or
+two small HTTP requests instead of a full page render:
+
+- per-domain rules: YouTube videos map straight to their thumbnail on
+  img.youtube.com, GitHub repositories to their social card on
+  opengraph.githubassets.com
+- og:image / twitter:image, read from the <head> of the page; only the
+  first HEAD_MAX_BYTES are downloaded
+
+Each fetcher has the same signature as the capture methods in
+tools/generate_preview.py, (url, output_path) -> (success, message), so
+they slot into the same strategy chain. The downloaded image is saved
+as-is to output_path; optimize_image() re-encodes it afterwards.
+
+Usage:
+    python3 tools/preview_sources.py <url> [...]
+"""
+
+import io
+import re
+import sys
+import urllib.request
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+from public_suffix import DomainRuleSet
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+FETCH_TIMEOUT = 15  # seconds per request
+HEAD_MAX_BYTES = 256 * 1024   # stop reading HTML after this much if </head> has not appeared
+IMAGE_MAX_BYTES = 8 * 1024 * 1024
+MIN_IMAGE_WIDTH = 200   # smaller images are favicons/logos, not previews
+MIN_IMAGE_HEIGHT = 100
+IMAGE_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF', 'AVIF'}
+
+# Meta tags that name a preview image, best first
+IMAGE_META_KEYS = ('og:image:secure_url', 'og:image', 'og:image:url', 'twitter:image', 'twitter:image:src')
+
+YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+# github.com/<first segment> paths that are not repository owners
+GITHUB_RESERVED = {
+    'about', 'apps', 'collections', 'customer-stories', 'enterprise', 'events', 'explore',
+    'features', 'login', 'marketplace', 'orgs', 'pricing', 'readme', 'resources', 'search',
+    'security', 'settings', 'signup', 'site', 'solutions', 'sponsors', 'topics', 'trending',
+}
+
+
+def youtube_thumbnail_urls(url: str) -> List[str]:
+    """img.youtube.com thumbnails for a video URL, largest first."""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split('/') if s]
+    video_id = None
+    if (parts.hostname or '').endswith('youtu.be'):
+        video_id = segments[0] if segments else None
+    elif segments[:1] == ['watch']:
+        video_id = parse_qs(parts.query).get('v', [None])[0]
+    elif len(segments) >= 2 and segments[0] in ('embed', 'shorts', 'live', 'v'):
+        video_id = segments[1]
+    if not video_id or not YOUTUBE_ID.match(video_id):
+        return []
+    # maxresdefault only exists for HD uploads; hqdefault always does
+    return [f"https://img.youtube.com/vi/{video_id}/{name}.jpg" for name in ('maxresdefault', 'hqdefault')]
+
+
+def github_card_urls(url: str) -> List[str]:
+    """GitHub's social card for a repository URL (the same image as its og:image)."""
+    segments = [s for s in urlsplit(url).path.split('/') if s]
+    if len(segments) < 2 or segments[0].lower() in GITHUB_RESERVED:
+        return []
+    owner, repo = segments[0], segments[1].removesuffix('.git')
+    return [f"https://opengraph.githubassets.com/1/{owner}/{repo}"]
+
+
+# Registrable domain (or subdomain) -> function returning candidate image URLs
+DOMAIN_RULES: Dict[str, Callable[[str], List[str]]] = {
+    'youtube.com': youtube_thumbnail_urls,
+    'youtu.be': youtube_thumbnail_urls,
+    'github.com': github_card_urls,
+}
+_DOMAIN_RULE_SET = DomainRuleSet(DOMAIN_RULES)
+
+
+def _open(url: str, accept: str):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, 'Accept': accept})
+    return urllib.request.urlopen(request, timeout=FETCH_TIMEOUT)
+
+
+def download_image(image_url: str, output_path) -> Tuple[bool, str]:
+    """Save `image_url` to `output_path` if it decodes and is large enough for a preview."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False, "Pillow not installed (pip install Pillow)"
+
+    try:
+        with _open(image_url, 'image/avif,image/webp,image/*;q=0.8') as response:
+            data = response.read(IMAGE_MAX_BYTES + 1)
+    except Exception as e:
+        return False, f"image fetch error: {e}"
+    if len(data) > IMAGE_MAX_BYTES:
+        return False, f"image larger than {IMAGE_MAX_BYTES // (1024 * 1024)}MB"
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            fmt, (width, height) = img.format, img.size
+            img.verify()
+    except Exception:
+        return False, "not a decodable image"
+    if fmt not in IMAGE_FORMATS:
+        return False, f"unsupported image format {fmt}"
+    if width < MIN_IMAGE_WIDTH or height < MIN_IMAGE_HEIGHT:
+        return False, f"image too small ({width}x{height})"
+
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    return True, f"{fmt} {width}x{height} from {image_url}"
+
+
+class _HeadMetaParser(HTMLParser):
+    """Collects <meta property/name=... content=...> and <link rel=image_src> from <head>."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, str] = {}
+        self.in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: value or '' for name, value in attrs}
+        if tag == 'body':
+            self.in_body = True
+        elif tag == 'meta':
+            key = (attributes.get('property') or attributes.get('name') or '').strip().lower()
+            content = attributes.get('content', '').strip()
+            if key and content:
+                self.meta.setdefault(key, content)
+        elif tag == 'link' and 'image_src' in attributes.get('rel', '').lower().split():
+            self.meta.setdefault('image_src', attributes.get('href', '').strip())
+
+    handle_startendtag = handle_starttag
+
+
+def read_head(url: str) -> Tuple[str, str]:
+    """(final URL, HTML up to </head>) reading at most HEAD_MAX_BYTES."""
+    with _open(url, 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5') as response:
+        content_type = response.headers.get('Content-Type', '')
+        if 'html' not in content_type.lower():
+            raise ValueError(f"not HTML ({content_type or 'no content type'})")
+        charset = response.headers.get_content_charset() or 'utf-8'
+        chunks = []
+        size = 0
+        while size < HEAD_MAX_BYTES:
+            chunk = response.read(16 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+            if b'</head>' in chunk.lower():
+                break
+        html = b''.join(chunks).decode(charset, errors='replace')
+        return response.geturl(), html.split('</head>', 1)[0]
+
+
+def find_meta_image(html: str, base_url: str) -> Optional[str]:
+    """Absolute URL of the page's og:image / twitter:image, if any."""
+    parser = _HeadMetaParser()
+    parser.feed(html)
+    for key in IMAGE_META_KEYS + ('image_src',):
+        value = parser.meta.get(key)
+        if value:
+            image_url = urljoin(base_url, value)
+            if image_url.lower().startswith(('http://', 'https://')):
+                return image_url
+    return None
+
+
+def fetch_with_domain_rule(url: str, output_path) -> Tuple[bool, str]:
+    """Preview from a per-domain rule (YouTube thumbnail, GitHub card)."""
+    rule = _DOMAIN_RULE_SET.match(urlsplit(url).hostname or '')
+    if rule is None:
+        return False, "no domain rule"
+    candidates = DOMAIN_RULES[rule](url)
+    if not candidates:
+        return False, f"{rule} rule does not apply to this URL"
+    message = "no candidates"
+    for image_url in candidates:
+        result, message = download_image(image_url, output_path)
+        if result:
+            return True, f"{rule} rule: {message}"
+    return False, f"{rule} rule: {message}"
+
+
+def fetch_og_image(url: str, output_path) -> Tuple[bool, str]:
+    """Preview from the page's og:image / twitter:image meta tag."""
+    try:
+        final_url, head = read_head(url)
+    except Exception as e:
+        return False, f"og:image: {e}"
+    image_url = find_meta_image(head, final_url)
+    if not image_url:
+        return False, "og:image: page has no preview image meta tag"
+    result, message = download_image(image_url, output_path)
+    return result, f"og:image: {message}"
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 tools/preview_sources.py <url> [...]")
+        return 1
+    for url in sys.argv[1:]:
+        rule = _DOMAIN_RULE_SET.match(urlsplit(url).hostname or '')
+        candidates = DOMAIN_RULES[rule](url) if rule else []
+        if candidates:
+            print(f"{url}\n  {rule} rule: {candidates[0]}")
+            continue
+        try:
+            final_url, head = read_head(url)
+            print(f"{url}\n  og:image: {find_meta_image(head, final_url) or '(none)'}")
+        except Exception as e:
+            print(f"{url}\n  error: {e}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Public Suffix List lookups for the CSOH URL tools.
+
+Extracts the registrable domain ("eTLD+1") of a hostname using the bundled
+Public Suffix List (tools/data/public_suffix_list.dat) and matches hosts
+against allow/block lists on label boundaries, so that rules such as
+'google.com' match 'google.com' and 'mail.google.com' but never
+'google.com.evil.tk' or 'notgoogle.com'.
+
+The list is compiled into a reversed-label trie the first time it is
+needed and cached for the lifetime of the process, so each lookup costs
+O(number of labels in the host).
+
+Usage:
+    python3 tools/public_suffix.py <hostname> [hostname ...]
+"""
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+PSL_FILE = Path(__file__).parent / 'data' / 'public_suffix_list.dat'
+
+# Trie node flags (labels never contain these characters)
+_RULE = '$rule'
+_EXCEPTION = '$exception'
+
+
+def normalize_host(host: str) -> str:
+    """Lowercase a hostname, strip a trailing dot and convert it to ASCII (punycode)."""
+    host = (host or '').strip().lower().rstrip('.')
+    if not host or host.isascii():
+        return host
+    labels = []
+    for label in host.split('.'):
+        try:
+            labels.append(label.encode('idna').decode('ascii'))
+        except UnicodeError:
+            labels.append(label)
+    return '.'.join(labels)
+
+
+class PublicSuffixList:
+    """Reversed-label trie built from Public Suffix List rules."""
+
+    def __init__(self, rules: Iterable[str]):
+        self._root: Dict = {}
+        self.rule_count = 0
+        for rule in rules:
+            self._add_rule(rule)
+
+    @classmethod
+    def from_file(cls, path: Path = PSL_FILE) -> 'PublicSuffixList':
+        """Load rules from a public_suffix_list.dat file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f)
+
+    def _add_rule(self, line: str):
+        rule = line.strip().split(None, 1)[0] if line.strip() else ''
+        if not rule or rule.startswith('//'):
+            return
+
+        exception = rule.startswith('!')
+        if exception:
+            rule = rule[1:]
+
+        node = self._root
+        for label in reversed(normalize_host(rule).split('.')):
+            node = node.setdefault(label, {})
+        node[_EXCEPTION if exception else _RULE] = True
+        self.rule_count += 1
+
+    def _suffix_label_count(self, labels) -> int:
+        """Return how many trailing labels form the public suffix.
+
+        `labels` is the hostname split on dots and reversed (TLD first).
+        Implements the PSL algorithm: the longest matching rule wins,
+        exception rules beat everything, and an unlisted TLD is treated
+        as a public suffix on its own (the implicit '*' rule).
+        """
+        longest = 1
+        exception = None
+        pending = [(self._root, 0)]
+
+        while pending:
+            node, depth = pending.pop()
+            if depth == len(labels):
+                continue
+            for key in (labels[depth], '*'):
+                child = node.get(key)
+                if child is None:
+                    continue
+                if child.get(_EXCEPTION):
+                    # '!www.ck' means 'ck' is the suffix, not 'www.ck'
+                    exception = depth if exception is None else min(exception, depth)
+                if child.get(_RULE):
+                    longest = max(longest, depth + 1)
+                pending.append((child, depth + 1))
+
+        return exception if exception is not None else longest
+
+    def public_suffix(self, host: str) -> Optional[str]:
+        """Return the public suffix of `host` (e.g. 'co.uk' for 'bbc.co.uk')."""
+        host = normalize_host(host)
+        if not host:
+            return None
+        labels = host.split('.')
+        count = self._suffix_label_count(labels[::-1])
+        return '.'.join(labels[-count:])
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        """Return the registrable domain (eTLD+1) of `host`.
+
+        Returns None when the host is itself a public suffix
+        (e.g. 'co.uk' or 'github.io') or is empty.
+        """
+        host = normalize_host(host)
+        if not host:
+            return None
+        labels = host.split('.')
+        count = self._suffix_label_count(labels[::-1])
+        if len(labels) <= count:
+            return None
+        return '.'.join(labels[-(count + 1):])
+
+
+@lru_cache(maxsize=1)
+def get_public_suffix_list() -> PublicSuffixList:
+    """Load the bundled Public Suffix List once and reuse it across checks."""
+    return PublicSuffixList.from_file(PSL_FILE)
+
+
+def registrable_domain(host: str) -> Optional[str]:
+    """Registrable domain of `host` using the bundled list."""
+    return get_public_suffix_list().registrable_domain(host)
+
+
+class DomainRuleSet:
+    """A set of domain rules matched on exact domain or subdomain.
+
+    A rule 'aws.amazon.com' matches 'aws.amazon.com' and
+    'docs.aws.amazon.com' but not 'amazon.com' or 'aws.amazon.com.evil.tk'.
+
+    With stop_at_registrable (the default, for allowlists) candidate parents
+    are only generated down to the host's registrable domain, so a rule that
+    is itself a public suffix (e.g. 'github.io') only ever matches that exact
+    host and cannot allow every tenant. Blocklists pass False so that a
+    listed suffix such as 'duckdns.org' covers all of its subdomains.
+    """
+
+    def __init__(self, domains: Iterable[str], psl: Optional[PublicSuffixList] = None,
+                 stop_at_registrable: bool = True):
+        self._psl = psl
+        self.stop_at_registrable = stop_at_registrable
+        self.domains = {normalize_host(d) for d in domains if d and d.strip()}
+
+    @property
+    def psl(self) -> PublicSuffixList:
+        if self._psl is None:
+            self._psl = get_public_suffix_list()
+        return self._psl
+
+    def __len__(self):
+        return len(self.domains)
+
+    def __contains__(self, host: str) -> bool:
+        return self.match(host) is not None
+
+    def match(self, host: str) -> Optional[str]:
+        """Return the rule matching `host`, or None."""
+        host = normalize_host(host)
+        if not host or not self.domains:
+            return None
+
+        for candidate in iter_parent_domains(host, self.psl, self.stop_at_registrable):
+            if candidate in self.domains:
+                return candidate
+        return None
+
+
+def iter_parent_domains(host: str, psl: Optional[PublicSuffixList] = None,
+                        stop_at_registrable: bool = True):
+    """Yield `host` and each parent domain down to its registrable domain.
+
+    For 'a.b.example.co.uk' this yields 'a.b.example.co.uk',
+    'b.example.co.uk' and 'example.co.uk'. Hosts that are public
+    suffixes (or have no registrable domain) yield only themselves.
+    With stop_at_registrable=False every parent is yielded, down to the
+    top-level domain ('co.uk', then 'uk').
+    """
+    host = normalize_host(host)
+    if not host:
+        return
+    labels = host.split('.')
+    if not stop_at_registrable:
+        for i in range(len(labels)):
+            yield '.'.join(labels[i:])
+        return
+    psl = psl or get_public_suffix_list()
+    registrable = psl.registrable_domain(host)
+    if registrable is None:
+        yield host
+        return
+    for i in range(len(labels) - registrable.count('.')):
+        yield '.'.join(labels[i:])
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 tools/public_suffix.py <hostname> [hostname ...]")
+        return 1
+
+    psl = get_public_suffix_list()
+    for host in sys.argv[1:]:
+        print(f"{host}")
+        print(f"  public suffix:      {psl.public_suffix(host)}")
+        print(f"  registrable domain: {psl.registrable_domain(host)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
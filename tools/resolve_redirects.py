@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Rewrite outbound links to their final HTTPS destination.
+
+Links that bounce through redirects (http:// → https://, old paths, URL
+shorteners such as a.co) cost visitors extra round trips. This tool takes
+the redirect chains recorded by tools/check_links.py and rewrites:
+
+- href attributes in the site's top-level HTML pages
+- the "url" of each chat resource in tools/data/chat-resources.json; the
+  cards of chat-resources.html are generated from it, so that page is
+  re-rendered with tools/build_chat_resources.py instead of edited
+- keys of preview-mapping.json
+
+to the final canonical HTTPS URL. A link is only rewritten when its chain
+ends in a 2xx response on HTTPS, the destination passes the URL safety
+check, it is not a redirect from a deep link to a bare site root (usually
+a removed page), and it is not covered by the allowlist
+(tools/data/redirect-allowlist.txt).
+
+Usage:
+    python3 tools/resolve_redirects.py --dry-run        # show a diff only
+    python3 tools/resolve_redirects.py                  # rewrite files
+    python3 tools/resolve_redirects.py --refresh        # re-resolve stale chains first
+"""
+
+import argparse
+import asyncio
+import difflib
+import html
+import json
+import re
+import sys
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from build_chat_resources import DATA_FILE, PAGE as CHAT_PAGE, build, load_records, save_records
+from check_links import RESULTS_FILE, LinkChecker, is_fresh, load_results, save_results
+from check_url_safety import URLSafetyChecker
+from public_suffix import DomainRuleSet
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+PREVIEW_MAPPING = WORKSPACE_ROOT / 'preview-mapping.json'
+ALLOWLIST_FILE = Path(__file__).parent / 'data' / 'redirect-allowlist.txt'
+
+HREF_PATTERN = re.compile(r'(\bhref=)(["\'])(https?://[^"\']+)\2', re.IGNORECASE)
+
+
+def load_allowlist(path: Path = ALLOWLIST_FILE) -> Tuple[set, DomainRuleSet]:
+    """Return (exact URLs, domain rules) that must never be rewritten."""
+    urls, domains = set(), []
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = line.split('#', 1)[0].strip()
+                if entry.startswith(('http://', 'https://')):
+                    urls.add(entry)
+                elif entry:
+                    domains.append(entry)
+    return urls, DomainRuleSet(domains)
+
+
+class RedirectResolver:
+    """Decides the rewrite target for each URL from recorded link-check results."""
+
+    def __init__(self, results: Dict[str, Dict], allowlist_path: Path = ALLOWLIST_FILE):
+        self.results = results
+        self.allowed_urls, self.allowed_domains = load_allowlist(allowlist_path)
+        self.checker = URLSafetyChecker()
+        self.skipped: Dict[str, str] = {}
+
+    def target(self, url: str) -> Optional[str]:
+        """Final URL to use instead of `url`, or None to leave it alone."""
+        if url in self.allowed_urls or self.allowed_domains.match(urlsplit(url).hostname or ''):
+            return None
+
+        result = self.results.get(url)
+        if not result or result.get('error') or len(result.get('chain', [])) < 2:
+            return None
+
+        final = result.get('final_url') or ''
+        status = result.get('status') or 0
+        if not 200 <= status < 300:
+            self.skipped[url] = f"final status {status}"
+            return None
+        if not final.startswith('https://'):
+            self.skipped[url] = "final destination is not HTTPS"
+            return None
+        if final == url:
+            return None
+
+        original_path = urlsplit(url).path.strip('/')
+        if original_path and urlsplit(final).path.strip('/') == '':
+            self.skipped[url] = "redirects to site root (page probably removed)"
+            return None
+
+        if not self.checker.check_url(final)['safe']:
+            self.skipped[url] = "final destination failed the URL safety check"
+            return None
+
+        return final
+
+
+def rewrite_html(content: str, resolver: RedirectResolver) -> Tuple[str, List[Tuple[str, str]]]:
+    """Rewrite href attributes; returns new content and (old, new) pairs."""
+    changes = []
+
+    def replace(match):
+        raw = match.group(3)
+        url = html.unescape(raw)
+        final = resolver.target(url)
+        if not final:
+            return match.group(0)
+        changes.append((url, final))
+        escaped = final.replace('&', '&amp;').replace(match.group(2), html.escape(match.group(2)))
+        return f'{match.group(1)}{match.group(2)}{escaped}{match.group(2)}'
+
+    return HREF_PATTERN.sub(replace, content), changes
+
+
+def rewrite_records(records: List[Dict], resolver: RedirectResolver) -> List[Tuple[str, str]]:
+    """Rewrite the url of chat resource records in place; returns (old, new) pairs."""
+    changes = []
+    for record in records:
+        final = resolver.target(record['url'])
+        if final:
+            changes.append((record['url'], final))
+            record['url'] = final
+    return changes
+
+
+def rewrite_mapping(mapping: Dict[str, str], resolver: RedirectResolver) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    """Re-key preview-mapping.json entries in place; an existing final key wins."""
+    updated, changes = {}, []
+    for url, preview in mapping.items():
+        final = resolver.target(url)
+        if final:
+            changes.append((url, final))
+            updated.setdefault(final, mapping.get(final, preview))
+        else:
+            updated.setdefault(url, preview)
+    return updated, changes
+
+
+def refresh_results(urls: List[str], results: Dict[str, Dict], max_age_hours: float):
+    """Resolve chains that are missing or older than max_age_hours."""
+    due = [u for u in urls if not is_fresh(results.get(u), timedelta(hours=max_age_hours))]
+    if not due:
+        return
+    print(f"🔗 Resolving {len(due)} redirect chain(s)...")
+    checker = LinkChecker()
+    for result in asyncio.run(checker.check_all(due)):
+        results[result['url']] = result
+    save_results(results)
+
+
+def show_diff(path: Path, before: str, after: str):
+    diff = difflib.unified_diff(before.splitlines(keepends=True), after.splitlines(keepends=True),
+                                fromfile=f'a/{path.name}', tofile=f'b/{path.name}', n=0)
+    sys.stdout.writelines(diff)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite redirecting links to their final HTTPS URL")
+    parser.add_argument('--dry-run', action='store_true', help='Print a diff without writing files')
+    parser.add_argument('--refresh', action='store_true', help='Resolve missing or stale redirect chains first')
+    parser.add_argument('--max-age', type=float, default=168, help='Hours before a recorded chain is stale (default: 168)')
+    parser.add_argument('--allowlist', type=Path, default=ALLOWLIST_FILE, help='Links/domains to leave alone')
+    args = parser.parse_args()
+
+    # chat-resources.html is generated from its data file, which is rewritten instead
+    html_files = sorted(path for path in WORKSPACE_ROOT.glob('*.html') if path.name != CHAT_PAGE.name)
+    contents = {path: path.read_text(encoding='utf-8') for path in html_files}
+    records = load_records() if DATA_FILE.exists() else []
+    mapping = json.loads(PREVIEW_MAPPING.read_text(encoding='utf-8')) if PREVIEW_MAPPING.exists() else {}
+
+    results = load_results(RESULTS_FILE)
+    if args.refresh:
+        urls = {html.unescape(m.group(3)) for c in contents.values() for m in HREF_PATTERN.finditer(c)}
+        urls |= {record['url'] for record in records}
+        refresh_results(sorted(urls | set(mapping)), results, args.max_age)
+    if not results:
+        print("⚠️  No recorded redirect chains. Run tools/check_links.py first or pass --refresh.")
+        return 1
+
+    resolver = RedirectResolver(results, args.allowlist)
+    total_changes = 0
+
+    for path, before in contents.items():
+        after, changes = rewrite_html(before, resolver)
+        if not changes:
+            continue
+        total_changes += len(changes)
+        print(f"📄 {path.name}: {len(changes)} link(s) rewritten")
+        if args.dry_run:
+            show_diff(path, before, after)
+        else:
+            path.write_text(after, encoding='utf-8')
+
+    if records:
+        before = json.dumps(records, indent=2, ensure_ascii=False) + '\n'
+        changes = rewrite_records(records, resolver)
+        if changes:
+            total_changes += len(changes)
+            print(f"📋 {DATA_FILE.name}: {len(changes)} link(s) rewritten")
+            if args.dry_run:
+                show_diff(DATA_FILE, before, json.dumps(records, indent=2, ensure_ascii=False) + '\n')
+            else:
+                save_records(records)
+                build()
+
+    if mapping:
+        updated, changes = rewrite_mapping(mapping, resolver)
+        if changes:
+            total_changes += len(changes)
+            print(f"📋 {PREVIEW_MAPPING.name}: {len(changes)} key(s) rewritten")
+            before = json.dumps(mapping, indent=2, ensure_ascii=False) + '\n'
+            after = json.dumps(updated, indent=2, ensure_ascii=False) + '\n'
+            if args.dry_run:
+                show_diff(PREVIEW_MAPPING, before, after)
+            else:
+                PREVIEW_MAPPING.write_text(after, encoding='utf-8')
+
+    if resolver.skipped:
+        print(f"\n⏭️  Left {len(resolver.skipped)} redirecting link(s) alone:")
+        for url, reason in sorted(resolver.skipped.items()):
+            print(f"  • {url}: {reason}")
+
+    verb = "would be rewritten" if args.dry_run else "rewritten"
+    print(f"\n✅ {total_changes} link(s) {verb}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
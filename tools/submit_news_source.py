@@ -17,7 +17,7 @@ import re
 import sys
 import urllib.request
 from pathlib import Path
-from check_url_safety import URLSafetyChecker
+from url_safety_service import get_checker
 import subprocess
 
 NEWS_SCRIPT = Path(__file__).parent.parent / "update_news.py"
@@ -67,7 +67,7 @@ def validate_feed_url(url):
 
 
 def check_url_safety(url):
-    checker = URLSafetyChecker()
+    checker = get_checker()
     return checker.check_url(url)
 
 
@@ -18,7 +18,7 @@ import os
 import re
 import subprocess
 from pathlib import Path
-from check_url_safety import URLSafetyChecker
+from url_safety_service import get_checker
 
 # Category mappings
 CATEGORIES = {
@@ -56,7 +56,7 @@ def validate_url(url):
     if not url.startswith(('http://', 'https://')):
         return False, "URL must start with http:// or https://"
     
-    checker = URLSafetyChecker()
+    checker = get_checker()
     result = checker.check_url(url)
     
     return result['safe'], result
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-list prefix tables in tools/url_reputation.py.
+
+Usage:
+    python3 -m unittest tools/test_url_reputation.py
+"""
+
+import base64
+import hashlib
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from url_reputation import LOCAL_LIST, PREFIX_SIZE, ReputationDB, add_urls, apply_list_update  # noqa: E402
+
+
+def prefix(expression):
+    return hashlib.sha256(expression.encode('utf-8')).digest()[:PREFIX_SIZE]
+
+
+def list_update(threat_type, prefixes, response_type='FULL_UPDATE', removals=None):
+    """One listUpdateResponse for `threat_type` adding `prefixes`."""
+    update = {
+        'threatType': threat_type,
+        'platformType': 'ANY_PLATFORM',
+        'threatEntryType': 'URL',
+        'responseType': response_type,
+        'additions': [{'rawHashes': {'prefixSize': PREFIX_SIZE,
+                                     'rawHashes': base64.b64encode(b''.join(prefixes)).decode('ascii')}}],
+        'newClientState': f'{threat_type}-state',
+    }
+    if removals:
+        update['removals'] = [{'rawIndices': {'indices': removals}}]
+    return update
+
+
+def with_checksum(update, table):
+    digest = hashlib.sha256(b''.join(sorted(table))).digest()
+    update['checksum'] = {'sha256': base64.b64encode(digest).decode('ascii')}
+    return update
+
+
+class PerListUpdateTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        self.malware = [prefix('malware-a.test/'), prefix('malware-b.test/')]
+        self.phishing = [prefix('phish-a.test/'), prefix('phish-b.test/')]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def lookup(self, url):
+        db = ReputationDB(self.directory)
+        try:
+            return db.lookup(url)['verdict']
+        finally:
+            db.close()
+
+    def test_full_update_of_one_list_keeps_other_lists_and_local_entries(self):
+        apply_list_update(self.directory, {'listUpdateResponses': [
+            with_checksum(list_update('MALWARE', self.malware), self.malware),
+            with_checksum(list_update('SOCIAL_ENGINEERING', self.phishing), self.phishing),
+        ]})
+        add_urls(self.directory, ['local-bad.net/'], 'MALWARE')
+        self.assertEqual(self.lookup('http://local-bad.net/login'), 'listed')
+
+        replacement = [prefix('phish-c.test/')]
+        state = apply_list_update(self.directory, {'listUpdateResponses': [
+            with_checksum(list_update('SOCIAL_ENGINEERING', replacement), replacement),
+        ]})
+
+        self.assertEqual(state['lists'], {
+            LOCAL_LIST: 1,
+            'MALWARE/ANY_PLATFORM/URL': 2,
+            'SOCIAL_ENGINEERING/ANY_PLATFORM/URL': 1,
+        })
+        self.assertEqual(state['prefix_count'], 4)
+        self.assertEqual(self.lookup('http://local-bad.net/login'), 'listed')
+        self.assertEqual(self.lookup('http://malware-a.test/'), 'unconfirmed')
+        self.assertEqual(self.lookup('http://phish-a.test/'), 'clean')
+        self.assertEqual(self.lookup('http://phish-c.test/'), 'unconfirmed')
+
+    def test_removals_and_checksum_apply_to_their_own_list(self):
+        apply_list_update(self.directory, {'listUpdateResponses': [
+            list_update('MALWARE', self.malware),
+            list_update('SOCIAL_ENGINEERING', self.phishing),
+        ]})
+
+        # Index 0 of the sorted SOCIAL_ENGINEERING table, not of the combined table
+        remaining = sorted(self.phishing)[1:]
+        apply_list_update(self.directory, {'listUpdateResponses': [
+            with_checksum(list_update('SOCIAL_ENGINEERING', [], 'PARTIAL_UPDATE', removals=[0]), remaining),
+        ]})
+
+        db = ReputationDB(self.directory)
+        lists = db.lists()
+        db.close()
+        self.assertEqual(lists['SOCIAL_ENGINEERING/ANY_PLATFORM/URL'], remaining)
+        self.assertEqual(lists['MALWARE/ANY_PLATFORM/URL'], sorted(self.malware))
+
+        with self.assertRaises(ValueError):
+            apply_list_update(self.directory, {'listUpdateResponses': [
+                with_checksum(list_update('MALWARE', [], 'PARTIAL_UPDATE'), self.malware + remaining),
+            ]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Concurrent page-title resolver with a persistent cache.
+
+Fetching a <title> only needs the first few KB of a page. For each URL this
+resolver:
+
+- streams the body in READ_CHUNK byte chunks and stops at </title> or
+  </head> (MAX_BYTES at most) instead of downloading the page
+- decodes with the charset from the Content-Type header, else from
+  <meta charset> / <meta http-equiv="Content-Type"> in the bytes read,
+  else UTF-8
+- runs on a thread pool with at most `per_host` requests in flight per host
+
+Results are cached in tools/.cache/title-cache.json with the time they were
+fetched. A cached title is reused for `ttl_days`; a failed fetch is retried
+after FAILURE_TTL_DAYS. So a re-run only fetches new or expired URLs.
+
+Usage:
+    python3 tools/title_resolver.py <url> [...]
+"""
+
+import codecs
+import html
+import json
+import os
+import re
+import sys
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+CACHE_FILE = Path(__file__).parent / '.cache' / 'title-cache.json'
+
+USER_AGENT = 'Mozilla/5.0 (compatible; CSOH-bot/1.0; +https://csoh.org)'
+FETCH_TIMEOUT = 6       # seconds per request
+READ_CHUNK = 2048       # titles are usually within the first 2 KB
+MAX_BYTES = 128 * 1024  # give up looking for </title> after this much
+MAX_TITLE_LENGTH = 300
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 2
+DEFAULT_TTL_DAYS = 30
+FAILURE_TTL_DAYS = 1
+
+_TITLE = re.compile(rb'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+_END_OF_TITLE = re.compile(rb'</title\s*>|</head\s*>', re.IGNORECASE)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def detect_charset(header_charset: Optional[str], head: bytes) -> str:
+    """Charset from the HTTP header, a BOM or a <meta> tag, defaulting to UTF-8."""
+    candidates = [header_charset]
+    if head.startswith(codecs.BOM_UTF8):
+        candidates.insert(0, 'utf-8-sig')
+    match = _META_CHARSET.search(head)
+    if match:
+        candidates.append(match.group(1).decode('ascii', 'replace'))
+    for charset in candidates:
+        if not charset:
+            continue
+        try:
+            return codecs.lookup(charset.strip()).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+
+def extract_title(head: bytes, charset: str) -> Optional[str]:
+    match = _TITLE.search(head)
+    if not match:
+        return None
+    title = html.unescape(match.group(1).decode(charset, errors='replace'))
+    title = re.sub(r'\s+', ' ', title).strip()
+    return title[:MAX_TITLE_LENGTH] or None
+
+
+def fetch_title(url: str, timeout: float = FETCH_TIMEOUT) -> Tuple[Optional[str], Optional[str]]:
+    """(title, error) for one URL, reading only as much of the page as needed."""
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT,
+                                                   'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.5'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and 'html' not in content_type.lower():
+                return None, f"not HTML ({content_type.split(';')[0]})"
+            head = b''
+            while len(head) < MAX_BYTES:
+                chunk = response.read(READ_CHUNK)
+                if not chunk:
+                    break
+                # Search from just before the new chunk so a tag split across chunks is found
+                start = max(0, len(head) - 16)
+                head += chunk
+                if _END_OF_TITLE.search(head, start):
+                    break
+            charset = detect_charset(response.headers.get_content_charset(), head)
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+    title = extract_title(head, charset)
+    return title, None if title else "no <title>"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class TitleCache:
+    """{url: {title, error, fetched_at}} persisted as JSON at `path`.
+
+    Defaults to tools/.cache/title-cache.json; update_chat_titles.py passes its
+    committed sidecar, tools/data/chat-titles.json.
+    """
+
+    def __init__(self, path: Path = CACHE_FILE, ttl_days: float = DEFAULT_TTL_DAYS):
+        self.path = Path(path)
+        self.ttl = timedelta(days=ttl_days)
+        self.failure_ttl = timedelta(days=min(ttl_days, FAILURE_TTL_DAYS))
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries: Dict[str, Dict] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def fresh(self, url: str) -> Optional[Dict]:
+        """The cached entry for `url` if it has not expired."""
+        entry = self.entries.get(url)
+        if not entry or not entry.get('fetched_at'):
+            return None
+        try:
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        except ValueError:
+            return None
+        ttl = self.ttl if entry.get('title') else self.failure_ttl
+        return entry if _now() - fetched_at < ttl else None
+
+    def put(self, url: str, title: Optional[str], error: Optional[str]):
+        with self._lock:
+            self.entries[url] = {'title': title, 'error': error, 'fetched_at': _now().isoformat()}
+
+    def save(self):
+        """Write the cache atomically."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=1, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def resolve_titles(urls: Iterable[str], cache: TitleCache, workers: int = DEFAULT_WORKERS,
+                   per_host: int = DEFAULT_PER_HOST, timeout: float = FETCH_TIMEOUT,
+                   on_result: Optional[Callable[[str, Optional[str], Optional[str]], None]] = None,
+                   save_every: int = 50) -> Dict[str, Optional[str]]:
+    """{url: title or None} for every URL, fetching only those not fresh in the cache.
+
+    `on_result(url, title, error)` is called for each URL actually fetched.
+    The cache is saved every `save_every` fetches and at the end.
+    """
+    urls = list(dict.fromkeys(urls))
+    titles = {}
+    due = []
+    for url in urls:
+        entry = cache.fresh(url)
+        if entry is None:
+            due.append(url)
+        else:
+            titles[url] = entry.get('title')
+
+    host_slots: Dict[str, threading.Semaphore] = {}
+    slots_lock = threading.Lock()
+    done = {'count': 0}
+
+    def host_slot(url: str) -> threading.Semaphore:
+        host = (urlsplit(url).hostname or '').lower()
+        with slots_lock:
+            return host_slots.setdefault(host, threading.Semaphore(per_host))
+
+    def run(url: str):
+        with host_slot(url):
+            title, error = fetch_title(url, timeout)
+        cache.put(url, title, error)
+        titles[url] = title
+        if on_result:
+            on_result(url, title, error)
+        with slots_lock:
+            done['count'] += 1
+            save_now = done['count'] % save_every == 0
+        if save_now:
+            cache.save()
+
+    # Interleave hosts so one slow host does not tie up every worker
+    by_host: Dict[str, list] = {}
+    for url in due:
+        by_host.setdefault((urlsplit(url).hostname or '').lower(), []).append(url)
+    ordered = [queue[i] for i in range(max((len(q) for q in by_host.values()), default=0))
+               for queue in by_host.values() if i < len(queue)]
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, ordered))
+    finally:
+        cache.save()
+    return {url: titles.get(url) for url in urls}
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 tools/title_resolver.py <url> [...]")
+        return 1
+    titles = resolve_titles(sys.argv[1:], TitleCache())
+    for url, title in titles.items():
+        print(f"{url}\n  {title or '(no title)'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
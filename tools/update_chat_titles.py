@@ -1,18 +1,40 @@
 #!/usr/bin/env python3
-import re
-from urllib.parse import urlparse, unquote
+"""
+Give chat-resources.html cards descriptive titles, in two phases.
+
+resolve  Fetch the <title> of every card URL with tools/title_resolver.py
+         (concurrent, per-host limits, streaming reads) and record the
+         results in the sidecar file tools/data/chat-titles.json. The
+         sidecar is saved every SAVE_EVERY fetches, and entries younger
+         than --ttl-days are skipped, so an interrupted run resumes where
+         it stopped.
+apply    Offline: set every record's title in tools/data/chat-resources.json
+         from the sidecar. Records whose page gave no title keep their
+         current title, or get one derived from the URL if they have none.
+         Then re-render the changed chunks of the page with
+         tools/build_chat_resources.py.
+
+Either phase can run on its own; with no phase given both run. The sidecar
+is committed, so apply works offline from the checked-in results. It is
+refreshed by .github/workflows/update-chat-titles.yml, which runs both
+phases weekly and opens a pull request.
+
+Usage:
+    python3 tools/update_chat_titles.py [resolve|apply] [--workers N] [--per-host N] [--ttl-days D]
+    python3 tools/update_chat_titles.py apply --check    # exit 1 if titles are out of date
+"""
 
-#!/usr/bin/env python3
 import re
-import time
-import html
+import sys
+from pathlib import Path
 from urllib.parse import urlparse, unquote
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
 
-INPUT = 'chat-resources.html'
-BACKUP = INPUT + '.fetch.bak'
+from build_chat_resources import DATA_FILE, build, load_records, save_records
+from cli_options import pop_option
+from title_resolver import DEFAULT_PER_HOST, DEFAULT_TTL_DAYS, DEFAULT_WORKERS, TitleCache, resolve_titles
 
+SIDECAR = Path(__file__).parent / 'data' / 'chat-titles.json'
+SAVE_EVERY = 25
 
 def humanize_path(path):
     if not path or path == '/':
@@ -49,59 +71,73 @@ def title_from_url(url):
     return host
 
 
-def fetch_title(url, timeout=6):
-    try:
-        req = Request(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; CSOH-bot/1.0)'} )
-        with urlopen(req, timeout=timeout) as r:
-            # read a reasonable chunk
-            raw = r.read(131072)
-            try:
-                text = raw.decode('utf-8', errors='replace')
-            except Exception:
-                text = raw.decode('latin-1', errors='replace')
-            m = re.search(r'<title[^>]*>(.*?)</title>', text, re.IGNORECASE | re.DOTALL)
-            if m:
-                t = html.unescape(m.group(1)).strip()
-                # collapse whitespace
-                t = re.sub(r'\s+', ' ', t)
-                return t
-    except (URLError, HTTPError, ValueError, Exception):
-        return None
-    return None
-
-
-def make_backup(content):
-    with open(BACKUP, 'w', encoding='utf-8') as f:
-        f.write(content)
+def card_urls(records):
+    return list(dict.fromkeys(record['url'] for record in records))
 
 
-def main():
-    with open(INPUT, 'r', encoding='utf-8') as f:
-        html_doc = f.read()
+def resolve(records, workers, per_host, ttl_days):
+    """Phase 1: fetch titles for card URLs missing from (or expired in) the sidecar."""
+    urls = card_urls(records)
+    sidecar = TitleCache(SIDECAR, ttl_days=ttl_days)
+    sidecar.entries = {url: entry for url, entry in sidecar.entries.items() if url in set(urls)}
+    due = sum(1 for url in urls if sidecar.fresh(url) is None)
+    print(f"🔎 {len(urls)} card URL(s), {due} to resolve ({len(urls) - due} already in {SIDECAR.name})")
 
-    make_backup(html_doc)
+    def on_result(url, title, error):
+        if title:
+            print(f"✓ Fetched: {url[:60]}... → {title[:80]}")
+        else:
+            print(f"✗ Failed to fetch: {url[:60]}... ({error})")
 
-    pattern = re.compile(r'(<a[^>]+href="([^"]+)"[^>]*>\s*<div class="resource-card"[\s\S]*?<h3>)(.*?)(</h3>)', re.IGNORECASE)
+    resolve_titles(urls, sidecar, workers, per_host, on_result=on_result, save_every=SAVE_EVERY)
+    resolved = sum(1 for url in urls if (sidecar.entries.get(url) or {}).get('title'))
+    print(f"📋 {SIDECAR.name}: {resolved} of {len(urls)} URL(s) have a page title")
 
+
+def apply_titles(records, titles):
+    """Phase 2: set every record's title from `titles`. Returns the number changed.
+
+    A URL without a fetched title (failed or blocked fetch) keeps the record's
+    current title; only records with no title get one derived from the URL.
+    """
     changes = 0
+    for record in records:
+        entry = titles.get(record['url']) or {}
+        new = entry.get('title') or record.get('title') or title_from_url(record['url'])
+        if new != record.get('title'):
+            record['title'] = new
+            changes += 1
+    return changes
 
-    def repl(m):
-        nonlocal changes
-        prefix = m.group(1)
-        href = m.group(2)
-        old = m.group(3).strip()
-        suffix = m.group(4)
-        # try fetching
-        title = None
-        try:
-            title = fetch_title(href)
-            if title:
-                print(f"✓ Fetched: {href[:60]}... → {title[:80]}")
-            else:
-                print(f"✗ Failed to fetch: {href[:60]}...")
-        except Exception as e:
-            print(f"✗ Error fetching {href[:60]}...: {e}")
-            title = None
-        if not title:
-            title = title_from_url(href)
-            print(f"  Fallback: {title[:80]}")
+
+def main():
+    workers = int(pop_option('--workers', DEFAULT_WORKERS))
+    per_host = int(pop_option('--per-host', DEFAULT_PER_HOST))
+    ttl_days = float(pop_option('--ttl-days', DEFAULT_TTL_DAYS))
+    phases = [arg for arg in sys.argv[1:] if arg in ('resolve', 'apply')] or ['resolve', 'apply']
+
+    records = load_records()
+
+    if 'resolve' in phases:
+        resolve(records, workers, per_host, ttl_days)
+
+    if 'apply' in phases:
+        if not SIDECAR.exists():
+            print(f"⚠️  {SIDECAR.name} not found; run: python3 tools/update_chat_titles.py resolve")
+            return 1
+        changes = apply_titles(records, TitleCache(SIDECAR).entries)
+        if '--check' in sys.argv:
+            if changes:
+                print(f"❌ {changes} card title(s) out of date; run: python3 tools/update_chat_titles.py apply")
+                return 1
+            print(f"✅ Card titles match {SIDECAR.name}")
+            return 0
+        if changes:
+            save_records(records)
+        print(f"\n✅ Updated {changes} title(s) in {DATA_FILE.name}")
+        build()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
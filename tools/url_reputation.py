@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Offline URL reputation database for the CSOH URL safety checker.
+
+Follows the Google Safe Browsing v4 "Update API" model without making any
+per-URL network calls:
+
+1. Each URL is canonicalized and expanded into its host-suffix/path-prefix
+   expressions (e.g. 'a.b.example.com/1/2.html?x=1' -> 'example.com/',
+   'b.example.com/1/', ...).
+2. Every expression is hashed with SHA-256 and its 4-byte prefix is looked
+   up in a sorted prefix table (prefixes.bin, memory-mapped), the union of
+   the per-list tables in lists/.
+3. A prefix hit is confirmed against a local table of full 32-byte hashes
+   (full_hashes.bin) that also records the threat type.
+
+Each threat list (threatType/platformType/threatEntryType) keeps its own
+sorted prefix table, updated from downloaded `threatListUpdates:fetch`
+responses (full or partial, with removals and checksum applied to that
+list only). Full hashes come from saved `fullHashes:find` responses or from
+local URL feeds; their prefixes go in the "local" table, which feed updates
+never reset.
+
+Usage:
+    python3 tools/url_reputation.py lookup <url>
+    python3 tools/url_reputation.py update threatListUpdates.json
+    python3 tools/url_reputation.py import-full-hashes fullHashes.json
+    python3 tools/url_reputation.py add-urls --threat-type MALWARE bad-urls.txt
+    python3 tools/url_reputation.py info
+"""
+
+import argparse
+import base64
+import hashlib
+import ipaddress
+import json
+import mmap
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote_to_bytes, urlsplit
+
+REPUTATION_DIR = Path(__file__).parent / 'data' / 'reputation'
+PREFIX_FILE = 'prefixes.bin'
+FULL_HASH_FILE = 'full_hashes.bin'
+STATE_FILE = 'state.json'
+LISTS_DIR = 'lists'
+LOCAL_LIST = 'local'  # prefixes of add_urls / import_full_hashes entries
+
+PREFIX_SIZE = 4
+FULL_HASH_SIZE = 32
+
+# Threat types stored as a single byte after each full hash
+THREAT_TYPES = [
+    'THREAT_TYPE_UNSPECIFIED',
+    'MALWARE',
+    'SOCIAL_ENGINEERING',
+    'UNWANTED_SOFTWARE',
+    'POTENTIALLY_HARMFUL_APPLICATION',
+]
+FULL_RECORD_SIZE = FULL_HASH_SIZE + 1
+
+
+# ---------------------------------------------------------------------------
+# Canonicalization (Safe Browsing v4 "URLs and Hashing")
+# ---------------------------------------------------------------------------
+
+def _unescape_fully(value: str) -> bytes:
+    """Percent-unescape repeatedly until the value stops changing."""
+    data = value.encode('utf-8', errors='surrogateescape')
+    while True:
+        unescaped = unquote_to_bytes(data)
+        if unescaped == data:
+            return data
+        data = unescaped
+
+
+def _escape(data: bytes) -> str:
+    """Percent-escape bytes <= 0x20, >= 0x7f, '#' and '%'."""
+    return ''.join(
+        f'%{b:02X}' if b <= 0x20 or b >= 0x7f or b in (0x23, 0x25) else chr(b)
+        for b in data
+    )
+
+
+def _canonical_ip(host: str) -> Optional[str]:
+    """Return dotted-quad form for decimal/octal/hex IPv4 hosts, else None."""
+    parts = host.split('.')
+    if not 1 <= len(parts) <= 4:
+        return None
+    try:
+        numbers = [int(p, 0) if not re.fullmatch(r'0[0-7]+', p) else int(p, 8) for p in parts]
+    except ValueError:
+        return None
+
+    value = 0
+    for number in numbers[:-1]:
+        if not 0 <= number <= 255:
+            return None
+        value = (value << 8) | number
+    remaining_bits = 8 * (5 - len(numbers))
+    if not 0 <= numbers[-1] < (1 << remaining_bits):
+        return None
+    value = (value << remaining_bits) | numbers[-1]
+    return str(ipaddress.IPv4Address(value))
+
+
+def canonicalize_url(url: str) -> Optional[Tuple[str, str, str]]:
+    """Canonicalize a URL into (host, path, query). Returns None if unusable.
+
+    The query is returned without its leading '?', or None when the URL
+    has no query at all (an empty query '?' is kept as '').
+    """
+    url = re.sub(r'[\t\r\n]', '', url.strip())
+    url = url.split('#', 1)[0]
+    if '://' not in url:
+        url = 'http://' + url
+
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+
+    netloc = parts.netloc.rsplit('@', 1)[-1]
+    host = netloc.split(':', 1)[0] if not netloc.startswith('[') else netloc
+    host = _unescape_fully(host).decode('utf-8', errors='replace')
+    host = re.sub(r'\.{2,}', '.', host.strip('.')).lower()
+    if not host:
+        return None
+    if not host.isascii():
+        try:
+            host = host.encode('idna').decode('ascii')
+        except UnicodeError:
+            pass
+    host = _canonical_ip(host) or host
+    host = _escape(host.encode('utf-8'))
+
+    path = _unescape_fully(parts.path or '/')
+    segments: List[bytes] = []
+    for segment in path.split(b'/')[1:]:
+        if segment == b'..':
+            if segments:
+                segments.pop()
+        elif segment not in (b'.', b''):
+            segments.append(segment)
+    canonical_path = b'/' + b'/'.join(segments)
+    if path.endswith(b'/') and segments:
+        canonical_path += b'/'
+
+    query = url.split('?', 1)[1] if '?' in url.split('://', 1)[1] else None
+    query = _escape(_unescape_fully(query)) if query is not None else None
+
+    return host, _escape(canonical_path), query
+
+
+def url_expressions(url: str) -> List[str]:
+    """Return the host-suffix/path-prefix expressions to look up for `url`."""
+    canonical = canonicalize_url(url)
+    if canonical is None:
+        return []
+    host, path, query = canonical
+
+    hosts = [host]
+    if _canonical_ip(host) is None:
+        labels = host.split('.')
+        # Up to four more hosts: last five components, removing leading ones
+        start = max(1, len(labels) - 5)
+        for i in range(start, len(labels) - 1):
+            if len(hosts) >= 5:
+                break
+            hosts.append('.'.join(labels[i:]))
+
+    paths = []
+    if query is not None:
+        paths.append(f'{path}?{query}')
+    paths.append(path)
+    segments = [s for s in path.split('/')[1:-1]]
+    prefix = '/'
+    prefixes = [prefix]
+    for segment in segments[:3]:
+        prefix += segment + '/'
+        prefixes.append(prefix)
+    for candidate in prefixes:
+        if len(paths) >= 6:
+            break
+        if candidate not in paths:
+            paths.append(candidate)
+
+    expressions = []
+    for h in hosts:
+        for p in paths:
+            expression = h + p
+            if expression not in expressions:
+                expressions.append(expression)
+    return expressions
+
+
+def expression_hashes(url: str) -> List[Tuple[str, bytes]]:
+    """Return (expression, sha256 digest) pairs for `url`."""
+    return [(e, hashlib.sha256(e.encode('utf-8')).digest()) for e in url_expressions(url)]
+
+
+# ---------------------------------------------------------------------------
+# On-disk tables
+# ---------------------------------------------------------------------------
+
+def _bisect(view, count: int, size: int, key: bytes) -> int:
+    """Lower-bound binary search over `count` sorted fixed-size records."""
+    lo, hi = 0, count
+    width = len(key)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if view[mid * size:mid * size + width] < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _map_file(path: Path):
+    """Memory-map a file read-only; returns b'' for missing or empty files."""
+    if not path.exists() or path.stat().st_size == 0:
+        return b''
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ReputationDB:
+    """Sorted prefix table plus full-hash confirmation table."""
+
+    def __init__(self, directory: Path = REPUTATION_DIR):
+        self.directory = Path(directory)
+        self._prefixes = _map_file(self.directory / PREFIX_FILE)
+        self._full = _map_file(self.directory / FULL_HASH_FILE)
+        self.prefix_count = len(self._prefixes) // PREFIX_SIZE
+        self.full_hash_count = len(self._full) // FULL_RECORD_SIZE
+        self.state = self._load_state()
+
+    @classmethod
+    def open_default(cls) -> Optional['ReputationDB']:
+        """Open tools/data/reputation if it has data, else None."""
+        if not (REPUTATION_DIR / PREFIX_FILE).exists():
+            return None
+        return cls(REPUTATION_DIR)
+
+    def close(self):
+        for mapped in (self._prefixes, self._full):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def _load_state(self) -> Dict:
+        state_path = self.directory / STATE_FILE
+        if state_path.exists():
+            with open(state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    @property
+    def version(self) -> str:
+        return self.state.get('version', '')
+
+    def has_prefix(self, prefix: bytes) -> bool:
+        i = _bisect(self._prefixes, self.prefix_count, PREFIX_SIZE, prefix)
+        return i < self.prefix_count and self._prefixes[i * PREFIX_SIZE:(i + 1) * PREFIX_SIZE] == prefix
+
+    def full_hash_threat(self, digest: bytes) -> Optional[str]:
+        i = _bisect(self._full, self.full_hash_count, FULL_RECORD_SIZE, digest)
+        if i < self.full_hash_count:
+            record = self._full[i * FULL_RECORD_SIZE:(i + 1) * FULL_RECORD_SIZE]
+            if record[:FULL_HASH_SIZE] == digest:
+                code = record[FULL_HASH_SIZE]
+                return THREAT_TYPES[code] if code < len(THREAT_TYPES) else THREAT_TYPES[0]
+        return None
+
+    def lookup(self, url: str) -> Dict:
+        """Return a reputation verdict for `url`.
+
+        verdict is 'clean', 'listed' (full hash confirmed) or 'unconfirmed'
+        (a prefix matched but no local full hash confirms it).
+        """
+        result = {'verdict': 'clean', 'threat_type': None, 'expression': None}
+        for expression, digest in expression_hashes(url):
+            if not self.has_prefix(digest[:PREFIX_SIZE]):
+                continue
+            threat = self.full_hash_threat(digest)
+            if threat:
+                return {'verdict': 'listed', 'threat_type': threat, 'expression': expression}
+            if result['verdict'] == 'clean':
+                result = {'verdict': 'unconfirmed', 'threat_type': None, 'expression': expression}
+        return result
+
+    def prefixes(self) -> List[bytes]:
+        return [self._prefixes[i:i + PREFIX_SIZE] for i in range(0, self.prefix_count * PREFIX_SIZE, PREFIX_SIZE)]
+
+    def lists(self) -> Dict[str, List[bytes]]:
+        """{list name: sorted prefixes} for every list in the database."""
+        if 'lists' not in self.state:
+            # Databases written before per-list tables: keep every prefix as local
+            return {LOCAL_LIST: self.prefixes()} if self.prefix_count else {}
+        lists = {}
+        for name in self.state['lists']:
+            path = _list_path(self.directory, name)
+            data = path.read_bytes() if path.exists() else b''
+            lists[name] = [data[i:i + PREFIX_SIZE] for i in range(0, len(data), PREFIX_SIZE)]
+        return lists
+
+    def full_records(self) -> Dict[bytes, int]:
+        return {
+            self._full[i:i + FULL_HASH_SIZE]: self._full[i + FULL_HASH_SIZE]
+            for i in range(0, self.full_hash_count * FULL_RECORD_SIZE, FULL_RECORD_SIZE)
+        }
+
+
+def _list_path(directory: Path, name: str) -> Path:
+    return Path(directory) / LISTS_DIR / (re.sub(r'[^A-Za-z0-9_-]', '_', name) + '.bin')
+
+
+def save_tables(directory: Path, lists: Dict[str, Iterable[bytes]], full_records: Dict[bytes, int],
+                state: Optional[Dict] = None):
+    """Write the per-list tables, their union and the full hashes sorted,
+    and refresh state.json with a content version."""
+    directory = Path(directory)
+    (directory / LISTS_DIR).mkdir(parents=True, exist_ok=True)
+
+    lists = {name: sorted(set(prefixes)) for name, prefixes in lists.items()}
+    for name, prefixes in lists.items():
+        _write_atomic(_list_path(directory, name), b''.join(prefixes))
+
+    prefix_data = b''.join(sorted(set().union(*lists.values())))
+    full_data = b''.join(h + bytes([code]) for h, code in sorted(full_records.items()))
+
+    _write_atomic(directory / PREFIX_FILE, prefix_data)
+    _write_atomic(directory / FULL_HASH_FILE, full_data)
+
+    version = hashlib.blake2b(prefix_data + b'\0' + full_data, digest_size=16).hexdigest()
+    state = dict(state or {})
+    state.update({
+        'version': version,
+        'lists': {name: len(prefixes) for name, prefixes in sorted(lists.items())},
+        'prefix_count': len(prefix_data) // PREFIX_SIZE,
+        'full_hash_count': len(full_data) // FULL_RECORD_SIZE,
+        'updated': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    })
+    with open(directory / STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+        f.write('\n')
+    return state
+
+
+def _split_raw_hashes(raw: Dict) -> List[bytes]:
+    size = int(raw.get('prefixSize', PREFIX_SIZE))
+    data = base64.b64decode(raw.get('rawHashes', ''))
+    # Longer prefixes are truncated: full-hash confirmation keeps lookups exact
+    return [data[i:i + size][:PREFIX_SIZE] for i in range(0, len(data), size)]
+
+
+def apply_list_update(directory: Path, response: Dict) -> Dict:
+    """Apply a saved threatListUpdates:fetch response to the lists it covers."""
+    db = ReputationDB(directory)
+    lists = db.lists()
+    full_records = db.full_records()
+    state = dict(db.state)
+    client_states = dict(state.get('client_states', {}))
+
+    for update in response.get('listUpdateResponses', []):
+        list_name = '/'.join(filter(None, [update.get('threatType'), update.get('platformType'),
+                                           update.get('threatEntryType')])) or 'default'
+        if list_name == LOCAL_LIST:
+            raise ValueError(f"'{LOCAL_LIST}' is reserved for local entries")
+        prefixes = [] if update.get('responseType') == 'FULL_UPDATE' else lists.get(list_name, [])
+
+        # Removal indices refer to this list's sorted table before additions
+        removed = set()
+        for removal in update.get('removals', []):
+            removed.update(removal.get('rawIndices', {}).get('indices', []))
+        if removed:
+            prefixes = [p for i, p in enumerate(prefixes) if i not in removed]
+
+        for addition in update.get('additions', []):
+            prefixes = prefixes + _split_raw_hashes(addition.get('rawHashes', {}))
+        prefixes = sorted(set(prefixes))
+
+        expected = update.get('checksum', {}).get('sha256')
+        if expected:
+            actual = hashlib.sha256(b''.join(prefixes)).digest()
+            if base64.b64encode(actual).decode('ascii') != expected:
+                raise ValueError(f"Checksum mismatch after update for {list_name}")
+
+        lists[list_name] = prefixes
+        if update.get('newClientState'):
+            client_states[list_name] = update['newClientState']
+
+    state['client_states'] = client_states
+    db.close()
+    return save_tables(directory, lists, full_records, state)
+
+
+def import_full_hashes(directory: Path, response: Dict) -> Dict:
+    """Merge a saved fullHashes:find response into the confirmation table."""
+    db = ReputationDB(directory)
+    lists = db.lists()
+    prefixes = lists.setdefault(LOCAL_LIST, [])
+    full_records = db.full_records()
+
+    for match in response.get('matches', []):
+        digest = base64.b64decode(match.get('threat', {}).get('hash', ''))
+        if len(digest) != FULL_HASH_SIZE:
+            continue
+        threat = match.get('threatType', THREAT_TYPES[0])
+        full_records[digest] = THREAT_TYPES.index(threat) if threat in THREAT_TYPES else 0
+        prefixes.append(digest[:PREFIX_SIZE])
+
+    state = db.state
+    db.close()
+    return save_tables(directory, lists, full_records, state)
+
+
+def add_urls(directory: Path, urls: Iterable[str], threat_type: str) -> Dict:
+    """Add URLs from a local feed as full hashes of their exact expression.
+
+    Listing 'evil.example/' blocks the whole host, since every URL on it
+    expands to that expression.
+    """
+    db = ReputationDB(directory)
+    lists = db.lists()
+    prefixes = lists.setdefault(LOCAL_LIST, [])
+    full_records = db.full_records()
+    code = THREAT_TYPES.index(threat_type)
+
+    for url in urls:
+        hashes = expression_hashes(url)
+        if not hashes:
+            continue
+        # The first expression is the exact host + path (+ query) of the entry
+        _, digest = hashes[0]
+        full_records[digest] = code
+        prefixes.append(digest[:PREFIX_SIZE])
+
+    state = db.state
+    db.close()
+    return save_tables(directory, lists, full_records, state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Safe Browsing-style URL reputation database")
+    parser.add_argument('--db', type=Path, default=REPUTATION_DIR, help='Database directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    lookup_cmd = sub.add_parser('lookup', help='Look up URLs')
+    lookup_cmd.add_argument('urls', nargs='+')
+
+    update_cmd = sub.add_parser('update', help='Apply saved threatListUpdates:fetch responses')
+    update_cmd.add_argument('responses', nargs='+', type=Path)
+
+    full_cmd = sub.add_parser('import-full-hashes', help='Import saved fullHashes:find responses')
+    full_cmd.add_argument('responses', nargs='+', type=Path)
+
+    urls_cmd = sub.add_parser('add-urls', help='Add URLs from a local threat feed')
+    urls_cmd.add_argument('--threat-type', default='MALWARE', choices=THREAT_TYPES)
+    urls_cmd.add_argument('files', nargs='+', type=Path)
+
+    sub.add_parser('info', help='Show database details')
+
+    args = parser.parse_args()
+
+    if args.command == 'lookup':
+        db = ReputationDB(args.db)
+        listed = 0
+        for url in args.urls:
+            result = db.lookup(url)
+            if result['verdict'] == 'listed':
+                listed += 1
+                print(f"❌ {url}: {result['threat_type']} ({result['expression']})")
+            elif result['verdict'] == 'unconfirmed':
+                print(f"⚠️  {url}: prefix match, no local full hash ({result['expression']})")
+            else:
+                print(f"✅ {url}: not listed")
+        return 1 if listed else 0
+
+    if args.command == 'update':
+        for path in args.responses:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = apply_list_update(args.db, json.load(f))
+            print(f"✅ Applied {path}: {state['prefix_count']:,} prefixes")
+        return 0
+
+    if args.command == 'import-full-hashes':
+        for path in args.responses:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = import_full_hashes(args.db, json.load(f))
+            print(f"✅ Imported {path}: {state['full_hash_count']:,} full hashes")
+        return 0
+
+    if args.command == 'add-urls':
+        urls = []
+        for path in args.files:
+            with open(path, 'r', encoding='utf-8') as f:
+                urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+        state = add_urls(args.db, urls, args.threat_type)
+        print(f"✅ Added {len(urls):,} URLs: {state['full_hash_count']:,} full hashes")
+        return 0
+
+    db = ReputationDB(args.db)
+    print(f"{args.db}: {db.prefix_count:,} prefixes, {db.full_hash_count:,} full hashes, "
+          f"version {db.version or 'n/a'}, updated {db.state.get('updated', 'never')}")
+    for name, count in db.state.get('lists', {}).items():
+        print(f"  {name}: {count:,} prefixes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
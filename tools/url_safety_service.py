@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Warm URL safety service and client.
+
+Building a URLSafetyChecker parses the public suffix list and opens the
+compiled blocklist and reputation database. The service does that once and
+answers JSON requests over a Unix socket (default) or localhost HTTP:
+
+    GET  /health                   {"status": "ok", "ruleset": "...", "pid": ...}
+    POST /check {"url": "..."}     one check_url() result
+    POST /check {"urls": [...]}    {"results": [...]} in request order
+
+When the blocklist, reputation database, suffix list or homoglyph tables
+change on disk the service rebuilds its checker. If check_url_safety.py
+itself changes it answers 503 until restarted, and clients fall back to
+checking in-process.
+
+SafetyClient has the same check_url()/ruleset_version() interface as
+URLSafetyChecker and uses the service when it is reachable, otherwise an
+in-process checker.
+
+Usage:
+    python3 tools/url_safety_service.py serve                 # Unix socket
+    python3 tools/url_safety_service.py serve --port 8799     # localhost HTTP
+    python3 tools/url_safety_service.py status
+
+Clients find the service through $URL_SAFETY_SERVICE (a socket path or
+http://127.0.0.1:<port>), defaulting to tools/.cache/url-safety.sock.
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_SOCKET = Path(__file__).parent / '.cache' / 'url-safety.sock'
+SERVICE_ENV = 'URL_SAFETY_SERVICE'
+CHECKER_SOURCE = Path(__file__).parent / 'check_url_safety.py'
+CONNECT_TIMEOUT = 0.5  # seconds; a missing service should cost almost nothing
+REQUEST_TIMEOUT = 30
+FRESHNESS_INTERVAL = 1.0  # seconds between checks for changed rule files
+MAX_BATCH = 100000
+
+
+def _watched_files() -> List[Path]:
+    from domain_blocklist import BLOCKLIST_DB
+    from homoglyphs import CONFUSABLES_FILE, POPULAR_DOMAINS_FILE, PROTECTED_DOMAINS_FILE
+    from public_suffix import PSL_FILE
+    from url_reputation import REPUTATION_DIR, STATE_FILE
+    return [PSL_FILE, CONFUSABLES_FILE, PROTECTED_DOMAINS_FILE, POPULAR_DOMAINS_FILE, BLOCKLIST_DB, REPUTATION_DIR / STATE_FILE]
+
+
+def _file_stamp(paths: List[Path]) -> tuple:
+    stamp = []
+    for path in paths:
+        try:
+            st = path.stat()
+            stamp.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _source_hash() -> str:
+    return hashlib.sha256(CHECKER_SOURCE.read_bytes()).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class WarmChecker:
+    """A URLSafetyChecker kept loaded, rebuilt when its data files change."""
+
+    def __init__(self):
+        from check_url_safety import URLSafetyChecker
+        self._factory = URLSafetyChecker
+        self._lock = threading.Lock()
+        self._source_hash = _source_hash()
+        self._stale_code = False
+        self._last_freshness_check = 0.0
+        self._load()
+
+    def _load(self):
+        self._stamp = _file_stamp(_watched_files())
+        self.checker = self._factory()
+        self.ruleset = self.checker.ruleset_version()
+        self.loaded_at = time.time()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._last_freshness_check < FRESHNESS_INTERVAL:
+            return
+        self._last_freshness_check = now
+        self._stale_code = _source_hash() != self._source_hash
+        if not self._stale_code and _file_stamp(_watched_files()) != self._stamp:
+            self._load()
+
+    @property
+    def stale(self) -> bool:
+        with self._lock:
+            self._refresh()
+            return self._stale_code
+
+    def check_urls(self, urls: List[str]) -> List[Dict]:
+        # check_url() keeps per-call state on the checker, so calls are serialized
+        with self._lock:
+            self._refresh()
+            return [self.checker.check_url(url) for url in urls]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CSOH-URLSafety/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        warm = self.server.warm
+        if self.path != '/health':
+            return self._send_json(404, {'error': 'not found'})
+        if warm.stale:
+            return self._send_json(503, {'error': 'check_url_safety.py changed; restart the service'})
+        self._send_json(200, {'status': 'ok', 'ruleset': warm.ruleset, 'pid': os.getpid(),
+                              'loaded_at': warm.loaded_at, 'served': self.server.served})
+
+    def do_POST(self):
+        warm = self.server.warm
+        if self.path != '/check':
+            return self._send_json(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': 'request body must be JSON'})
+        if not isinstance(request, dict):
+            return self._send_json(400, {'error': 'request body must be a JSON object'})
+        if warm.stale:
+            return self._send_json(503, {'error': 'check_url_safety.py changed; restart the service'})
+
+        if 'urls' in request:
+            urls = request['urls']
+            if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+                return self._send_json(400, {'error': '"urls" must be a list of strings'})
+            if len(urls) > MAX_BATCH:
+                return self._send_json(413, {'error': f'at most {MAX_BATCH} URLs per request'})
+            results = warm.check_urls(urls)
+            self.server.served += len(urls)
+            return self._send_json(200, {'ruleset': warm.ruleset, 'results': results})
+        if 'url' in request:
+            if not isinstance(request['url'], str):
+                return self._send_json(400, {'error': '"url" must be a string'})
+            result = warm.check_urls([request['url']])[0]
+            self.server.served += 1
+            return self._send_json(200, result)
+        self._send_json(400, {'error': 'expected "url" or "urls"'})
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path: Optional[Path] = None, port: Optional[int] = None):
+    """Run the service until interrupted."""
+    started = time.perf_counter()
+    warm = WarmChecker()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    if port is not None:
+        server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        address = f'http://127.0.0.1:{port}'
+    else:
+        socket_path = Path(socket_path or DEFAULT_SOCKET)
+        if socket_path.exists():
+            if SafetyClient(str(socket_path), fallback=False).available:
+                print(f"❌ A service is already listening on {socket_path}")
+                return 1
+            socket_path.unlink()
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        server = _UnixHTTPServer(str(socket_path), _Handler)
+        address = str(socket_path)
+
+    server.warm = warm
+    server.served = 0
+    print(f"🛡️  URL safety service on {address} (ruleset {warm.ruleset}, loaded in {load_ms:.0f} ms)")
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if port is None:
+            Path(address).unlink(missing_ok=True)
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+class ServiceUnavailable(Exception):
+    """The service is not running, not reachable or refused the request."""
+
+
+class SafetyClient:
+    """URLSafetyChecker-compatible client for the warm service.
+
+    Falls back to an in-process URLSafetyChecker (built lazily) when the
+    service cannot be reached, unless fallback=False.
+    """
+
+    def __init__(self, address: Optional[str] = None, fallback: bool = True):
+        self.address = address or os.environ.get(SERVICE_ENV) or str(DEFAULT_SOCKET)
+        self.fallback = fallback
+        self._local = None
+        self._conn = None
+        self._ruleset = None
+        self.available = self._probe()
+
+    @property
+    def mode(self) -> str:
+        return 'service' if self.available else 'in-process'
+
+    def _connection(self, timeout: float) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self.address.startswith(('http://', 'https://')):
+                parts = urlsplit(self.address)
+                self._conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+            else:
+                self._conn = _UnixHTTPConnection(self.address, timeout)
+        self._conn.timeout = timeout
+        if self._conn.sock is not None:
+            self._conn.sock.settimeout(timeout)
+        return self._conn
+
+    def _request(self, method: str, path: str, payload=None, timeout: float = REQUEST_TIMEOUT) -> Dict:
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            conn = self._connection(timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = json.loads(response.read() or b'{}')
+                break
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                conn.close()
+                self._conn = None
+                # A kept-alive connection the server already closed: retry once on a fresh one
+                stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+                if attempt or not stale:
+                    raise ServiceUnavailable(str(e)) from e
+        if response.status != 200:
+            raise ServiceUnavailable(data.get('error') or f'HTTP {response.status}')
+        return data
+
+    def _probe(self) -> bool:
+        try:
+            self._ruleset = self._request('GET', '/health', timeout=CONNECT_TIMEOUT)['ruleset']
+            return True
+        except ServiceUnavailable:
+            return False
+
+    def _local_checker(self):
+        if self._local is None:
+            if not self.fallback:
+                raise ServiceUnavailable(f"URL safety service not reachable at {self.address}")
+            from check_url_safety import URLSafetyChecker
+            self._local = URLSafetyChecker()
+        return self._local
+
+    def check_urls(self, urls: List[str]) -> List[Dict]:
+        """Check many URLs in one round trip; results are in input order."""
+        urls = list(urls)
+        if self.available:
+            try:
+                data = self._request('POST', '/check', {'urls': urls})
+                self._ruleset = data['ruleset']
+                return data['results']
+            except ServiceUnavailable:
+                self.available = False
+        checker = self._local_checker()
+        return [checker.check_url(url) for url in urls]
+
+    def check_url(self, url: str) -> Dict:
+        return self.check_urls([url])[0]
+
+    def ruleset_version(self) -> str:
+        if self.available and self._ruleset:
+            return self._ruleset
+        return self._local_checker().ruleset_version()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def get_checker():
+    """The warm service if it is running, otherwise an in-process checker."""
+    return SafetyClient()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm URL safety check service")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_serve = sub.add_parser('serve', help='Run the service')
+    transport = p_serve.add_mutually_exclusive_group()
+    transport.add_argument('--socket', type=Path, help=f'Unix socket path (default: {DEFAULT_SOCKET})')
+    transport.add_argument('--port', type=int, help='Listen on 127.0.0.1:<port> instead of a Unix socket')
+
+    p_status = sub.add_parser('status', help='Report whether the service is reachable')
+    p_status.add_argument('--address', help=f'Socket path or http://127.0.0.1:<port> (default: ${SERVICE_ENV} or {DEFAULT_SOCKET})')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        return serve(args.socket, args.port)
+
+    client = SafetyClient(args.address, fallback=False)
+    if not client.available:
+        print(f"❌ Not running at {client.address}")
+        return 1
+    health = client._request('GET', '/health', timeout=CONNECT_TIMEOUT)
+    print(f"✅ Running at {client.address}")
+    print(f"   pid {health['pid']}, ruleset {health['ruleset']}, {health['served']} URL(s) served")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
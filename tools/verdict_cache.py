@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Persistent URL verdict cache for the site-wide safety checks.
+
+Stores check_url() results keyed by canonical URL, tagged with the
+fingerprint of the ruleset that produced them (patterns, allow/block
+lists, compiled blocklist and reputation database versions, checker
+code). When the ruleset fingerprint changes the whole cache is discarded,
+so only new URLs are evaluated on an unchanged ruleset and everything is
+re-evaluated after a rules change.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+CACHE_DIR = Path(__file__).parent / '.cache'
+VERDICT_CACHE = CACHE_DIR / 'url-verdicts.json'
+
+
+def cache_key(url: str) -> str:
+    """Canonical cache key: trimmed URL with lowercased scheme and host."""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+
+
+class VerdictCache:
+    """JSON-backed cache of check_url() results for one ruleset version."""
+
+    def __init__(self, ruleset_version: str, path: Path = VERDICT_CACHE, enabled: bool = True):
+        self.path = Path(path)
+        self.ruleset_version = ruleset_version
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = False
+        self._verdicts: Dict[str, Dict] = {}
+        self._dirty = False
+
+        if enabled:
+            self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('ruleset') == self.ruleset_version:
+            self._verdicts = data.get('verdicts', {})
+        else:
+            self.invalidated = True
+            self._dirty = True
+
+    def check(self, checker, url: str) -> Dict:
+        """Return the cached verdict for `url`, checking it on a miss."""
+        key = cache_key(url)
+        if self.enabled and key in self._verdicts:
+            self.hits += 1
+            return self._verdicts[key]
+
+        self.misses += 1
+        result = checker.check_url(url)
+        if self.enabled:
+            self._verdicts[key] = result
+            self._dirty = True
+        return result
+
+    def check_batch(self, checker, urls: List[str]) -> List[Tuple[str, Dict]]:
+        """Check many URLs; misses go to checker.check_urls() in one call when available."""
+        if not hasattr(checker, 'check_urls'):
+            return [(url, self.check(checker, url)) for url in urls]
+
+        misses = list(dict.fromkeys(
+            cache_key(url) for url in urls if not (self.enabled and cache_key(url) in self._verdicts)))
+        fresh = dict(zip(misses, checker.check_urls(misses))) if misses else {}
+        results = []
+        for url in urls:
+            key = cache_key(url)
+            if key in fresh:
+                self.misses += 1
+                result = fresh[key]
+                if self.enabled:
+                    self._verdicts[key] = result
+                    self._dirty = True
+            else:
+                self.hits += 1
+                result = self._verdicts[key]
+            results.append((url, result))
+        return results
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total * 100 if total else 0.0
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Verdict cache: disabled"
+        note = " (ruleset changed, cache rebuilt)" if self.invalidated else ""
+        return (f"Verdict cache: {self.hits} hit(s), {self.misses} miss(es), "
+                f"{self.hit_rate:.1f}% hit rate{note}")
+
+    def save(self):
+        """Write the cache atomically if anything changed."""
+        if not self.enabled or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'ruleset': self.ruleset_version, 'verdicts': self._verdicts}, f,
+                      ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False